@@ -19,6 +19,60 @@ ADMIN_CONFIG = {
     "temp_folder": "temp"
 }
 
+# Configuration de l'agent de vérification des bulletins (agentOCR)
+AGENT_OCR_CONFIG = {
+    "moteur_ocr": "vision",  # "vision" (OpenAI) ou "tesseract" (local, bulletins uniquement)
+    "modele_vision": "gpt-4o",
+    "cascade_active": True,  # Premier passage par modele_rapide, escalade vers modele_vision si douteux
+    "modele_rapide": "gpt-4o-mini",
+    "openai_base_url": None,  # None = API OpenAI (ou variable OPENAI_BASE_URL), ex: serveur_simulation
+    "max_requetes_paralleles": 4,
+    # Quotas du compte OpenAI par modèle (requêtes et tokens par minute), partagés par processus
+    "quotas_modeles": {
+        "gpt-4o": {"rpm": 500, "tpm": 30000},
+        "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+        "defaut": {"rpm": 500, "tpm": 30000}
+    },
+    "ocr_timeout_s": 60,  # Délai maximal d'un appel OCR
+    "ocr_tentatives_max": 5,  # 429, 5xx, délai dépassé: nouvelles tentatives avec backoff
+    "ocr_backoff_base_s": 1.0,
+    "ocr_backoff_max_s": 30,
+    "disjoncteur_seuil_echecs": 5,  # Échecs consécutifs avant de suspendre tous les appels
+    "disjoncteur_delai_s": 30,
+    # Tarifs en USD par million de tokens (coût estimé dans les métriques)
+    "tarifs_modeles": {
+        "gpt-4o": {"entree": 2.50, "sortie": 10.00},
+        "gpt-4o-mini": {"entree": 0.15, "sortie": 0.60}
+    },
+    "file_pages_max": 4,  # Pages rendues en attente d'OCR (contre-pression du rendu)
+    "cache_actif": True,
+    "cache_dossier": "cache_ocr",
+    "cache_taille_max_mo": 200,
+    "cache_age_max_jours": 30,
+    "couche_texte_active": True,
+    "couche_texte_seuil_confiance": 0.8,
+    "couche_texte_min_notes": 3,
+    "rendu_dpi": 200,
+    "rendu_niveaux_gris": True,
+    "rendu_cote_max_px": 2048,
+    "rendu_format": "jpeg",  # "jpeg", "webp" (Pillow) ou "png"
+    "rendu_qualite": 80,
+    "rendu_detail": "auto",  # Détail demandé au modèle vision pour une page entière
+    "recadrage_actif": True,  # Bulletins: n'envoyer que la zone du tableau des notes
+    "recadrage_marge_pt": 12,
+    "recadrage_ratio_max": 0.8,  # Zone plus grande que 80% de la page: page entière envoyée
+    "recadrage_cote_max_px": 1024,  # Moins de tuiles de 512 px que la page entière
+    "recadrage_detail": "high",  # Chiffres lisibles sur la zone recadrée
+    "sauvegarder_images_temp": False,
+    "verification_incrementale": True,  # Manifeste par dossier: seuls les PDFs modifiés sont ré-analysés
+    "file_jobs_db": "admin_data/verifications_jobs.db",
+    "index_verifications_db": "admin_data/verifications_index.db",  # None: statut lu dossier par dossier
+    "worker_intervalle_s": 2,  # Attente entre deux interrogations d'une file vide
+    "worker_battement_s": 15,
+    "worker_delai_orphelin_s": 120,  # Sans battement au-delà: job remis en attente
+    "ui_rafraichissement_s": 2
+}
+
 # Statuts de validation des candidatures
 VALIDATION_STATUS = {
     "en_attente": {
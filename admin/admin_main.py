@@ -4,13 +4,14 @@ Vérification des candidatures et comparaison OCR
 """
 
 import streamlit as st
+import functools
 import os
 import json
 from datetime import datetime
 from pathlib import Path
 import traceback
 
-from admin_config import ADMIN_CONFIG, VALIDATION_STATUS
+from admin_config import ADMIN_CONFIG, VALIDATION_STATUS, AGENT_OCR_CONFIG
 from admin_utils import load_candidatures, get_candidature_details, init_admin_session
 from admin_components import (
     render_admin_header, render_candidatures_list, render_candidature_details,
@@ -25,11 +26,16 @@ from admin_auth import (
 # Import agent OCR
 try:
     from agentOCR.agent import (
-        verifier_bulletins_scolaires,
         get_verification_status,
         detecter_bulletins_scolaires,
+        obtenir_client_openai,
+        verifier_connexion_openai,
         ResultatVerification
     )
+    from agentOCR.file_attente import (
+        FileAttenteVerifications, STATUT_EN_ATTENTE, STATUT_EN_COURS, STATUT_TERMINE
+    )
+    from agentOCR.statut_verification import lister_statuts_verification
     AGENT_OCR_AVAILABLE = True
 except ImportError:
     AGENT_OCR_AVAILABLE = False
@@ -41,6 +47,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_client_openai():
+    """Client OpenAI partagé entre les sessions et les reruns Streamlit"""
+    return obtenir_client_openai()
+
+@st.cache_resource
+def get_file_attente():
+    """File d'attente des vérifications partagée entre les sessions"""
+    return FileAttenteVerifications(AGENT_OCR_CONFIG["file_jobs_db"])
+
+def fragment_rafraichi(actif):
+    """
+    Fragment relancé périodiquement tant que actif(*args) est vrai (Streamlit >= 1.37),
+    sinon fonction simple. La condition est évaluée à chaque rerun complet de la page.
+    """
+    def decorateur(fonction):
+        if not hasattr(st, "fragment"):
+            return fonction
+        
+        @functools.wraps(fonction)
+        def executer(*args, **kwargs):
+            run_every = AGENT_OCR_CONFIG["ui_rafraichissement_s"] if actif(*args, **kwargs) else None
+            return st.fragment(run_every=run_every)(fonction)(*args, **kwargs)
+        return executer
+    return decorateur
+
 def main():
     """Fonction principale de l'interface administration"""
     apply_admin_styles()
@@ -57,6 +89,14 @@ def main():
         
         if AGENT_OCR_AVAILABLE:
             st.success("🤖 Agent OCR: Actif")
+            if check_permission("system_config") and st.button("🩺 Tester la connexion OpenAI", key="btn_test_openai"):
+                try:
+                    if verifier_connexion_openai(get_client_openai()):
+                        st.success("✅ Connexion OpenAI établie")
+                    else:
+                        st.error("❌ Connexion OpenAI impossible")
+                except Exception as e:
+                    st.error(f"❌ {str(e)}")
         else:
             st.warning("🤖 Agent OCR: Inactif")
         
@@ -380,6 +420,10 @@ def render_bulletins_statistics(candidatures):
         "menteurs": 0
     }
     
+    # Index central (une seule requête): repli pour les dossiers sans verification_latest.json,
+    # qui reste la référence
+    statuts_indexes = lister_statuts_verification()
+    
     for candidature in candidatures:
         try:
             dossier = get_candidature_folder_path(candidature)
@@ -388,7 +432,7 @@ def render_bulletins_statistics(candidatures):
                 if detection["bulletins_detectes"]:
                     bulletins_stats["avec_bulletins"] += 1
                     
-                    status = get_verification_status(dossier)
+                    status = get_verification_status(dossier, statuts_indexes.get(str(dossier.resolve())))
                     if status["verifie"]:
                         bulletins_stats["verifies"] += 1
                         if status["concordance"]:
@@ -490,24 +534,69 @@ def render_bulletins_verification_section(candidature, dossier_candidature, dete
                 st.error(f"❌ {status_verif['nb_discordances']} mensonge(s)")
         else:
             st.info("⏳ Non vérifié")
+    
+    cle = str(dossier_candidature)
+    suivre_verification_bulletins(dossier_candidature)
+    
+    erreur = st.session_state.get('erreurs_verification', {}).pop(cle, None)
+    if erreur:
+        st.error(f"❌ Erreur lors de la vérification: {erreur}")
+    
+    resultat = st.session_state.get('resultats_verification', {}).get(cle)
+    if resultat:
+        afficher_resultats_verification(ResultatVerification.from_dict(resultat))
 
 def lancer_verification_bulletins(candidature, dossier_candidature):
-    """Lance la vérification des bulletins scolaires"""
-    with st.spinner("🔍 Vérification en cours..."):
-        try:
-            progress_bar = st.progress(0)
-            
-            progress_bar.progress(30)
-            resultat = verifier_bulletins_scolaires(str(dossier_candidature))
-            
-            progress_bar.progress(100)
-            progress_bar.empty()
-            
-            # Affichage des résultats
-            afficher_resultats_verification(resultat)
-            
-        except Exception as e:
-            st.error(f"❌ Erreur lors de la vérification: {str(e)}")
+    """Soumet la vérification des bulletins à la file d'attente des workers"""
+    try:
+        soumis_par = st.session_state.get('admin_user', {}).get('username')
+        job_id = get_file_attente().soumettre(str(dossier_candidature), soumis_par)
+        
+        if 'jobs_verification' not in st.session_state:
+            st.session_state.jobs_verification = {}
+        st.session_state.jobs_verification[str(dossier_candidature)] = job_id
+        st.session_state.get('resultats_verification', {}).pop(str(dossier_candidature), None)
+        
+    except Exception as e:
+        st.error(f"❌ Erreur lors de la soumission de la vérification: {str(e)}")
+
+def job_verification_actif(dossier_candidature):
+    """Un job de vérification en attente ou en cours est suivi pour ce dossier"""
+    return str(dossier_candidature) in st.session_state.get('jobs_verification', {})
+
+@fragment_rafraichi(job_verification_actif)
+def suivre_verification_bulletins(dossier_candidature):
+    """Affiche l'avancement du job de vérification sans bloquer la session"""
+    cle = str(dossier_candidature)
+    job_id = st.session_state.get('jobs_verification', {}).get(cle)
+    if job_id is None:
+        return
+    
+    job = get_file_attente().statut(job_id)
+    if job is None:
+        st.session_state.jobs_verification.pop(cle, None)
+        return
+    
+    if job["statut"] == STATUT_EN_ATTENTE:
+        st.info(f"⏳ Vérification #{job_id} en attente d'un worker (python -m agentOCR.worker)")
+    elif job["statut"] == STATUT_EN_COURS:
+        st.progress(min(int(job["progression"]), 100) / 100,
+                    text=job["message"] or f"🔍 Vérification #{job_id} en cours...")
+    else:
+        # Job terminé: on arrête le suivi et on relance la page pour rafraîchir les statuts
+        st.session_state.jobs_verification.pop(cle, None)
+        if job["statut"] == STATUT_TERMINE:
+            if 'resultats_verification' not in st.session_state:
+                st.session_state.resultats_verification = {}
+            st.session_state.resultats_verification[cle] = job["resultat"]
+        else:
+            if 'erreurs_verification' not in st.session_state:
+                st.session_state.erreurs_verification = {}
+            st.session_state.erreurs_verification[cle] = job["erreur"]
+        st.rerun()
+    
+    if not hasattr(st, "fragment"):
+        st.button("🔄 Actualiser", key=f"btn_actualiser_job_{job_id}")
 
 def afficher_resultats_verification(resultat):
     """Affiche les résultats de la vérification"""
@@ -560,6 +649,13 @@ def afficher_resultats_verification(resultat):
                 with col_d3:
                     ecart = getattr(discordance, 'ecart', 0.0)
                     st.markdown(f"**Écart:** {ecart:.2f} points")
+    
+    # Bulletins déposés en double (analysés une seule fois)
+    doublons = getattr(resultat, 'doublons', [])
+    if doublons:
+        st.markdown("#### ♻️ **Documents en Double**")
+        for doublon in doublons:
+            st.warning(doublon)
 
 def afficher_rapport_verification(fichier_excel):
     """Affiche un rapport de vérification existant"""
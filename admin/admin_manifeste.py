@@ -0,0 +1,83 @@
+"""
+Lecture du manifeste des documents d'une candidature (manifest.json)
+
+Écrit par forms/pdf_generator.py à la soumission: rôle, année, taille,
+empreinte SHA-256 et nombre de pages de chaque fichier. L'administration et
+l'agent de vérification y lisent le classement des documents plutôt que de
+le deviner d'après les noms de fichiers. Module sans dépendance lourde (ni fitz, ni openai).
+Nom, version et rôles viennent de forms/submission_manifest.py, partagé avec l'écriture.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from forms.submission_manifest import (
+    IMAGE_EXTENSIONS as EXTENSIONS_IMAGES,
+    MANIFEST_FILENAME as NOM_MANIFESTE_SOUMISSION,
+    MANIFEST_VERSION as VERSION_MANIFESTE_SOUMISSION,
+    ROLE_BULLETIN,
+    ROLE_FORM as ROLE_FORMULAIRE,
+    ROLE_SUMMARY as ROLE_RESUME,
+    compute_file_sha256 as calculer_sha256_fichier,
+    count_pdf_pages as compter_pages_pdf
+)
+
+
+def lire_manifeste_soumission(dossier_candidature) -> Optional[Dict[str, Any]]:
+    """Manifeste du dossier, None s'il est absent, illisible ou d'une autre version"""
+    try:
+        with open(os.path.join(dossier_candidature, NOM_MANIFESTE_SOUMISSION), 'r', encoding='utf-8') as f:
+            manifeste = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Manifeste de soumission illisible ({dossier_candidature}): {e}")
+        return None
+
+    if manifeste.get('version') != VERSION_MANIFESTE_SOUMISSION:
+        return None
+    return manifeste
+
+
+def fichiers_par_role(manifeste: Dict[str, Any], role: str, extension: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Entrées du manifeste d'un rôle donné (filtrées par extension, ex: ".pdf")"""
+    return [
+        entree for entree in manifeste.get('files', [])
+        if entree['role'] == role and (extension is None or entree['name'].lower().endswith(extension))
+    ]
+
+
+def empreinte_si_inchangee(entree: Dict[str, Any], chemin: Path) -> Optional[str]:
+    """
+    SHA-256 enregistré à la soumission si le fichier n'a pas changé depuis
+    (même taille et même date de modification), sinon None: l'empreinte est à recalculer
+    """
+    try:
+        stat = os.stat(chemin)
+    except OSError:
+        return None
+    if stat.st_size == entree.get('size') and stat.st_mtime_ns == entree.get('mtime_ns'):
+        return entree.get('sha256')
+    return None
+
+
+def classer_fichiers_soumission(manifeste: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Fichiers de la soumission par catégorie d'affichage (format de list_candidature_files)"""
+    fichiers = {'pdf': [], 'json': [NOM_MANIFESTE_SOUMISSION], 'images': [], 'bulletins': [], 'autres': []}
+
+    for entree in manifeste.get('files', []):
+        nom = entree['name']
+        if entree['role'] == ROLE_FORMULAIRE:
+            fichiers['pdf'].append(nom)
+        elif nom.lower().endswith(EXTENSIONS_IMAGES):
+            fichiers['images'].append(nom)
+        elif entree['role'] == ROLE_BULLETIN:
+            fichiers['bulletins'].append(nom)
+        elif nom.lower().endswith('.json'):
+            fichiers['json'].append(nom)
+        else:
+            fichiers['autres'].append(nom)
+
+    return fichiers
@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional
 import pandas as pd
 
 from admin_config import ADMIN_CONFIG, VALIDATION_STATUS, GRADE_PATTERNS, ANOMALY_TYPES
+from admin_manifeste import NOM_MANIFESTE_SOUMISSION, lire_manifeste_soumission, classer_fichiers_soumission
 
 
 def init_admin_session():
@@ -112,8 +113,30 @@ def create_candidature_from_folder_name(folder_name: str) -> Dict[str, Any]:
     }
 
 
+def _classer_fichier(files: Dict[str, List[str]], filename: str):
+    """Range un fichier hors manifeste dans sa catégorie d'affichage d'après son nom"""
+    
+    ext = filename.lower().split('.')[-1]
+    
+    if ext == 'pdf':
+        if 'candidature' in filename.lower():
+            files['pdf'].append(filename)
+        else:
+            files['bulletins'].append(filename)
+    elif ext == 'json':
+        files['json'].append(filename)
+    elif ext in ['jpg', 'jpeg', 'png']:
+        files['images'].append(filename)
+    else:
+        files['autres'].append(filename)
+
+
 def list_candidature_files(folder_path: str) -> Dict[str, List[str]]:
     """Liste tous les fichiers d'une candidature"""
+    
+    with os.scandir(folder_path) as entrees:
+        filenames = [entree.name for entree in entrees if entree.is_file()]
+    
     files = {
         'pdf': [],
         'json': [],
@@ -121,24 +144,20 @@ def list_candidature_files(folder_path: str) -> Dict[str, List[str]]:
         'bulletins': [],
         'autres': []
     }
-    
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        
-        if os.path.isfile(file_path):
-            ext = filename.lower().split('.')[-1]
-            
-            if ext == 'pdf':
-                if 'candidature' in filename.lower():
-                    files['pdf'].append(filename)
-                else:
-                    files['bulletins'].append(filename)
-            elif ext == 'json':
-                files['json'].append(filename)
-            elif ext in ['jpg', 'jpeg', 'png']:
-                files['images'].append(filename)
-            else:
-                files['autres'].append(filename)
+    couverts = set()
+    
+    # Documents classés à la soumission et toujours présents; les fichiers créés depuis
+    # (rapports de vérification, statut de validation...) sont classés d'après leur nom
+    manifeste = lire_manifeste_soumission(folder_path)
+    if manifeste is not None:
+        presents = set(filenames)
+        entrees_presentes = [entree for entree in manifeste.get('files', []) if entree['name'] in presents]
+        files = classer_fichiers_soumission({**manifeste, 'files': entrees_presentes})
+        couverts = {entree['name'] for entree in entrees_presentes} | {NOM_MANIFESTE_SOUMISSION}
+    
+    for filename in filenames:
+        if filename not in couverts:
+            _classer_fichier(files, filename)
     
     return files
 
@@ -5,18 +5,50 @@
 
 import os
 import json
-import base64
+import hashlib
+import io
+import queue
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Tuple, Optional, Type
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
+from functools import lru_cache
 
 # Imports externes
 import fitz  # PyMuPDF
 import pandas as pd
 from openai import OpenAI
 from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from admin_config import AGENT_OCR_CONFIG
+from admin_manifeste import (
+    ROLE_BULLETIN,
+    ROLE_FORMULAIRE,
+    calculer_sha256_fichier,
+    compter_pages_pdf,
+    empreinte_si_inchangee,
+    fichiers_par_role,
+    lire_manifeste_soumission
+)
+from agentOCR.cache_ocr import CacheReponsesOCR
+from agentOCR.analyse_texte import extraire_notes_couche_texte
+from agentOCR.schemas import FormulaireSchema, BulletinSchema
+from agentOCR.moteurs import MoteurOCR, MoteurVisionOpenAI, creer_moteur_ocr
+from agentOCR.mise_en_page import localiser_tableau_notes, estimer_tokens_image
+from agentOCR.metriques import CollecteurMetriques, MesureAppel
+from agentOCR.planificateur import ErreurServiceOCR
+from agentOCR.manifeste import ManifesteVerification
+from agentOCR.statut_verification import (
+    STATUT_NON_VERIFIE,
+    ecrire_statut,
+    lire_statut,
+    statut_depuis_resultat
+)
 
 # ==================================================
 # MODÈLES DE DONNÉES SPÉCIALISÉS
@@ -40,6 +72,45 @@ class NoteBulletin:
     niveau: str
     etablissement: Optional[str] = None
 
+@dataclass
+class PageRendue:
+    """Page de PDF rendue en mémoire, prête à être envoyée à l'OCR"""
+    nom: str
+    donnees: bytes
+    mime: str
+    detail: str = "auto"  # Niveau de détail demandé au modèle vision ("low", "high", "auto")
+    largeur: int = 0
+    hauteur: int = 0
+    recadree: bool = False  # Zone du tableau des notes seulement: l'en-tête peut être hors image
+
+@dataclass
+class EvenementProgression:
+    """Avancement de la vérification, transmis au callback de progression"""
+    etape: str  # "formulaire", "bulletins", "comparaison", "rapport", "termine"
+    message: str
+    pourcentage: float
+    ecoule_ms: float
+    page: int = 0
+    total_pages: int = 0
+    nom_page: Optional[str] = None
+    duree_page_ms: Optional[float] = None
+    octets_envoyes: int = 0  # Cumul des images envoyées au modèle vision
+    
+    def estimer_restant_s(self) -> Optional[float]:
+        """Temps restant estimé par extrapolation linéaire (None en début de vérification)"""
+        if self.pourcentage <= 0 or self.pourcentage >= 100:
+            return None
+        return self.ecoule_ms / 1000 * (100 - self.pourcentage) / self.pourcentage
+
+# Part de la progression globale attribuée à chaque étape (début, fin en %)
+ETAPES_PROGRESSION = {
+    "formulaire": (0, 15),
+    "bulletins": (15, 85),
+    "comparaison": (85, 90),
+    "rapport": (90, 100),
+    "termine": (100, 100)
+}
+
 @dataclass
 class Discordance:
     """Discordance détectée entre déclaré et réel"""
@@ -63,6 +134,7 @@ class ResultatVerification:
     notes_non_verifiables: List[str]
     timestamp: str
     rapport_excel_path: Optional[str] = None
+    doublons: List[str] = field(default_factory=list)  # Bulletins ou pages déposés en double
     
     def to_dict(self):
         """Convertit en dictionnaire pour sauvegarde JSON"""
@@ -75,9 +147,151 @@ class ResultatVerification:
             "discordances": [asdict(d) for d in self.discordances],
             "notes_non_verifiables": self.notes_non_verifiables,
             "timestamp": self.timestamp,
-            "rapport_excel_path": self.rapport_excel_path
+            "rapport_excel_path": self.rapport_excel_path,
+            "doublons": self.doublons
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResultatVerification":
+        """Reconstruit un résultat depuis to_dict (JSON sauvegardé, file d'attente)"""
+        return cls(
+            candidat_nom=data["candidat_nom"],
+            candidat_prenom=data["candidat_prenom"],
+            moyenne_declaree=data["moyenne_declaree"],
+            moyenne_reelle=data.get("moyenne_reelle"),
+            concordance_globale=data["concordance_globale"],
+            discordances=[Discordance(**d) for d in data.get("discordances", [])],
+            notes_non_verifiables=data.get("notes_non_verifiables", []),
+            timestamp=data["timestamp"],
+            rapport_excel_path=data.get("rapport_excel_path"),
+            doublons=data.get("doublons", [])
+        )
+
+# Synonymes des matières (clé = forme normalisée utilisée par les prompts OCR)
+CORRESPONDANCES_MATIERES = {
+    "francais": ["français", "fran", "fr", "lettres"],
+    "anglais": ["ang", "angl", "english", "lv1", "lve1"],
+    "maths": ["mathématiques", "mathematiques", "math", "mathematique"],
+    "histoire": ["hist", "histoire-geo", "histoire-géo", "histoire-géographie", "hg"],
+    "svt": ["sciences", "biologie", "sciences-vie-terre", "sc-vie-terre"],
+    "physique": ["physique-chimie", "phys", "pc", "sciences-physiques"],
+    "chimie": ["physique-chimie", "chim", "pc"],
+    "philosophie": ["philo", "phil"],
+    "eps": ["sport", "education-physique", "éducation-physique"],
+    "espagnol": ["esp", "lv2", "lve2"],
+    "allemand": ["all", "lv2", "lve2"]
+}
+
+# Périodes et niveaux: formes textuelles ramenées à une clé canonique
+CORRESPONDANCES_PERIODES = {
+    "1": ["premier", "1er", "first"],
+    "2": ["deuxième", "2ème", "second", "2e"],
+    "3": ["troisième", "3ème", "third", "3e"]
+}
+
+CORRESPONDANCES_NIVEAUX = {
+    "2nde": ["seconde", "2nd", "seconde générale"],
+    "1ere": ["1ère", "premiere", "première", "première générale"],
+    "terminale": ["tle", "term", "terminale générale"]
+}
+
+RE_NUMERO_PERIODE = re.compile(r"(\d+)")
+
+# Index inversés construits une seule fois: forme -> groupes de synonymes / clé canonique
+_GROUPES_MATIERES: Dict[str, FrozenSet[str]] = {}
+for _base, _variations in CORRESPONDANCES_MATIERES.items():
+    for _forme in [_base] + _variations:
+        _GROUPES_MATIERES[_forme] = _GROUPES_MATIERES.get(_forme, frozenset()) | {_base}
+
+_NIVEAUX_CANONIQUES = {
+    _forme: _base
+    for _base, _variations in CORRESPONDANCES_NIVEAUX.items()
+    for _forme in [_base] + _variations
+}
+
+@lru_cache(maxsize=1024)
+def cle_matiere(matiere: str) -> FrozenSet[str]:
+    """
+    Clés d'appariement d'une matière: la forme exacte plus chaque groupe de synonymes
+    auquel elle appartient. Deux matières correspondent si leurs clés se recoupent
+    ("pc" appartient à physique ET chimie, "lv2" à espagnol ET allemand).
+    """
+    m = matiere.lower().strip()
+    return frozenset({f"={m}"}) | _GROUPES_MATIERES.get(m, frozenset())
+
+@lru_cache(maxsize=256)
+def cle_periode(periode: str) -> str:
+    """Numéro de la période ("1er trimestre", "premier trimestre" -> "1"), sinon le texte normalisé"""
+    p = periode.lower().strip()
+    numero = RE_NUMERO_PERIODE.search(p)
+    if numero:
+        return numero.group(1)
+    for num, variations in CORRESPONDANCES_PERIODES.items():
+        if any(var in p for var in variations):
+            return num
+    return p
+
+@lru_cache(maxsize=256)
+def cle_niveau(niveau: str) -> str:
+    """Niveau canonique ("première", "1ère" -> "1ere"), sinon le texte normalisé"""
+    n = niveau.lower().strip()
+    return _NIVEAUX_CANONIQUES.get(n, n)
+
+# Version des prompts et schémas d'extraction: à incrémenter à chaque modification
+# pour que les extractions enregistrées dans les manifestes de vérification soient refaites
+VERSION_PROMPTS = 1
+
+# Réglages qui changent les notes extraites (et non la vitesse, les quotas ou le cache)
+CLES_CONFIG_EXTRACTION = (
+    "moteur_ocr", "modele_vision", "cascade_active", "modele_rapide",
+    "couche_texte_active", "couche_texte_seuil_confiance", "couche_texte_min_notes",
+    "rendu_dpi", "rendu_niveaux_gris", "rendu_cote_max_px", "rendu_format", "rendu_qualite", "rendu_detail",
+    "recadrage_actif", "recadrage_marge_pt", "recadrage_ratio_max", "recadrage_cote_max_px", "recadrage_detail"
+)
+
+def empreinte_config_extraction() -> str:
+    """Empreinte des réglages de CLES_CONFIG_EXTRACTION (paramètres du manifeste de vérification)"""
+    config = {cle: AGENT_OCR_CONFIG.get(cle) for cle in CLES_CONFIG_EXTRACTION}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+# ==================================================
+# CLIENT OPENAI PARTAGÉ
+# ==================================================
+
+_client_openai_partage: Optional[OpenAI] = None
+_verrou_client_openai = threading.Lock()
+
+def obtenir_client_openai() -> OpenAI:
+    """
+    Retourne le client OpenAI du processus, créé au premier appel.
+    Un seul client = un seul pool de connexions HTTP keep-alive réutilisé par toutes les vérifications.
+    """
+    global _client_openai_partage
+    
+    with _verrou_client_openai:
+        if _client_openai_partage is None:
+            load_dotenv()
+            api_key = os.getenv("OPENAI_API_KEY")
+            
+            if not api_key:
+                raise ValueError("❌ OPENAI_API_KEY manquante dans le fichier .env")
+            
+            # base_url: API réelle par défaut (ou OPENAI_BASE_URL), serveur de simulation pour les benchmarks
+            _client_openai_partage = OpenAI(api_key=api_key, base_url=AGENT_OCR_CONFIG["openai_base_url"])
+            print("✅ Client OpenAI initialisé")
+        
+        return _client_openai_partage
+
+def verifier_connexion_openai(client: Optional[OpenAI] = None) -> bool:
+    """Test de connexion explicite (liste des modèles, aucune complétion facturée)"""
+    try:
+        (client or obtenir_client_openai()).models.list()
+        print("✅ Connexion OpenAI établie")
+        return True
+    except Exception as e:
+        print(f"⚠️ Avertissement connexion OpenAI: {e}")
+        return False
+
 # ==================================================
 # AGENT SPÉCIALISÉ BULLETINS SCOLAIRES
 # ==================================================
@@ -85,22 +299,101 @@ class ResultatVerification:
 class AgentVerificationScolaireAdmin:
     """Agent spécialisé pour vérifier les notes scolaires - Version Admin Production"""
     
-    def __init__(self, dossier_candidature: str):
+    def __init__(self, dossier_candidature: str, max_requetes_paralleles: Optional[int] = None,
+                 client_openai: Optional[OpenAI] = None,
+                 callback_progression: Optional[Callable[[EvenementProgression], None]] = None,
+                 moteur_ocr: Optional[str] = None, incrementale: Optional[bool] = None):
         self.dossier_candidature = Path(dossier_candidature)
         
+        # Re-vérification incrémentale: seuls les PDFs nouveaux ou modifiés sont ré-analysés
+        self.incrementale = AGENT_OCR_CONFIG["verification_incrementale"] if incrementale is None else incrementale
+        self.manifeste: Optional[ManifesteVerification] = None
+        
+        # Suivi de progression (appelé depuis les threads OCR: accès sérialisé)
+        self.callback_progression = callback_progression
+        self._verrou_progression = threading.Lock()
+        self._debut = time.perf_counter()
+        self._pages_traitees: Dict[str, int] = {}
+        self.octets_envoyes = 0
+        
         # VÉRIFICATIONS ROBUSTES
         self._valider_dossier_candidature()
         
         self.dossier_images = self.dossier_candidature / "images_temp"
-        self.client_openai = self._init_openai()
+        
+        # Client OpenAI: fourni par l'appelant ou partagé par le processus, créé au premier appel OCR
+        self._client_openai = client_openai
         
         # Seuils de tolérance configurables
         self.seuil_leger = 0.5    # ±0.5 point = discordance légère
         self.seuil_modere = 1.0   # ±1.0 point = discordance modérée
         # >1.0 point = discordance grave
         
-        # Créer le dossier images
-        self.dossier_images.mkdir(exist_ok=True)
+        # Parallélisme des appels OCR (nombre max de requêtes simultanées)
+        self.modele_vision = AGENT_OCR_CONFIG["modele_vision"]
+        self.max_requetes_paralleles = max(1, max_requetes_paralleles or AGENT_OCR_CONFIG["max_requetes_paralleles"])
+        
+        # Moteur OCR des pages (vision OpenAI ou Tesseract local); le modèle vision
+        # reste disponible pour les extractions que le moteur choisi ne sait pas faire
+        self._moteur_vision = MoteurVisionOpenAI(lambda: self.client_openai, self.modele_vision)
+        nom_moteur = moteur_ocr or AGENT_OCR_CONFIG["moteur_ocr"]
+        self.moteur_ocr: MoteurOCR = creer_moteur_ocr(nom_moteur, self._moteur_vision)
+        print(f"🔧 Moteur OCR: {self.moteur_ocr.nom} ({self.moteur_ocr.identifiant})")
+        
+        # Cascade: premier passage par un moteur rapide/économique, escalade vers
+        # le modèle vision principal seulement pour les pages douteuses.
+        # Moteur local (Tesseract): pas de cascade, aucune page ne part vers l'API
+        self.cascade_active = AGENT_OCR_CONFIG["cascade_active"] and self.moteur_ocr is self._moteur_vision
+        self._moteur_rapide = self.moteur_ocr
+        if self.cascade_active:
+            self._moteur_rapide = MoteurVisionOpenAI(lambda: self.client_openai, AGENT_OCR_CONFIG["modele_rapide"])
+        self.statistiques_cascade = {
+            "pages": 0,
+            "acceptees_rapide": 0,
+            "escaladees": 0,
+            "acceptees_expert": 0,
+            "motifs": {}
+        }
+        # Mesure de chaque appel OCR (durée, tokens, coût, tentatives) et de chaque étape
+        self.metriques = CollecteurMetriques()
+        for moteur in {self._moteur_vision, self.moteur_ocr, self._moteur_rapide}:
+            moteur.metriques = self.metriques
+        
+        # Notes déclarées indexées par (clé matière, période, niveau) pour détecter les désaccords
+        self._index_declarees: Dict[Tuple[str, str, str], NoteDeclaree] = {}
+        
+        # Cache disque des réponses OCR (pages inchangées = aucun appel API)
+        self.cache_ocr = None
+        if AGENT_OCR_CONFIG["cache_actif"]:
+            self.cache_ocr = CacheReponsesOCR(
+                AGENT_OCR_CONFIG["cache_dossier"],
+                taille_max_mo=AGENT_OCR_CONFIG["cache_taille_max_mo"],
+                age_max_jours=AGENT_OCR_CONFIG["cache_age_max_jours"]
+            )
+        
+        # Rendu des pages: en mémoire, copie disque uniquement pour le debug
+        self.sauvegarder_images_temp = AGENT_OCR_CONFIG["sauvegarder_images_temp"]
+        if self.sauvegarder_images_temp:
+            self.dossier_images.mkdir(exist_ok=True)
+        
+        # Bulletins et pages identiques: lus une seule fois, signalés dans le rapport
+        self.doublons: List[str] = []
+        self._empreintes_fichiers: Dict[str, str] = {}  # nom de fichier -> SHA-256 (entrées analysées)
+        self._bulletins_incomplets: set = set()
+        self._formulaire_extrait = False
+        self._pages_reprises = 0  # Pages de bulletins reprises du manifeste de vérification
+        self._pages_recadrees: Dict[int, Tuple[Path, int]] = {}  # index -> (bulletin, numéro de page)
+        # Documents déclarés à la soumission (manifest.json): nom -> rôle, taille, empreinte, pages
+        self._entrees_soumission: Dict[str, dict] = {}
+        
+        # Recadrage des bulletins sur le tableau des notes (tokens image estimés)
+        self.recadrage_actif = AGENT_OCR_CONFIG["recadrage_actif"]
+        self.statistiques_recadrage = {
+            "pages": 0,
+            "recadrees": 0,
+            "tokens_image_estimes": 0,
+            "tokens_image_pleine_page": 0
+        }
         
         # Configuration des patterns de détection
         self.patterns_formulaire = ["candidature*", "*formulaire*", "*dossier*", "*CAND_*"]
@@ -138,48 +431,100 @@ class AgentVerificationScolaireAdmin:
         print(f"✅ Dossier validé: {self.dossier_candidature}")
         print(f"✅ {len(pdfs)} PDFs détectés: {[pdf.name for pdf in pdfs]}")
         
-    def _init_openai(self) -> OpenAI:
-        """Initialise le client OpenAI avec gestion d'erreurs"""
+    @property
+    def client_openai(self) -> OpenAI:
+        """Client OpenAI (initialisation paresseuse: aucun appel réseau tant qu'aucune page n'est envoyée)"""
+        if self._client_openai is None:
+            self._client_openai = obtenir_client_openai()
+        return self._client_openai
+    
+    def _emettre_progression(self, etape: str, message: str, page: int = 0, total_pages: int = 0,
+                             nom_page: Optional[str] = None, duree_page_ms: Optional[float] = None):
+        """Transmet un événement de progression au callback (sans jamais interrompre la vérification)"""
+        
+        self.metriques.marquer_etape(etape)
+        if self.callback_progression is None:
+            return
+        
+        debut, fin = ETAPES_PROGRESSION[etape]
+        pourcentage = debut + (fin - debut) * page / total_pages if total_pages else debut
+        
+        with self._verrou_progression:
+            evenement = EvenementProgression(
+                etape=etape,
+                message=message,
+                pourcentage=round(pourcentage, 1),
+                ecoule_ms=round((time.perf_counter() - self._debut) * 1000, 1),
+                page=page,
+                total_pages=total_pages,
+                nom_page=nom_page,
+                duree_page_ms=duree_page_ms,
+                octets_envoyes=self.octets_envoyes
+            )
         
+        # Callback hors du verrou: une écriture lente (file de jobs SQLite) ne bloque pas les threads OCR
         try:
-            load_dotenv()
-            api_key = os.getenv("OPENAI_API_KEY")
-            
-            if not api_key:
-                raise ValueError("❌ OPENAI_API_KEY manquante dans le fichier .env")
-            
-            client = OpenAI(api_key=api_key)
-            
-            # Test de connexion
-            try:
-                # Test simple pour vérifier la validité de la clé
-                test_response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=1
-                )
-                print("✅ Connexion OpenAI établie")
-            except Exception as e:
-                print(f"⚠️ Avertissement connexion OpenAI: {e}")
-            
-            return client
-            
+            self.callback_progression(evenement)
         except Exception as e:
-            print(f"❌ Erreur initialisation OpenAI: {e}")
-            raise ValueError(f"Impossible d'initialiser OpenAI: {e}")
+            print(f"   ⚠️ Callback de progression en erreur: {e}")
+    
+    def _signaler_page(self, etape: str, nom_page: str, total_pages: int, duree_page_ms: float):
+        """Compte une page terminée (couche texte ou OCR vision) et émet l'événement correspondant"""
+        
+        with self._verrou_progression:
+            self._pages_traitees[etape] = self._pages_traitees.get(etape, 0) + 1
+            page = self._pages_traitees[etape]
+        
+        self._emettre_progression(
+            etape, f"Page {page}/{total_pages}: {nom_page}",
+            page=page, total_pages=total_pages, nom_page=nom_page, duree_page_ms=round(duree_page_ms, 1)
+        )
+    
+    def _compter_pages(self, pdfs: List[Path]) -> int:
+        """Nombre total de pages (manifeste de soumission, sinon lecture de l'en-tête PDF, sans rendu)"""
+        total = 0
+        for pdf in pdfs:
+            entree = self._entrees_soumission.get(pdf.name)
+            if entree and entree.get("pages") is not None and empreinte_si_inchangee(entree, pdf):
+                total += entree["pages"]
+                continue
+            total += compter_pages_pdf(pdf) or 0
+        return total
     
     def verifier_candidature_complete(self) -> ResultatVerification:
         """
         Workflow principal - Version production avec gestion d'erreurs complète
         """
         print("🎓 === DÉMARRAGE VÉRIFICATION BULLETINS SCOLAIRES ===")
+        self._debut = time.perf_counter()
+        self._pages_traitees = {}
+        self.octets_envoyes = 0
+        self.doublons = []
+        self._empreintes_fichiers = {}
+        self._bulletins_incomplets = set()
+        self._pages_reprises = 0
+        self._pages_recadrees = {}
+        manifeste_soumission = lire_manifeste_soumission(self.dossier_candidature)
+        self._entrees_soumission = {
+            entree["name"]: entree for entree in (manifeste_soumission or {}).get("files", [])
+        }
+        self.manifeste = ManifesteVerification(
+            self.dossier_candidature,
+            {"moteur": self.moteur_ocr.identifiant,
+             "modele_rapide": self._moteur_rapide.identifiant if self.cascade_active else None,
+             "version_prompts": VERSION_PROMPTS,
+             "config": empreinte_config_extraction()},
+            lire=self.incrementale
+        )
         
         try:
             # Étape 1: Extraire les notes déclarées du formulaire
             print("\n📋 ÉTAPE 1: Extraction des notes déclarées...")
+            self._emettre_progression("formulaire", "Extraction des notes déclarées")
             formulaire_pdf = self._trouver_formulaire()
-            notes_declarees = self._extraire_notes_formulaire(formulaire_pdf)
-            candidat_nom, candidat_prenom, moyenne_declaree = self._extraire_infos_candidat(formulaire_pdf)
+            notes_declarees, candidat_nom, candidat_prenom, moyenne_declaree = self._obtenir_notes_declarees(formulaire_pdf)
+            
+            self._indexer_notes_declarees(notes_declarees)
             
             print(f"✅ Candidat identifié: {candidat_prenom} {candidat_nom}")
             print(f"✅ Moyenne déclarée: {moyenne_declaree}/20")
@@ -187,16 +532,28 @@ class AgentVerificationScolaireAdmin:
             
             # Étape 2: Extraire les notes des bulletins officiels
             print("\n📚 ÉTAPE 2: Extraction des bulletins officiels...")
+            self._emettre_progression("bulletins", "Extraction des bulletins officiels")
             bulletins_pdf = self._trouver_bulletins()
             notes_bulletins = self._extraire_notes_bulletins(bulletins_pdf)
             
             print(f"✅ {len(bulletins_pdf)} bulletins analysés")
             print(f"✅ {len(notes_bulletins)} notes extraites des bulletins")
+            if self.doublons:
+                print(f"♻️ {len(self.doublons)} doublon(s) de bulletins ignoré(s)")
+            
+            # Aucune entrée modifiée depuis la dernière vérification: rapport précédent réutilisé
+            empreinte_entrees = ManifesteVerification.empreinte_entrees(self._empreintes_fichiers)
+            resultat_precedent = self._resultat_precedent(empreinte_entrees, len(bulletins_pdf))
+            if resultat_precedent is not None:
+                self._emettre_progression("termine", "Aucun document modifié: rapport précédent conservé")
+                self._sauvegarder_metriques(None)
+                print("\n🎉 === VÉRIFICATION TERMINÉE (AUCUN CHANGEMENT) ===")
+                return resultat_precedent
             
             # Étape 3: Comparaison et détection des discordances
             print("\n⚖️ ÉTAPE 3: Comparaison déclaré vs réel...")
-            discordances = self._comparer_notes(notes_declarees, notes_bulletins)
-            notes_non_verifiables = self._identifier_notes_non_verifiables(notes_declarees, notes_bulletins)
+            self._emettre_progression("comparaison", "Comparaison déclaré vs réel")
+            discordances, notes_non_verifiables = self._apparier_notes(notes_declarees, notes_bulletins)
             
             # Calculer moyenne réelle
             moyenne_reelle = self._calculer_moyenne_reelle(notes_bulletins)
@@ -217,18 +574,40 @@ class AgentVerificationScolaireAdmin:
                 concordance_globale=concordance,
                 discordances=discordances,
                 notes_non_verifiables=notes_non_verifiables,
-                timestamp=datetime.now().isoformat()
+                timestamp=datetime.now().isoformat(),
+                doublons=list(self.doublons)
             )
             
             # Étape 4: Génération du rapport Excel
             print("\n📊 ÉTAPE 4: Génération du rapport...")
+            self._emettre_progression("rapport", "Génération du rapport")
             fichier_excel = self._generer_rapport_excel(resultat)
             resultat.rapport_excel_path = str(fichier_excel)
             print(f"✅ Rapport Excel généré: {fichier_excel}")
             
             # Étape 5: Sauvegarde JSON pour intégration système
-            self._sauvegarder_resultat_json(resultat)
+            json_path = self._sauvegarder_resultat_json(resultat)
+            if json_path is not None:
+                # Statut lu par l'interface sans parcourir les rapports du dossier
+                ecrire_statut(self.dossier_candidature, statut_depuis_resultat(resultat.to_dict(), json_path))
+                self.manifeste.resultat = {
+                    "empreinte_entrees": empreinte_entrees,
+                    "json": str(json_path),
+                    "excel": resultat.rapport_excel_path
+                }
+            self.manifeste.sauvegarder()
+            print(f"🧾 Manifeste: {self.manifeste.reutilises} document(s) repris de la dernière vérification, "
+                  f"{self.manifeste.extraits} (ré)extrait(s)")
+            
+            if self.cache_ocr is not None:
+                print(f"💾 Cache OCR: {self.cache_ocr.statistiques()}")
+            if self.cascade_active:
+                print(f"🪜 Cascade OCR: {self.statistiques_cascade}")
+            if self.statistiques_recadrage["pages"]:
+                print(f"✂️ Recadrage: {self.statistiques_recadrage}")
             
+            self._emettre_progression("termine", "Vérification terminée")
+            self._sauvegarder_metriques(json_path)
             print("\n🎉 === VÉRIFICATION TERMINÉE AVEC SUCCÈS ===")
             return resultat
             
@@ -254,6 +633,11 @@ class AgentVerificationScolaireAdmin:
         
         print("🔍 Recherche du formulaire candidature...")
         
+        # Formulaire déclaré à la soumission
+        for entree in self._fichiers_soumission(ROLE_FORMULAIRE):
+            print(f"✅ Formulaire trouvé via le manifeste: {entree.name}")
+            return entree
+        
         # Chercher par patterns de nom
         for pattern in self.patterns_formulaire:
             fichiers = list(self.dossier_candidature.glob(f"{pattern}.pdf"))
@@ -276,19 +660,40 @@ class AgentVerificationScolaireAdmin:
         
         raise FileNotFoundError("❌ Aucun formulaire de candidature trouvé")
     
+    def _fichiers_soumission(self, role: str) -> List[Path]:
+        """PDFs d'un rôle déclarés dans manifest.json et toujours présents dans le dossier"""
+        
+        fichiers = []
+        for entree in self._entrees_soumission.values():
+            chemin = self.dossier_candidature / entree["name"]
+            if entree["role"] == role and chemin.suffix.lower() == ".pdf" and chemin.is_file():
+                fichiers.append(chemin)
+        return fichiers
+    
+    def _empreinte_fichier(self, chemin: Path) -> str:
+        """SHA-256 d'un document: celui du manifeste de soumission si le fichier n'a pas changé depuis"""
+        
+        if chemin.name not in self._empreintes_fichiers:
+            entree = self._entrees_soumission.get(chemin.name)
+            empreinte = empreinte_si_inchangee(entree, chemin) if entree else None
+            self._empreintes_fichiers[chemin.name] = empreinte or calculer_sha256_fichier(chemin)
+        return self._empreintes_fichiers[chemin.name]
+    
     def _trouver_bulletins(self) -> List[Path]:
         """Trouve tous les bulletins scolaires avec détection intelligente"""
         
         print("🔍 Recherche des bulletins scolaires...")
         
-        bulletins = []
-        
-        # Chercher par patterns spécialisés
+        # Bulletins déclarés à la soumission, plus ceux déposés depuis (patterns spécialisés)
+        bulletins = self._fichiers_soumission(ROLE_BULLETIN)
         for pattern in self.patterns_bulletins:
-            bulletins.extend(self.dossier_candidature.glob(f"{pattern}.pdf"))
+            bulletins.extend(
+                pdf for pdf in self.dossier_candidature.glob(f"{pattern}.pdf")
+                if pdf.name not in self._entrees_soumission
+            )
         
-        # Dédupliquer
-        bulletins = list(set(bulletins))
+        # Dédupliquer par chemin (plusieurs patterns), puis par contenu
+        bulletins = self._dedupliquer_bulletins(sorted(set(bulletins)))
         
         if bulletins:
             print(f"✅ {len(bulletins)} bulletins trouvés:")
@@ -300,22 +705,137 @@ class AgentVerificationScolaireAdmin:
         
         return bulletins
     
-    def _extraire_notes_formulaire(self, formulaire_pdf: Path) -> List[NoteDeclaree]:
-        """Extrait les notes déclarées du formulaire PDF via OCR"""
+    def _dedupliquer_bulletins(self, bulletins: List[Path]) -> List[Path]:
+        """
+        Écarte les bulletins au contenu identique (même PDF déposé pour plusieurs années):
+        seul le premier est analysé, les copies sont signalées dans le rapport.
+        """
         
-        print(f"📋 Extraction des notes du formulaire: {formulaire_pdf.name}")
-        notes = []
+        uniques: Dict[str, Path] = {}
+        for bulletin in bulletins:
+            try:
+                empreinte = self._empreinte_fichier(bulletin)
+            except OSError as e:
+                print(f"   ⚠️ Empreinte impossible pour {bulletin.name}: {e}")
+                empreinte = f"illisible:{bulletin}"
+            
+            self._empreintes_fichiers[bulletin.name] = empreinte
+            original = uniques.setdefault(empreinte, bulletin)
+            if original is not bulletin:
+                print(f"   ♻️ {bulletin.name} identique à {original.name}: analysé une seule fois")
+                self.doublons.append(f"Fichier {bulletin.name} identique à {original.name}")
+        
+        return list(uniques.values())
+    
+    def _obtenir_notes_declarees(self, formulaire_pdf: Path) -> Tuple[List[NoteDeclaree], str, str, float]:
+        """Notes déclarées: résumé JSON de la soumission, sinon extraction du manifeste, sinon OCR"""
+        
+        sha256 = self._empreinte_fichier(formulaire_pdf)
+        
+        donnees = self._charger_resume_candidature(formulaire_pdf)
+        
+        if donnees is None and self.manifeste is not None:
+            extraction = self.manifeste.lire_formulaire(formulaire_pdf.name, sha256)
+            if extraction is not None:
+                print(f"   ♻️ Formulaire inchangé: {len(extraction['notes'])} notes reprises du manifeste")
+                donnees = ([NoteDeclaree(**n) for n in extraction["notes"]],
+                           extraction["nom"], extraction["prenom"], extraction["moyenne"])
+        
+        self._formulaire_extrait = donnees is None
+        if donnees is None:
+            # Formulaire externe ou modifié: OCR du PDF (un seul appel par page)
+            donnees = self._extraire_formulaire(formulaire_pdf)
+        
+        notes, nom, prenom, moyenne = donnees
+        if notes:  # Extraction en échec: pas mémorisée, retentée à la prochaine vérification
+            self.manifeste.ecrire_formulaire(formulaire_pdf.name, sha256, {
+                "notes": [asdict(n) for n in notes], "nom": nom, "prenom": prenom, "moyenne": moyenne
+            })
+        return donnees
+    
+    def _resultat_precedent(self, empreinte_entrees: str, nb_bulletins: int) -> Optional[ResultatVerification]:
+        """Dernier résultat si aucun document n'a été ré-extrait depuis la dernière vérification"""
+        
+        if not self.incrementale or self._formulaire_extrait or self.manifeste.extraits \
+                or len(self.manifeste.bulletins) != nb_bulletins:
+            return None
+        
+        precedent = self.manifeste.resultat_reutilisable(empreinte_entrees)
+        if precedent is None:
+            return None
         
         try:
-            # Utiliser OCR pour extraire les notes du formulaire
-            images = self._convertir_pdf_en_images([formulaire_pdf])
+            with open(precedent["json"], "r", encoding="utf-8") as f:
+                resultat = ResultatVerification.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"   ⚠️ Résultat précédent illisible ({e}): nouveau rapport")
+            return None
+        
+        print(f"♻️ Aucun document modifié depuis le {resultat.timestamp}: rapport {Path(precedent['json']).name} conservé")
+        return resultat
+    
+    def _charger_resume_candidature(self, formulaire_pdf: Path) -> Optional[Tuple[List[NoteDeclaree], str, str, float]]:
+        """
+        Charge les notes déclarées depuis resume_candidature.json (écrit à la soumission).
+        Utilisé uniquement si l'empreinte enregistrée correspond au formulaire PDF présent.
+        """
+        
+        resume_path = self.dossier_candidature / "resume_candidature.json"
+        if not resume_path.exists():
+            return None
+        
+        try:
+            with open(resume_path, "r", encoding="utf-8") as f:
+                resume = json.load(f)
+            
+            formulaire = resume.get("formulaire") or {}
+            if formulaire.get("nom_fichier") != formulaire_pdf.name or \
+                    formulaire.get("sha256") != self._empreinte_fichier(formulaire_pdf):
+                print("   ⚠️ Résumé JSON non associé à ce formulaire: extraction OCR")
+                return None
+            
+            notes = [
+                NoteDeclaree(
+                    matiere=str(note_data.get("matiere", "")).lower().strip(),
+                    note=float(note_data["note"]),
+                    coefficient=int(note_data.get("coefficient", 1) or 1),
+                    periode=str(note_data.get("periode", "")).strip(),
+                    niveau=str(note_data.get("annee", "")).strip()
+                )
+                for note_data in resume.get("notes", [])
+                if note_data.get("matiere") and note_data.get("note") is not None
+            ]
             
+            candidat = resume.get("candidat", {})
+            nom = candidat.get("nom") or "INCONNU"
+            prenom = candidat.get("prenom") or "INCONNU"
+            moyenne = float(resume.get("statistiques", {}).get("moyenne_generale", 0.0) or 0.0)
+            
+            print(f"   ⚡ Notes déclarées lues depuis {resume_path.name} ({len(notes)} notes, sans OCR)")
+            return notes, nom, prenom, moyenne
+            
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            print(f"   ⚠️ Résumé JSON inutilisable ({e}): extraction OCR")
+            return None
+    
+    def _extraire_formulaire(self, formulaire_pdf: Path) -> Tuple[List[NoteDeclaree], str, str, float]:
+        """Extrait notes déclarées, nom, prénom et moyenne du formulaire PDF en un seul appel OCR par page"""
+        
+        print(f"📋 Extraction du formulaire: {formulaire_pdf.name}")
+        notes = []
+        nom, prenom, moyenne = None, None, None
+        
+        try:
             prompt_formulaire = """Tu es un expert en analyse de formulaires de candidature scolaire français.
 
-Analyse ce formulaire de candidature et extrait TOUTES les notes déclarées par le candidat.
+Analyse ce formulaire de candidature et extrait les informations personnelles du candidat
+ainsi que TOUTES les notes déclarées par le candidat.
 
-Format de sortie JSON attendu:
+Réponds uniquement avec un objet JSON de la forme:
 {
+  "nom": "OUATTARA",
+  "prenom": "Ismael",
+  "moyenne_generale": 11.54,
   "notes_declarees": [
     {
       "matiere": "francais",
@@ -335,167 +855,66 @@ Format de sortie JSON attendu:
 }
 
 RÈGLES IMPORTANTES:
-1. Cherche la section "RELEVÉ DE NOTES" ou "NOTES SAISIES" ou "BULLETINS"
-2. Normalise les matières: "francais", "anglais", "maths", "histoire", "svt", "physique", etc.
-3. Normalise les périodes: "1er trimestre", "2ème trimestre", "3ème trimestre"
-4. Normalise les niveaux: "2nde", "1ère", "terminale"
-5. Extrait UNIQUEMENT les notes déclarées par le candidat (pas d'invention)
-6. Si une note est sur /20, garde la valeur. Si sur autre base, convertis sur /20
-7. Coefficient par défaut = 1 si non spécifié"""
+1. Identité: section "INFORMATIONS PERSONNELLES" ou similaire, nom et prénom EXACTS
+2. Moyenne: "Moyenne générale" déclarée par le candidat
+3. Notes: section "RELEVÉ DE NOTES" ou "NOTES SAISIES" ou "BULLETINS"
+4. Normalise les matières: "francais", "anglais", "maths", "histoire", "svt", "physique", etc.
+5. Normalise les périodes: "1er trimestre", "2ème trimestre", "3ème trimestre"
+6. Normalise les niveaux: "2nde", "1ère", "terminale"
+7. Extrait UNIQUEMENT les informations présentes (pas d'invention), null pour les champs non trouvés
+8. Si une note est sur /20, garde la valeur. Si sur autre base, convertis sur /20
+9. Coefficient par défaut = 1 si non spécifié"""
 
-            for image_path in images:
-                try:
-                    print(f"   🔍 Analyse OCR de: {image_path.name}")
-                    
-                    with open(image_path, "rb") as f:
-                        image_b64 = base64.b64encode(f.read()).decode()
-                    
-                    response = self.client_openai.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {"role": "system", "content": prompt_formulaire},
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"type": "text", "text": "Analyse ce formulaire et extrait les notes déclarées:"},
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {"url": f"data:image/png;base64,{image_b64}"}
-                                    }
-                                ]
-                            }
-                        ],
-                        max_tokens=2000,
-                        temperature=0.1
+            # Rendu et analyse des pages en flux, résultats relus dans l'ordre des pages
+            resultats = self._analyser_en_flux(
+                enumerate(self._convertir_pdf_en_images([formulaire_pdf])),
+                prompt_formulaire, "Analyse ce formulaire et extrait l'identité et les notes déclarées:",
+                2000, FormulaireSchema,
+                etape="formulaire", total_pages=self._compter_pages([formulaire_pdf])
+            )
+            
+            for index in sorted(resultats):
+                data = resultats[index]
+                if data is None:
+                    continue
+                
+                # Identité: première page qui la contient
+                nom = nom or data["nom"]
+                prenom = prenom or data["prenom"]
+                if moyenne is None:
+                    moyenne = data["moyenne_generale"]
+                
+                # Convertir en objets NoteDeclaree
+                for note_data in data["notes_declarees"]:
+                    note = NoteDeclaree(
+                        matiere=note_data["matiere"].lower().strip(),
+                        note=note_data["note"],
+                        coefficient=note_data["coefficient"],
+                        periode=note_data["periode"].strip(),
+                        niveau=note_data["niveau"].strip()
                     )
+                    notes.append(note)
+                    print(f"      ✓ Note extraite: {note.matiere} = {note.note}/20 ({note.periode}, {note.niveau})")
                     
-                    contenu = response.choices[0].message.content
-                    print(f"   📝 Réponse OCR reçue: {len(contenu)} caractères")
-                    
-                    # Parser la réponse JSON
-                    if "```json" in contenu:
-                        contenu = contenu.split("```json")[1].split("```")[0]
-                    elif "```" in contenu:
-                        contenu = contenu.split("```")[1].split("```")[0]
-                    
-                    data = json.loads(contenu.strip())
-                    
-                    # Convertir en objets NoteDeclaree
-                    for note_data in data.get("notes_declarees", []):
-                        try:
-                            note = NoteDeclaree(
-                                matiere=note_data.get("matiere", "").lower().strip(),
-                                note=float(note_data.get("note", 0)),
-                                coefficient=int(note_data.get("coefficient", 1)),
-                                periode=note_data.get("periode", "").strip(),
-                                niveau=note_data.get("niveau", "").strip()
-                            )
-                            notes.append(note)
-                            print(f"      ✓ Note extraite: {note.matiere} = {note.note}/20 ({note.periode}, {note.niveau})")
-                        except (ValueError, TypeError) as e:
-                            print(f"      ⚠️ Erreur parsing note: {e}")
-                            continue
-                        
-                except json.JSONDecodeError as e:
-                    print(f"      ❌ Erreur JSON pour {image_path.name}: {e}")
-                    print(f"      Contenu reçu: {contenu[:200]}...")
-                except Exception as e:
-                    print(f"      ❌ Erreur OCR pour {image_path.name}: {e}")
-                    
+        except ErreurServiceOCR:
+            raise  # API OCR en échec: la vérification échoue plutôt que de continuer sans notes
         except Exception as e:
             print(f"❌ Erreur générale extraction formulaire: {e}")
         
-        print(f"📋 Résultat: {len(notes)} notes extraites du formulaire")
-        return notes
-    
-    def _extraire_infos_candidat(self, formulaire_pdf: Path) -> Tuple[str, str, float]:
-        """Extrait nom, prénom et moyenne du candidat via OCR"""
-        
-        print(f"👤 Extraction des informations candidat de: {formulaire_pdf.name}")
-        
-        try:
-            # Utiliser OCR pour extraire les infos candidat
-            images = self._convertir_pdf_en_images([formulaire_pdf])
-            
-            prompt_candidat = """Tu es un expert en analyse de formulaires de candidature.
-
-Analyse ce formulaire et extrait les informations personnelles du candidat.
-
-Format JSON attendu:
-{
-  "nom": "OUATTARA",
-  "prenom": "Ismael", 
-  "moyenne_generale": 11.54
-}
-
-RÈGLES:
-1. Cherche la section "INFORMATIONS PERSONNELLES" ou similaire
-2. Extrait le nom et prénom EXACT du candidat
-3. Cherche "Moyenne générale" déclarée par le candidat
-4. Ne pas inventer d'informations manquantes
-5. Retourne null pour les champs non trouvés"""
-
-            for image_path in images:
-                try:
-                    with open(image_path, "rb") as f:
-                        image_b64 = base64.b64encode(f.read()).decode()
-                    
-                    response = self.client_openai.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {"role": "system", "content": prompt_candidat},
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"type": "text", "text": "Extrait les infos personnelles du candidat:"},
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {"url": f"data:image/png;base64,{image_b64}"}
-                                    }
-                                ]
-                            }
-                        ],
-                        max_tokens=500,
-                        temperature=0.1
-                    )
-                    
-                    contenu = response.choices[0].message.content
-                    
-                    # Parser la réponse JSON
-                    if "```json" in contenu:
-                        contenu = contenu.split("```json")[1].split("```")[0]
-                    elif "```" in contenu:
-                        contenu = contenu.split("```")[1].split("```")[0]
-                    
-                    data = json.loads(contenu.strip())
-                    
-                    nom = data.get("nom", "INCONNU") or "INCONNU"
-                    prenom = data.get("prenom", "INCONNU") or "INCONNU"
-                    moyenne = float(data.get("moyenne_generale", 0.0) or 0.0)
-                    
-                    print(f"   ✅ Candidat identifié: {prenom} {nom} (moyenne: {moyenne}/20)")
-                    return nom, prenom, moyenne
-                    
-                except json.JSONDecodeError as e:
-                    print(f"   ❌ Erreur JSON extraction candidat: {e}")
-                except Exception as e:
-                    print(f"   ❌ Erreur OCR candidat: {e}")
-            
-            # Fallback si OCR échoue - essayer d'extraire du nom de dossier
+        # Fallback si OCR échoue - essayer d'extraire du nom de dossier
+        if not nom or not prenom:
             nom_dossier = self.dossier_candidature.name
-            if "_" in nom_dossier:
-                parts = nom_dossier.split("_")
-                if len(parts) >= 2:
-                    nom_fallback = parts[0].upper()
-                    prenom_fallback = parts[1].capitalize()
-                    print(f"   🔄 Fallback depuis nom dossier: {prenom_fallback} {nom_fallback}")
-                    return nom_fallback, prenom_fallback, 0.0
-            
-            return "INCONNU", "INCONNU", 0.0
-            
-        except Exception as e:
-            print(f"❌ Erreur extraction infos candidat: {e}")
-            return "INCONNU", "INCONNU", 0.0
+            parts = nom_dossier.split("_")
+            if len(parts) >= 2:
+                nom, prenom = parts[0].upper(), parts[1].capitalize()
+                print(f"   🔄 Fallback depuis nom dossier: {prenom} {nom}")
+            else:
+                nom, prenom = "INCONNU", "INCONNU"
+        
+        moyenne = float(moyenne or 0.0)
+        print(f"   ✅ Candidat identifié: {prenom} {nom} (moyenne: {moyenne}/20)")
+        print(f"📋 Résultat: {len(notes)} notes extraites du formulaire")
+        return notes, nom, prenom, moyenne
     
     def _extraire_notes_bulletins(self, bulletins_pdf: List[Path]) -> List[NoteBulletin]:
         """Extrait les notes des bulletins officiels via OCR"""
@@ -507,7 +926,7 @@ RÈGLES:
 
 Analyse ce bulletin scolaire et extrait TOUTES les notes visibles.
 
-Format JSON attendu:
+Réponds uniquement avec un objet JSON de la forme:
 {
   "bulletin": {
     "periode": "1er trimestre",
@@ -538,277 +957,610 @@ RÈGLES IMPORTANTES:
 5. Ne pas inventer de données manquantes
 6. Ignore les moyennes de classe, ne garde que les notes individuelles de l'élève"""
 
+        # Rendu (producteur) et OCR vision (consommateurs) se chevauchent:
+        # la page N+1 est rendue pendant que la page N est en cours d'analyse
+        pages = []  # [bulletin, libellé page, données extraites, index de l'original si doublon, empreinte]
+        total_pages = self._compter_pages(bulletins_pdf)
+        resultats = self._analyser_en_flux(
+            self._produire_pages_bulletins(bulletins_pdf, pages, total_pages),
+            prompt_systeme,
+            "Analyse ce bulletin scolaire et extrait toutes les notes:",
+            2000,
+            BulletinSchema,
+            etape="bulletins", total_pages=total_pages
+        )
+        
+        # Page recadrée sans période ou niveau: l'en-tête était hors de la zone, page entière ré-analysée
+        a_reprendre = {
+            index: self._pages_recadrees[index] for index, data in resultats.items()
+            if index in self._pages_recadrees and data is not None and not self._entete_lu(data)
+        }
+        if a_reprendre:
+            print(f"   🔁 {len(a_reprendre)} page(s) recadrée(s) sans période ou niveau: nouvelle analyse en page entière")
+            reprises = self._analyser_en_flux(
+                self._rendre_pages_entieres(a_reprendre, pages),
+                prompt_systeme,
+                "Analyse ce bulletin scolaire et extrait toutes les notes:",
+                2000,
+                BulletinSchema,
+                etape=None
+            )
+            resultats.update((index, data) for index, data in reprises.items() if data is not None)
+        
+        for index, data in resultats.items():
+            pages[index][2] = data
+        
+        # Pages en double: résultat de la page originale, notes comptées une seule fois
+        doublons = [page for page in pages if page[3] is not None]
+        for page in doublons:
+            page[2] = pages[page[3]][2]
+        pages_texte = len(pages) - len(resultats) - len(doublons) - self._pages_reprises
+        print(f"   📝 {pages_texte}/{len(pages)} pages lues via la couche texte"
+              f"{f', {self._pages_reprises} reprise(s) du manifeste' if self._pages_reprises else ''}"
+              f"{f', {len(doublons)} page(s) en double' if doublons else ''}")
+        
+        self._memoriser_extractions_bulletins(pages)
+        
+        # Fusion dans l'ordre déterministe bulletin puis page
+        for bulletin_pdf, libelle_page, data, doublon_de, _ in pages:
+            if data is None:
+                continue
+            if doublon_de is not None:
+                print(f"   ♻️ {libelle_page}: identique à {pages[doublon_de][1]}, notes déjà comptées")
+                continue
+            
+            # Extraire les infos du bulletin
+            bulletin_info = data["bulletin"]
+            periode = bulletin_info["periode"]
+            niveau = bulletin_info["niveau"]
+            etablissement = bulletin_info["etablissement"]
+            
+            # Convertir en objets NoteBulletin
+            notes_dans_bulletin = 0
+            for note_data in bulletin_info["notes"]:
+                note = NoteBulletin(
+                    matiere=note_data["matiere"].lower().strip(),
+                    note=float(note_data["note"]),
+                    periode=periode,
+                    niveau=niveau,
+                    etablissement=etablissement
+                )
+                notes_bulletins.append(note)
+                notes_dans_bulletin += 1
+                print(f"      ✓ Note extraite: {note.matiere} = {note.note}/20 ({note.periode}, {note.niveau})")
+            
+            print(f"   ✅ {notes_dans_bulletin} notes extraites de {libelle_page} ({bulletin_pdf.name})")
+        
+        print(f"📚 Résultat: {len(notes_bulletins)} notes extraites au total des bulletins")
+        return notes_bulletins
+    
+    def _produire_pages_bulletins(self, bulletins_pdf: List[Path], pages: List[list],
+                                  total_pages: int = 0) -> Iterator[Tuple[int, PageRendue]]:
+        """
+        Producteur: parcourt les bulletins page par page et enregistre chaque page dans `pages`.
+        Les pages lisibles via la couche texte sont résolues directement; seules les pages
+        scannées ou peu fiables sont rendues et émises (index, image) pour l'OCR vision.
+        Une page identique à une page déjà vue (même contenu extrait ou même rendu)
+        n'est pas renvoyée à l'OCR: elle reprendra le résultat de l'original.
+        """
+        
+        empreintes: Dict[str, int] = {}  # empreinte -> index de la première page
+        
+        def enregistrer(bulletin_pdf: Path, nom: str, data: Optional[dict], empreinte: str) -> bool:
+            """Ajoute la page à `pages`; True si c'est une nouvelle page"""
+            original = empreintes.get(empreinte)
+            if original is not None:
+                self.doublons.append(
+                    f"Page {nom} ({bulletin_pdf.name}) identique à {pages[original][1]} ({pages[original][0].name})"
+                )
+            else:
+                empreintes[empreinte] = len(pages)
+            pages.append([bulletin_pdf, nom, data if original is None else None, original, empreinte])
+            return original is None
+        
         for bulletin_pdf in bulletins_pdf:
+            # Bulletin inchangé depuis la dernière vérification: pages reprises du manifeste
+            pages_connues = None
+            if self.manifeste is not None:
+                pages_connues = self.manifeste.lire_bulletin(bulletin_pdf.name, self._empreintes_fichiers.get(bulletin_pdf.name))
+            if pages_connues is not None:
+                print(f"   ♻️ {bulletin_pdf.name} inchangé: {len(pages_connues)} page(s) reprise(s) du manifeste")
+                for page_connue in pages_connues:
+                    if enregistrer(bulletin_pdf, page_connue["nom"], page_connue["data"], page_connue["empreinte"]):
+                        self._pages_reprises += 1
+                    self._signaler_page("bulletins", page_connue["nom"], total_pages, 0.0)
+                continue
+            
             try:
                 print(f"   📖 Analyse du bulletin: {bulletin_pdf.name}")
-                
-                # Convertir PDF en images
-                images = self._convertir_pdf_en_images([bulletin_pdf])
-                
-                for image_path in images:
-                    try:
-                        # Encoder l'image
-                        with open(image_path, "rb") as f:
-                            image_b64 = base64.b64encode(f.read()).decode()
-                        
-                        # Appel OCR OpenAI
-                        response = self.client_openai.chat.completions.create(
-                            model="gpt-4o",
-                            messages=[
-                                {"role": "system", "content": prompt_systeme},
-                                {
-                                    "role": "user",
-                                    "content": [
-                                        {"type": "text", "text": "Analyse ce bulletin scolaire et extrait toutes les notes:"},
-                                        {
-                                            "type": "image_url",
-                                            "image_url": {"url": f"data:image/png;base64,{image_b64}"}
-                                        }
-                                    ]
-                                }
-                            ],
-                            max_tokens=2000,
-                            temperature=0.1
-                        )
-                        
-                        # Parser la réponse
-                        contenu = response.choices[0].message.content
+                doc = fitz.open(bulletin_pdf)
+                try:
+                    for i, page in enumerate(doc):
+                        nom = f"{bulletin_pdf.stem}_page_{i+1:02d}"
+                        debut_page = time.perf_counter()
+                        data = self._lire_couche_texte(page, i)
                         
-                        try:
-                            # Nettoyer le JSON
-                            if "```json" in contenu:
-                                contenu = contenu.split("```json")[1].split("```")[0]
-                            elif "```" in contenu:
-                                contenu = contenu.split("```")[1].split("```")[0]
-                            
-                            data = json.loads(contenu.strip())
-                            
-                            # Extraire les infos du bulletin
-                            bulletin_info = data.get("bulletin", {})
-                            periode = bulletin_info.get("periode", "")
-                            niveau = bulletin_info.get("niveau", "")
-                            etablissement = bulletin_info.get("etablissement", "")
-                            
-                            # Convertir en objets NoteBulletin
-                            notes_dans_bulletin = 0
-                            for note_data in bulletin_info.get("notes", []):
-                                try:
-                                    note = NoteBulletin(
-                                        matiere=note_data.get("matiere", "").lower().strip(),
-                                        note=float(note_data.get("note", 0)),
-                                        periode=periode,
-                                        niveau=niveau,
-                                        etablissement=etablissement
-                                    )
-                                    notes_bulletins.append(note)
-                                    notes_dans_bulletin += 1
-                                    print(f"      ✓ Note extraite: {note.matiere} = {note.note}/20 ({note.periode}, {note.niveau})")
-                                except (ValueError, TypeError) as e:
-                                    print(f"      ⚠️ Erreur conversion note: {e}")
-                                    continue
-                            
-                            print(f"   ✅ {notes_dans_bulletin} notes extraites de {bulletin_pdf.name}")
-                            
-                        except json.JSONDecodeError as e:
-                            print(f"      ❌ Erreur JSON pour {image_path.name}: {e}")
-                            print(f"      Contenu reçu: {contenu[:200]}...")
-                            
-                    except Exception as e:
-                        print(f"      ❌ Erreur traitement image {image_path.name}: {e}")
+                        if data is not None:
+                            empreinte = hashlib.sha256(
+                                json.dumps(data["bulletin"], sort_keys=True).encode()
+                            ).hexdigest()
+                            enregistrer(bulletin_pdf, nom, data, f"texte:{empreinte}")
+                            self._signaler_page("bulletins", nom, total_pages,
+                                                (time.perf_counter() - debut_page) * 1000)
+                            continue
                         
+                        image = self._rendre_page_bulletin(page, nom)
+                        if enregistrer(bulletin_pdf, nom, None, f"image:{hashlib.sha256(image.donnees).hexdigest()}"):
+                            if image.recadree:
+                                self._pages_recadrees[len(pages) - 1] = (bulletin_pdf, i)
+                            yield len(pages) - 1, image
+                        else:
+                            print(f"      ♻️ {nom}: rendu identique à une page déjà envoyée, OCR évité")
+                            self._signaler_page("bulletins", nom, total_pages,
+                                                (time.perf_counter() - debut_page) * 1000)
+                finally:
+                    doc.close()
             except Exception as e:
                 print(f"   ❌ Erreur traitement bulletin {bulletin_pdf.name}: {e}")
-        
-        print(f"📚 Résultat: {len(notes_bulletins)} notes extraites au total des bulletins")
-        return notes_bulletins
+                self._bulletins_incomplets.add(bulletin_pdf)
     
-    def _convertir_pdf_en_images(self, pdfs: List[Path]) -> List[Path]:
-        """Convertit les PDFs en images haute qualité pour OCR"""
+    @staticmethod
+    def _entete_lu(data: dict) -> bool:
+        """Période et niveau lus: les notes de la page peuvent être appariées aux notes déclarées"""
+        bulletin = data["bulletin"]
+        return bool(bulletin.get("periode")) and bool(bulletin.get("niveau"))
+    
+    def _rendre_pages_entieres(self, a_reprendre: Dict[int, Tuple[Path, int]],
+                               pages: List[list]) -> Iterator[Tuple[int, PageRendue]]:
+        """Rend sans recadrage les pages `a_reprendre` ({index: (bulletin, numéro de page)})"""
         
-        images_generees = []
+        par_bulletin: Dict[Path, List[Tuple[int, int]]] = {}
+        for index, (bulletin_pdf, numero) in a_reprendre.items():
+            par_bulletin.setdefault(bulletin_pdf, []).append((index, numero))
         
-        for pdf_path in pdfs:
+        for bulletin_pdf, pages_bulletin in par_bulletin.items():
             try:
-                print(f"   🖼️ Conversion PDF → Images: {pdf_path.name}")
-                
-                doc = fitz.open(pdf_path)
-                base_name = pdf_path.stem
-                
-                for i, page in enumerate(doc):
-                    # Configuration optimale pour OCR
-                    zoom = 300 / 72  # 300 DPI pour excellente qualité OCR
-                    mat = fitz.Matrix(zoom, zoom)
-                    pix = page.get_pixmap(matrix=mat)
-                    
-                    image_path = self.dossier_images / f"{base_name}_page_{i+1:02d}.png"
-                    pix.save(image_path)
-                    images_generees.append(image_path)
-                    print(f"      ✓ Image générée: {image_path.name}")
-                
-                doc.close()
-                
+                doc = fitz.open(bulletin_pdf)
+                try:
+                    for index, numero in pages_bulletin:
+                        yield index, self._rendre_page(doc[numero], pages[index][1])
+                finally:
+                    doc.close()
             except Exception as e:
-                print(f"   ❌ Erreur conversion {pdf_path.name}: {e}")
+                print(f"   ❌ Erreur rendu pleine page {bulletin_pdf.name}: {e}")
+    
+    def _memoriser_extractions_bulletins(self, pages: List[list]):
+        """Enregistre dans le manifeste les pages extraites de chaque bulletin entièrement lu"""
+        
+        if self.manifeste is None:
+            return
+        
+        par_bulletin: Dict[Path, List[dict]] = {}
+        for bulletin_pdf, nom, data, _, empreinte in pages:
+            par_bulletin.setdefault(bulletin_pdf, []).append({"nom": nom, "empreinte": empreinte, "data": data})
+        
+        entrees = {}
+        for bulletin_pdf, pages_bulletin in par_bulletin.items():
+            # Bulletin illisible ou page en échec: sera ré-analysé à la prochaine vérification
+            if bulletin_pdf in self._bulletins_incomplets or any(p["data"] is None for p in pages_bulletin):
+                continue
+            entrees[bulletin_pdf.name] = {
+                "sha256": self._empreintes_fichiers[bulletin_pdf.name],
+                "pages": pages_bulletin
+            }
+        self.manifeste.ecrire_bulletins(entrees)
+    
+    def _lire_couche_texte(self, page, index_page: int) -> Optional[dict]:
+        """
+        Lit les notes depuis la couche texte d'une page (bulletins exportés des ENT).
+        Retourne None si la page doit passer en OCR vision.
+        """
+        
+        if not AGENT_OCR_CONFIG["couche_texte_active"]:
+            return None
+        
+        data = extraire_notes_couche_texte(
+            page,
+            seuil_confiance=AGENT_OCR_CONFIG["couche_texte_seuil_confiance"],
+            min_notes=AGENT_OCR_CONFIG["couche_texte_min_notes"]
+        )
+        
+        if data is not None:
+            # Aligner les matières sur les noms normalisés des prompts OCR
+            for note_data in data["bulletin"]["notes"]:
+                note_data["matiere"] = self._normaliser_matiere(note_data["matiere"])
+            print(f"      ⚡ Page {index_page+1}: couche texte exploitée (confiance {data['confiance']:.0%})")
+        else:
+            print(f"      🖼️ Page {index_page+1}: OCR vision requis")
         
-        return images_generees
+        return data
     
-    def _comparer_notes(self, notes_declarees: List[NoteDeclaree], notes_bulletins: List[NoteBulletin]) -> List[Discordance]:
-        """Compare les notes déclarées avec les notes des bulletins"""
+    def _normaliser_matiere(self, matiere: str) -> str:
+        """Ramène un libellé de matière à sa forme normalisée ("Anglais LV1" -> "anglais")"""
         
-        print(f"⚖️ Comparaison de {len(notes_declarees)} notes déclarées avec {len(notes_bulletins)} notes de bulletins")
-        discordances = []
+        m = matiere.lower().strip()
+        candidats = [m, m.replace(" ", "-")] + [mot for mot in re.split(r"[\s\-]+", m) if mot]
         
-        for note_dec in notes_declarees:
-            # Chercher la note correspondante dans les bulletins
-            note_correspondante = None
-            
-            for note_bul in notes_bulletins:
-                if (self._matcher_matiere(note_dec.matiere, note_bul.matiere) and
-                    self._matcher_periode(note_dec.periode, note_bul.periode) and
-                    self._matcher_niveau(note_dec.niveau, note_bul.niveau)):
-                    note_correspondante = note_bul
-                    break
-            
-            if note_correspondante:
-                ecart = abs(note_dec.note - note_correspondante.note)
-                
-                if ecart > self.seuil_leger:
-                    # Déterminer la gravité
-                    if ecart <= self.seuil_modere:
-                        gravite = "MODERE"
-                    else:
-                        gravite = "GRAVE"
-                    
-                    discordance = Discordance(
-                        matiere=note_dec.matiere,
-                        periode=note_dec.periode,
-                        niveau=note_dec.niveau,
-                        note_declaree=note_dec.note,
-                        note_bulletin=note_correspondante.note,
-                        ecart=ecart,
-                        gravite=gravite
-                    )
-                    discordances.append(discordance)
-                    
-                    symbole = "🔥" if gravite == "GRAVE" else "⚠️"
-                    print(f"   {symbole} DISCORDANCE {gravite}: {note_dec.matiere} - Déclaré: {note_dec.note}/20, Réel: {note_correspondante.note}/20 (écart: {ecart:.2f})")
-                else:
-                    print(f"   ✅ Concordance: {note_dec.matiere} - {note_dec.note}/20 vs {note_correspondante.note}/20 (écart acceptable: {ecart:.2f})")
+        for candidat in candidats:
+            for base in CORRESPONDANCES_MATIERES:
+                if self._matcher_matiere(base, candidat):
+                    return base
+        
+        return m
+    
+    def _analyser_image(self, image: PageRendue, prompt: str, consigne: str, max_tokens: int,
+                        schema: Type[BaseModel]) -> Optional[dict]:
+        """
+        Analyse une page et retourne le dictionnaire validé (None si la page n'a pas pu être lue).
+        
+        Sans cascade, la page passe par le moteur configuré. Avec cascade, le moteur rapide
+        lit d'abord la page; elle n'est renvoyée au modèle vision principal que si la réponse
+        est invalide, hors bornes ou en désaccord avec les notes déclarées.
+        """
+        
+        moteur_principal = self.moteur_ocr if self.moteur_ocr.supporte(schema) else self._moteur_vision
+        if not self.cascade_active or moteur_principal is not self.moteur_ocr:
+            return self._analyser_avec_moteur(moteur_principal, image, prompt, consigne, max_tokens, schema)
+        
+        data = self._analyser_avec_moteur(self._moteur_rapide, image, prompt, consigne, max_tokens, schema)
+        motif = self._motif_escalade(data, schema)
+        
+        with self._verrou_progression:
+            stats = self.statistiques_cascade
+            stats["pages"] += 1
+            if motif is None:
+                stats["acceptees_rapide"] += 1
             else:
-                print(f"   ❓ Note non trouvée dans bulletins: {note_dec.matiere} ({note_dec.periode}, {note_dec.niveau})")
+                stats["escaladees"] += 1
+                stats["motifs"][motif] = stats["motifs"].get(motif, 0) + 1
+        
+        if motif is None:
+            return data
+        
+        print(f"   🪜 Escalade {image.nom} vers {self._moteur_vision.identifiant} (motif: {motif})")
+        data_expert = self._analyser_avec_moteur(self._moteur_vision, image, prompt, consigne, max_tokens, schema)
+        
+        if data_expert is not None and self._motif_escalade(data_expert, schema) in (None, "desaccord"):
+            with self._verrou_progression:
+                self.statistiques_cascade["acceptees_expert"] += 1
         
-        return discordances
+        # Réponse du modèle principal, sinon la meilleure réponse disponible
+        return data_expert if data_expert is not None else data
     
-    def _identifier_notes_non_verifiables(self, notes_declarees: List[NoteDeclaree], notes_bulletins: List[NoteBulletin]) -> List[str]:
-        """Identifie les notes déclarées qui n'ont pas pu être vérifiées"""
+    def _motif_escalade(self, data: Optional[dict], schema: Type[BaseModel]) -> Optional[str]:
+        """Raison de renvoyer une page au modèle principal (None si la réponse est acceptée)"""
         
-        non_verifiables = []
+        if data is None:
+            return "schema"  # Réponse absente ou invalide
+        
+        if schema is FormulaireSchema:
+            notes = data["notes_declarees"]
+        elif schema is BulletinSchema:
+            notes = data["bulletin"]["notes"]
+        else:
+            return None
         
+        if not notes:
+            return "aucune_note"
+        if any(not 0 <= note_data["note"] <= 20 for note_data in notes):
+            return "hors_bornes"
+        
+        # Une note de bulletin qui contredit la note déclarée doit être confirmée par le modèle principal
+        if schema is BulletinSchema and self._index_declarees:
+            periode = cle_periode(data["bulletin"]["periode"])
+            niveau = cle_niveau(data["bulletin"]["niveau"])
+            for note_data in notes:
+                for cle in cle_matiere(note_data["matiere"]):
+                    note_dec = self._index_declarees.get((cle, periode, niveau))
+                    if note_dec is not None and abs(note_dec.note - note_data["note"]) > self.seuil_leger:
+                        return "desaccord"
+        
+        return None
+    
+    def _indexer_notes_declarees(self, notes_declarees: List[NoteDeclaree]):
+        self._index_declarees = {}
         for note_dec in notes_declarees:
-            trouve = False
-            for note_bul in notes_bulletins:
-                if (self._matcher_matiere(note_dec.matiere, note_bul.matiere) and
-                    self._matcher_periode(note_dec.periode, note_bul.periode) and
-                    self._matcher_niveau(note_dec.niveau, note_bul.niveau)):
-                    trouve = True
-                    break
+            periode, niveau = cle_periode(note_dec.periode), cle_niveau(note_dec.niveau)
+            for cle in cle_matiere(note_dec.matiere):
+                self._index_declarees.setdefault((cle, periode, niveau), note_dec)
+    
+    def _analyser_avec_moteur(self, moteur: MoteurOCR, image: PageRendue, prompt: str, consigne: str,
+                              max_tokens: int, schema: Type[BaseModel]) -> Optional[dict]:
+        """Un passage d'un moteur sur une page: cache, appel, normalisation des matières"""
+        
+        try:
+            print(f"   🔍 Analyse OCR de: {image.nom} ({moteur.identifiant})")
             
-            if not trouve:
-                note_info = f"{note_dec.matiere} ({note_dec.periode}, {note_dec.niveau})"
-                non_verifiables.append(note_info)
-                print(f"   ⚠️ Note non vérifiable: {note_info}")
+            # Réponse déjà connue pour cette image, ce prompt et ce moteur ?
+            cle_cache = None
+            if self.cache_ocr is not None:
+                identifiant = moteur.identifiant if image.detail == "auto" else f"{moteur.identifiant}:{image.detail}"
+                cle_cache = CacheReponsesOCR.calculer_cle(image.donnees, f"{prompt}\n{consigne}", identifiant)
+                debut_cache = time.perf_counter()
+                data = self.cache_ocr.lire(cle_cache)
+                if data is not None:
+                    print(f"   💾 Réponse OCR en cache pour {image.nom}")
+                    self.metriques.enregistrer_appel(MesureAppel(
+                        page=image.nom, moteur=moteur.identifiant, cache=True,
+                        duree_ms=round((time.perf_counter() - debut_cache) * 1000, 1)
+                    ))
+                    return schema.model_validate(data).model_dump()
+            
+            if moteur.distant:
+                with self._verrou_progression:
+                    self.octets_envoyes += (len(image.donnees) + 2) // 3 * 4  # Taille base64
+            
+            data = moteur.analyser(image, prompt, consigne, max_tokens, schema)
+            
+            if data is not None and schema is BulletinSchema and not moteur.matieres_normalisees:
+                for note_data in data["bulletin"]["notes"]:
+                    note_data["matiere"] = self._normaliser_matiere(note_data["matiere"])
+            
+            if data is not None and cle_cache is not None:
+                self.cache_ocr.ecrire(cle_cache, data)
+            
+            return data
+            
+        except ErreurServiceOCR:
+            raise  # Page non lue faute de service: remontée, jamais classée "non vérifiable"
+        except Exception as e:
+            print(f"      ❌ Erreur OCR pour {image.nom}: {e}")
         
-        return non_verifiables
+        return None
     
-    def _matcher_matiere(self, matiere1: str, matiere2: str) -> bool:
-        """Vérifie si deux matières correspondent avec mapping intelligent"""
+    def _analyser_en_flux(self, pages: Iterable[Tuple[int, PageRendue]], prompt: str, consigne: str,
+                          max_tokens: int, schema: Type[BaseModel],
+                          etape: Optional[str] = "bulletins", total_pages: int = 0) -> Dict[int, Optional[dict]]:
+        """
+        Pipeline producteur/consommateur entre rendu et OCR.
+        
+        Le thread appelant consomme l'itérable `pages` (rendu PyMuPDF, mono-thread) et dépose
+        chaque page dans une file bornée; `max_requetes_paralleles` workers la vident en appelant
+        le modèle vision. Quand la file est pleine, le rendu attend (contre-pression): la mémoire
+        reste bornée à quelques pages quelle que soit la taille du PDF.
+        
+        Chaque page analysée est signalée au callback de progression de l'étape `etape`
+        (etape=None: pages déjà comptées, ré-analysées sans nouvel événement).
+        Retourne {index: réponse validée ou None}, à relire dans l'ordre des index.
+        Si le service OCR échoue sur une page (ErreurServiceOCR), les pages restantes
+        ne sont pas envoyées et l'erreur est relancée dans le thread appelant.
+        """
         
-        # Normaliser
-        m1 = matiere1.lower().strip()
-        m2 = matiere2.lower().strip()
-        
-        # Correspondances exactes
-        if m1 == m2:
-            return True
-        
-        # Correspondances avec variations et synonymes
-        correspondances = {
-            "francais": ["français", "fran", "fr", "lettres"],
-            "anglais": ["ang", "angl", "english", "lv1", "lve1"],
-            "maths": ["mathématiques", "mathematiques", "math", "mathematique"],
-            "histoire": ["hist", "histoire-geo", "histoire-géo", "histoire-géographie", "hg"],
-            "svt": ["sciences", "biologie", "sciences-vie-terre", "sc-vie-terre"],
-            "physique": ["physique-chimie", "phys", "pc", "sciences-physiques"],
-            "chimie": ["physique-chimie", "chim", "pc"],
-            "philosophie": ["philo", "phil"],
-            "eps": ["sport", "education-physique", "éducation-physique"],
-            "espagnol": ["esp", "lv2", "lve2"],
-            "allemand": ["all", "lv2", "lve2"]
-        }
+        resultats: Dict[int, Optional[dict]] = {}
+        erreurs: List[ErreurServiceOCR] = []
+        file_pages = queue.Queue(maxsize=max(1, AGENT_OCR_CONFIG["file_pages_max"]))
+        nb_workers = self.max_requetes_paralleles
         
-        for base, variations in correspondances.items():
-            if (m1 == base and m2 in variations) or (m2 == base and m1 in variations):
-                return True
-            # Vérifier les variations entre elles
-            if m1 in variations and m2 in variations:
-                return True
+        def consommateur():
+            while True:
+                element = file_pages.get()
+                if element is None:  # Fin du flux
+                    return
+                if erreurs:  # Vérification déjà en échec: vider la file sans appeler l'OCR
+                    continue
+                index, image = element
+                debut_page = time.perf_counter()
+                try:
+                    resultats[index] = self._analyser_image(image, prompt, consigne, max_tokens, schema)
+                except ErreurServiceOCR as e:
+                    print(f"      ❌ Service OCR en échec pour {image.nom}: {e}")
+                    erreurs.append(e)
+                    continue
+                if etape is not None:
+                    self._signaler_page(etape, image.nom, total_pages, (time.perf_counter() - debut_page) * 1000)
+        
+        with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+            for _ in range(nb_workers):
+                executor.submit(consommateur)
+            try:
+                for element in pages:
+                    if erreurs:
+                        break
+                    file_pages.put(element)
+            finally:
+                for _ in range(nb_workers):
+                    file_pages.put(None)
+        
+        if erreurs:
+            raise erreurs[0]
+        if resultats:
+            print(f"   ⚡ {len(resultats)} pages analysées ({nb_workers} requêtes simultanées max)")
+        return resultats
+    
+    def _convertir_pdf_en_images(self, pdfs: List[Path]) -> Iterator[PageRendue]:
+        """Étape de rendu en flux: produit les images (en mémoire) des PDFs page par page"""
         
-        return False
+        for pdf_path in pdfs:
+            try:
+                yield from self.iterer_pages_pdf(pdf_path)
+            except Exception as e:
+                print(f"   ❌ Erreur conversion {pdf_path.name}: {e}")
     
-    def _matcher_periode(self, periode1: str, periode2: str) -> bool:
-        """Vérifie si deux périodes correspondent"""
+    def iterer_pages_pdf(self, pdf_path: Path) -> Iterator[PageRendue]:
+        """
+        Rend les pages d'un PDF une à une. Chaque PDF n'est lu qu'une fois par
+        vérification (formulaire puis bulletins): aucune image n'est conservée
+        au-delà de son analyse.
+        """
         
-        p1 = periode1.lower().strip()
-        p2 = periode2.lower().strip()
+        pdf_path = Path(pdf_path)
+        print(f"   🖼️ Conversion PDF → Images: {pdf_path.name}")
         
-        # Extraire le numéro de trimestre
-        num1 = re.search(r'(\d+)', p1)
-        num2 = re.search(r'(\d+)', p2)
+        doc = fitz.open(pdf_path)
+        try:
+            for i, page in enumerate(doc):
+                image = self._rendre_page(page, f"{pdf_path.stem}_page_{i+1:02d}")
+                print(f"      ✓ Image générée: {image.nom} ({len(image.donnees) // 1024} Ko)")
+                yield image
+        finally:
+            doc.close()
+    
+    def _rendre_page_bulletin(self, page, nom: str) -> PageRendue:
+        """
+        Rend une page de bulletin recadrée sur le tableau des notes (en-têtes, logos,
+        appréciations et signatures exclus), ou la page entière si aucun tableau n'est repéré.
+        """
         
-        if num1 and num2:
-            return num1.group(1) == num2.group(1)
+        zone = None
+        if self.recadrage_actif:
+            try:
+                zone = localiser_tableau_notes(
+                    page,
+                    marge_pt=AGENT_OCR_CONFIG["recadrage_marge_pt"],
+                    ratio_max=AGENT_OCR_CONFIG["recadrage_ratio_max"],
+                    min_lignes=AGENT_OCR_CONFIG["couche_texte_min_notes"],
+                    # Moteur local (Tesseract): aucun token image à économiser, recadrage
+                    # seulement si l'en-tête est sûrement dans la zone
+                    exiger_entete=self.moteur_ocr is not self._moteur_vision
+                )
+            except Exception as e:
+                print(f"      ⚠️ {nom}: analyse de mise en page impossible ({e}), page entière envoyée")
+        
+        image = self._rendre_page(page, nom, zone=zone)
+        
+        # Coût estimé de la page entière, pour mesurer le gain du recadrage
+        largeur_page, hauteur_page = self._dimensions_rendu(page.rect, AGENT_OCR_CONFIG["rendu_cote_max_px"])
+        with self._verrou_progression:
+            stats = self.statistiques_recadrage
+            stats["pages"] += 1
+            stats["recadrees"] += zone is not None
+            stats["tokens_image_estimes"] += estimer_tokens_image(image.largeur, image.hauteur, image.detail)
+            stats["tokens_image_pleine_page"] += estimer_tokens_image(
+                largeur_page, hauteur_page, AGENT_OCR_CONFIG["rendu_detail"]
+            )
         
-        # Correspondances textuelles
-        if p1 == p2:
-            return True
+        if zone is not None:
+            print(f"      ✂️ {nom}: tableau des notes recadré ({image.largeur}x{image.hauteur} px)")
+        return image
+    
+    @staticmethod
+    def _dimensions_rendu(rect, cote_max_px: int) -> Tuple[int, int]:
+        zoom = AGENT_OCR_CONFIG["rendu_dpi"] / 72
+        plus_grand_cote = max(rect.width, rect.height) * zoom
+        if cote_max_px and plus_grand_cote > cote_max_px:
+            zoom *= cote_max_px / plus_grand_cote
+        return round(rect.width * zoom), round(rect.height * zoom)
+    
+    def _rendre_page(self, page, nom: str, zone=None) -> PageRendue:
+        """
+        Rend une page (ou la zone `zone` de la page) directement en octets compressés,
+        à la taille utile pour l'OCR.
+        """
         
-        # Mappings alternatifs
-        mappings = {
-            "1": ["premier", "1er", "first"],
-            "2": ["deuxième", "2ème", "second", "2e"],
-            "3": ["troisième", "3ème", "third", "3e"]
-        }
+        # Résolution cible, plafonnée par la taille max du plus grand côté
+        zoom = AGENT_OCR_CONFIG["rendu_dpi"] / 72
+        cote_max_px = AGENT_OCR_CONFIG["recadrage_cote_max_px" if zone is not None else "rendu_cote_max_px"]
+        rect = zone if zone is not None else page.rect
+        plus_grand_cote = max(rect.width, rect.height) * zoom
+        if cote_max_px and plus_grand_cote > cote_max_px:
+            # Une zone aux coordonnées fractionnaires est arrondie vers l'extérieur: 1 px de marge
+            zoom *= (cote_max_px - (zone is not None)) / plus_grand_cote
+        
+        colorspace = fitz.csGRAY if AGENT_OCR_CONFIG["rendu_niveaux_gris"] else fitz.csRGB
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False, clip=zone)
+        largeur, hauteur = pix.width, pix.height
+        
+        donnees, mime = self._encoder_pixmap(pix)
+        pix = None  # Libérer les pixels bruts avant la page suivante
+        
+        image = PageRendue(
+            nom=nom, donnees=donnees, mime=mime,
+            detail=AGENT_OCR_CONFIG["recadrage_detail" if zone is not None else "rendu_detail"],
+            largeur=largeur, hauteur=hauteur, recadree=zone is not None
+        )
         
-        for num, variations in mappings.items():
-            if (num in p1 and any(var in p2 for var in variations)) or \
-               (num in p2 and any(var in p1 for var in variations)):
-                return True
+        if self.sauvegarder_images_temp:
+            extension = mime.split("/")[1]
+            (self.dossier_images / f"{nom}.{extension}").write_bytes(donnees)
         
-        return False
+        return image
     
-    def _matcher_niveau(self, niveau1: str, niveau2: str) -> bool:
-        """Vérifie si deux niveaux correspondent"""
+    def _encoder_pixmap(self, pix) -> Tuple[bytes, str]:
+        """Encode un pixmap selon AGENT_OCR_CONFIG (JPEG par défaut, WebP via Pillow, PNG sans perte)"""
         
-        n1 = niveau1.lower().strip()
-        n2 = niveau2.lower().strip()
+        format_image = AGENT_OCR_CONFIG["rendu_format"].lower()
+        qualite = AGENT_OCR_CONFIG["rendu_qualite"]
         
-        correspondances = {
-            "2nde": ["seconde", "2nd", "seconde générale"],
-            "1ere": ["1ère", "premiere", "première", "première générale"],
-            "terminale": ["tle", "term", "terminale générale"]
-        }
+        if format_image == "webp":
+            try:
+                from PIL import Image
+                
+                mode = "L" if pix.n == 1 else "RGB"
+                buffer = io.BytesIO()
+                Image.frombytes(mode, (pix.width, pix.height), pix.samples).save(buffer, format="WEBP", quality=qualite)
+                return buffer.getvalue(), "image/webp"
+            except ImportError:
+                print("   ⚠️ Pillow non installé: encodage JPEG utilisé à la place de WebP")
+                format_image = "jpeg"
+        
+        if format_image == "png":
+            return pix.tobytes("png"), "image/png"
+        
+        return pix.tobytes("jpeg", jpg_quality=qualite), "image/jpeg"
+    
+    def _apparier_notes(self, notes_declarees: List[NoteDeclaree],
+                        notes_bulletins: List[NoteBulletin]) -> Tuple[List[Discordance], List[str]]:
+        """
+        Compare les notes déclarées aux notes des bulletins par jointure de hachage.
+        
+        Chaque note des bulletins est indexée une fois par (clé matière, période, niveau);
+        chaque note déclarée est ensuite résolue en quelques lookups. Une seule passe
+        produit les discordances et les notes non vérifiables. En cas de plusieurs
+        correspondances, la première note des bulletins (ordre d'extraction) est retenue.
+        """
         
-        if n1 == n2:
-            return True
+        print(f"⚖️ Comparaison de {len(notes_declarees)} notes déclarées avec {len(notes_bulletins)} notes de bulletins")
         
-        for base, variations in correspondances.items():
-            if (n1 == base and n2 in variations) or (n2 == base and n1 in variations):
-                return True
-            # Vérifier variations entre elles
-            if n1 in variations and n2 in variations:
-                return True
+        index_bulletins: Dict[Tuple[str, str, str], int] = {}
+        for position, note_bul in enumerate(notes_bulletins):
+            periode, niveau = cle_periode(note_bul.periode), cle_niveau(note_bul.niveau)
+            for cle in cle_matiere(note_bul.matiere):
+                index_bulletins.setdefault((cle, periode, niveau), position)
         
-        return False
+        discordances = []
+        non_verifiables = []
+        
+        for note_dec in notes_declarees:
+            periode, niveau = cle_periode(note_dec.periode), cle_niveau(note_dec.niveau)
+            positions = [
+                index_bulletins[(cle, periode, niveau)]
+                for cle in cle_matiere(note_dec.matiere)
+                if (cle, periode, niveau) in index_bulletins
+            ]
+            
+            if not positions:
+                note_info = f"{note_dec.matiere} ({note_dec.periode}, {note_dec.niveau})"
+                non_verifiables.append(note_info)
+                print(f"   ❓ Note non trouvée dans bulletins: {note_info}")
+                continue
+            
+            note_correspondante = notes_bulletins[min(positions)]
+            ecart = abs(note_dec.note - note_correspondante.note)
+            
+            if ecart > self.seuil_leger:
+                # Déterminer la gravité
+                gravite = "MODERE" if ecart <= self.seuil_modere else "GRAVE"
+                
+                discordances.append(Discordance(
+                    matiere=note_dec.matiere,
+                    periode=note_dec.periode,
+                    niveau=note_dec.niveau,
+                    note_declaree=note_dec.note,
+                    note_bulletin=note_correspondante.note,
+                    ecart=ecart,
+                    gravite=gravite
+                ))
+                
+                symbole = "🔥" if gravite == "GRAVE" else "⚠️"
+                print(f"   {symbole} DISCORDANCE {gravite}: {note_dec.matiere} - Déclaré: {note_dec.note}/20, Réel: {note_correspondante.note}/20 (écart: {ecart:.2f})")
+            else:
+                print(f"   ✅ Concordance: {note_dec.matiere} - {note_dec.note}/20 vs {note_correspondante.note}/20 (écart acceptable: {ecart:.2f})")
+        
+        return discordances, non_verifiables
+    
+    def _matcher_matiere(self, matiere1: str, matiere2: str) -> bool:
+        """Vérifie si deux matières correspondent avec mapping intelligent"""
+        return not cle_matiere(matiere1).isdisjoint(cle_matiere(matiere2))
     
     def _calculer_moyenne_reelle(self, notes_bulletins: List[NoteBulletin]) -> Optional[float]:
         """Calcule la moyenne réelle à partir des bulletins"""
@@ -836,6 +1588,7 @@ RÈGLES IMPORTANTES:
             "Concordance Globale": "✅ HONNÊTE" if resultat.concordance_globale else "❌ MALHONNÊTE",
             "Nb Discordances": len(resultat.discordances),
             "Nb Notes Non Vérifiables": len(resultat.notes_non_verifiables),
+            "Nb Doublons": len(resultat.doublons),
             "Date Vérification": datetime.now().strftime('%d/%m/%Y à %H:%M'),
             "Statut Final": "VALIDÉ" if resultat.concordance_globale else "À EXAMINER"
         }])
@@ -875,6 +1628,16 @@ RÈGLES IMPORTANTES:
                 "Détail": "Correspondance parfaite entre déclarations et bulletins"
             }])
         
+        # Feuille 4: Bulletins et pages déposés en double (si présents)
+        df_doublons = None
+        if resultat.doublons:
+            df_doublons = pd.DataFrame([{
+                "N°": i+1,
+                "Doublon": doublon,
+                "Traitement": "Analysé une seule fois, notes comptées une fois",
+                "Action": "Vérifier qu'aucun bulletin ne manque"
+            } for i, doublon in enumerate(resultat.doublons)])
+        
         # Nom de fichier avec horodatage
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         nom_candidat = f"{resultat.candidat_nom}_{resultat.candidat_prenom}".replace(" ", "_")
@@ -889,6 +1652,8 @@ RÈGLES IMPORTANTES:
                 df_resume.to_excel(writer, sheet_name='📊 Résumé', index=False)
                 df_discordances.to_excel(writer, sheet_name='🚨 Discordances', index=False)
                 df_non_verifiables.to_excel(writer, sheet_name='⚠️ Non Vérifiables', index=False)
+                if df_doublons is not None:
+                    df_doublons.to_excel(writer, sheet_name='♻️ Doublons', index=False)
                 
                 # Formatage basique des colonnes
                 for sheet_name in writer.sheets:
@@ -917,37 +1682,83 @@ RÈGLES IMPORTANTES:
         
         return fichier_excel
     
-    def _sauvegarder_resultat_json(self, resultat: ResultatVerification):
+    def _sauvegarder_resultat_json(self, resultat: ResultatVerification) -> Optional[Path]:
         """Sauvegarde le résultat en JSON pour intégration système"""
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         json_path = self.dossier_candidature / f"verification_bulletins_{timestamp}.json"
         
         try:
+            data = resultat.to_dict()
+            data["statistiques_ocr"] = {
+                "moteur": self.moteur_ocr.identifiant,
+                "cache": self.cache_ocr.statistiques() if self.cache_ocr is not None else None,
+                "cascade": self.statistiques_cascade if self.cascade_active else None,
+                "recadrage": self.statistiques_recadrage
+            }
             with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(resultat.to_dict(), f, ensure_ascii=False, indent=2)
+                json.dump(data, f, ensure_ascii=False, indent=2)
             
             print(f"✅ Résultat JSON sauvegardé: {json_path}")
+            return json_path
         except Exception as e:
             print(f"❌ Erreur sauvegarde JSON: {e}")
+            return None
+    
+    def _sauvegarder_metriques(self, json_path: Optional[Path]):
+        """Écrit metriques_verification_<horodatage>.json à côté du résultat JSON"""
+        
+        horodatage = json_path.stem[len("verification_bulletins_"):] if json_path else datetime.now().strftime('%Y%m%d_%H%M%S')
+        chemin = self.dossier_candidature / f"metriques_verification_{horodatage}.json"
+        
+        try:
+            self.metriques.sauvegarder(chemin, {
+                "dossier": str(self.dossier_candidature),
+                "timestamp": datetime.now().isoformat(),
+                "duree_totale_ms": round((time.perf_counter() - self._debut) * 1000, 1),
+                "moteur": self.moteur_ocr.identifiant,
+                "nb_pages": sum(self._pages_traitees.values())
+            })
+            resume = self.metriques.resume()
+            print(f"📈 Métriques: {resume['appels']} appel(s) OCR, "
+                  f"{resume['tokens_prompt'] + resume['tokens_completion']} tokens, ${resume['cout_usd']:.4f}")
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde métriques: {e}")
 
 # ==================================================
 # FONCTIONS UTILITAIRES POUR INTÉGRATION ADMIN
 # ==================================================
 
-def verifier_bulletins_scolaires(dossier_path: str) -> ResultatVerification:
+def verifier_bulletins_scolaires(dossier_path: str, max_requetes_paralleles: Optional[int] = None,
+                                 client_openai: Optional[OpenAI] = None,
+                                 callback_progression: Optional[Callable[[EvenementProgression], None]] = None,
+                                 moteur_ocr: Optional[str] = None,
+                                 incrementale: Optional[bool] = None) -> ResultatVerification:
     """
     Fonction principale pour vérifier les bulletins scolaires
     Compatible avec votre interface Streamlit
     
     Args:
         dossier_path: Chemin vers le dossier candidature
+        max_requetes_paralleles: Nombre max d'appels OCR simultanés (défaut: AGENT_OCR_CONFIG)
+        client_openai: Client à réutiliser (défaut: client partagé du processus)
+        callback_progression: Reçoit un EvenementProgression par étape et par page analysée
+            (appelé depuis les threads OCR, éventuellement en parallèle)
+        moteur_ocr: "vision" ou "tesseract" (défaut: AGENT_OCR_CONFIG["moteur_ocr"])
+        incrementale: Ne ré-analyser que les PDFs modifiés (défaut: AGENT_OCR_CONFIG["verification_incrementale"])
         
     Returns:
         ResultatVerification: Résultat complet de la vérification
     """
     try:
-        agent = AgentVerificationScolaireAdmin(dossier_path)
+        agent = AgentVerificationScolaireAdmin(
+            dossier_path,
+            max_requetes_paralleles=max_requetes_paralleles,
+            client_openai=client_openai,
+            callback_progression=callback_progression,
+            moteur_ocr=moteur_ocr,
+            incrementale=incrementale
+        )
         return agent.verifier_candidature_complete()
     except Exception as e:
         print(f"❌ ERREUR CRITIQUE dans verifier_bulletins_scolaires: {e}")
@@ -963,104 +1774,169 @@ def verifier_bulletins_scolaires(dossier_path: str) -> ResultatVerification:
             timestamp=datetime.now().isoformat()
         )
 
-def get_verification_status(dossier_candidature: Path) -> dict:
-    """Obtient le statut de vérification d'une candidature"""
+# Dossier modifié il y a moins de 2 s: mtime peut-être pas encore distinct du prochain changement
+DELAI_STABILITE_DOSSIER_NS = 2_000_000_000
+
+# Dossiers sans verification_latest.json: statut tiré des rapports, mémorisé par mtime du dossier
+# (un nouveau rapport change le mtime), un dossier jamais vérifié n'est donc parcouru qu'une fois
+_statuts_rapports: Dict[str, Tuple[int, dict]] = {}
+_verrou_statuts_rapports = threading.Lock()
+
+def get_verification_status(dossier_candidature: Path, statut_indexe: Optional[dict] = None) -> dict:
+    """
+    Obtient le statut de vérification d'une candidature.
+    verification_latest.json, écrit à la fin de chaque vérification, fait foi; à défaut
+    le statut de l'index central (statut_indexe), puis les rapports des dossiers vérifiés
+    avant son introduction. Lecture seule: aucun fichier n'est écrit.
+    """
     
     try:
-        # Chercher les rapports existants
-        rapports_excel = list(dossier_candidature.glob("VERIFICATION_BULLETINS_*.xlsx"))
-        rapports_json = list(dossier_candidature.glob("verification_bulletins_*.json"))
-        
-        if rapports_json:
-            # Lire le dernier rapport JSON
-            dernier_rapport = max(rapports_json, key=lambda x: x.stat().st_mtime)
-            
-            try:
-                with open(dernier_rapport, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                return {
-                    "verifie": True,
-                    "date_verification": data.get("timestamp"),
-                    "concordance": data.get("concordance_globale"),
-                    "nb_discordances": len(data.get("discordances", [])),
-                    "rapport_excel": data.get("rapport_excel_path"),
-                    "rapport_json": str(dernier_rapport)
-                }
-            except Exception as e:
-                print(f"❌ Erreur lecture rapport JSON: {e}")
-        
-        # Fallback: chercher seulement les rapports Excel
-        if rapports_excel:
-            dernier_excel = max(rapports_excel, key=lambda x: x.stat().st_mtime)
-            return {
-                "verifie": True,
-                "date_verification": datetime.fromtimestamp(dernier_excel.stat().st_mtime).isoformat(),
-                "concordance": None,  # Pas d'info sans JSON
-                "nb_discordances": 0,
-                "rapport_excel": str(dernier_excel),
-                "rapport_json": None
-            }
-        
-        return {
-            "verifie": False,
-            "date_verification": None,
-            "concordance": None,
-            "nb_discordances": 0,
-            "rapport_excel": None,
-            "rapport_json": None
-        }
+        statut = lire_statut(dossier_candidature)
+        if statut is not None:
+            return statut
+        if statut_indexe is not None:
+            return statut_indexe
+        return _statut_depuis_rapports(dossier_candidature)
     
     except Exception as e:
         print(f"❌ Erreur get_verification_status: {e}")
-        return {
-            "verifie": False,
-            "date_verification": None,
-            "concordance": None,
+        return dict(STATUT_NON_VERIFIE)
+
+def _statut_depuis_rapports(dossier_candidature: Path) -> dict:
+    """Statut du dernier rapport du dossier (JSON, sinon Excel), STATUT_NON_VERIFIE sans rapport"""
+    
+    cle = str(dossier_candidature)
+    mtime_ns = os.stat(dossier_candidature).st_mtime_ns
+    with _verrou_statuts_rapports:
+        memo = _statuts_rapports.get(cle)
+    if memo is not None and memo[0] == mtime_ns:
+        return dict(memo[1])
+    
+    # Chercher les rapports existants (un seul parcours du dossier)
+    statut = None
+    rapports_excel, rapports_json = [], []
+    with os.scandir(dossier_candidature) as entrees:
+        for entree in entrees:
+            if entree.name.startswith("VERIFICATION_BULLETINS_") and entree.name.endswith(".xlsx"):
+                rapports_excel.append(Path(entree.path))
+            elif entree.name.startswith("verification_bulletins_") and entree.name.endswith(".json"):
+                rapports_json.append(Path(entree.path))
+    
+    if rapports_json:
+        # Lire le dernier rapport JSON
+        dernier_rapport = max(rapports_json, key=lambda x: x.stat().st_mtime)
+        
+        try:
+            with open(dernier_rapport, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            statut = statut_depuis_resultat(data, dernier_rapport)
+        except Exception as e:
+            print(f"❌ Erreur lecture rapport JSON: {e}")
+    
+    # Fallback: chercher seulement les rapports Excel
+    if statut is None and rapports_excel:
+        dernier_excel = max(rapports_excel, key=lambda x: x.stat().st_mtime)
+        statut = {
+            "verifie": True,
+            "date_verification": datetime.fromtimestamp(dernier_excel.stat().st_mtime).isoformat(),
+            "concordance": None,  # Pas d'info sans JSON
             "nb_discordances": 0,
-            "rapport_excel": None,
+            "rapport_excel": str(dernier_excel),
             "rapport_json": None
         }
+    
+    if statut is None:
+        statut = STATUT_NON_VERIFIE
+    
+    if time.time_ns() - mtime_ns >= DELAI_STABILITE_DOSSIER_NS:
+        with _verrou_statuts_rapports:
+            _statuts_rapports[cle] = (mtime_ns, statut)
+    return dict(statut)
 
-def detecter_bulletins_scolaires(dossier_candidature: Path) -> dict:
-    """Détecte la présence de bulletins scolaires dans une candidature"""
+# Classement des PDFs mémorisé par dossier: {chemin: (mtime du dossier, résultat)}.
+# Ajouter, supprimer ou renommer un fichier change le mtime: l'entrée du dossier est remplacée.
+# Partagé par toutes les sessions de l'interface (cache du processus).
+_detections_dossiers: Dict[str, Tuple[int, dict]] = {}
+_verrou_detections = threading.Lock()
+
+def _detecter_bulletins_dossier(chemin: str) -> dict:
+    """Classement des PDFs d'un dossier (manifest.json, sinon d'après les noms de fichiers)"""
     
-    try:
-        pdfs = list(dossier_candidature.glob("*.pdf"))
-        
-        bulletins = []
-        formulaire = None
-        
-        # Patterns de détection améliorés
-        patterns_bulletins = ["bulletin", "2nde", "1ere", "1ère", "terminale", "tle", "seconde", "premiere"]
-        patterns_formulaire = ["candidature", "formulaire", "dossier", "cand_"]
-        
+    pdfs = list(Path(chemin).glob("*.pdf"))
+    
+    # Documents classés à la soumission (manifest.json) et toujours présents: même classement que l'agent
+    bulletins, formulaire_manifeste, entrees = [], None, {}
+    manifeste = lire_manifeste_soumission(chemin)
+    if manifeste is not None:
+        presents = {pdf.name for pdf in pdfs}
+        entrees = {entree["name"]: entree for entree in manifeste.get("files", [])}
+        bulletins = [entree["name"] for entree in fichiers_par_role(manifeste, ROLE_BULLETIN, ".pdf")
+                     if entree["name"] in presents]
+        formulaires = [entree["name"] for entree in fichiers_par_role(manifeste, ROLE_FORMULAIRE, ".pdf")
+                       if entree["name"] in presents]
+        formulaire_manifeste = formulaires[0] if formulaires else None
+    
+    # PDFs absents du manifeste (déposés depuis, ou dossier sans manifeste): classés d'après leur nom
+    pdfs = [pdf for pdf in pdfs if pdf.name not in entrees]
+    formulaire = None
+    
+    # Patterns de détection améliorés
+    patterns_bulletins = ["bulletin", "2nde", "1ere", "1ère", "terminale", "tle", "seconde", "premiere"]
+    patterns_formulaire = ["candidature", "formulaire", "dossier", "cand_"]
+    
+    for pdf in pdfs:
+        nom = pdf.name.lower()
+        
+        # Détecter les bulletins
+        if any(pattern in nom for pattern in patterns_bulletins):
+            bulletins.append(pdf.name)
+        # Détecter le formulaire
+        elif any(pattern in nom for pattern in patterns_formulaire):
+            formulaire = pdf.name
+    
+    # Si pas de formulaire détecté, prendre le premier PDF qui n'est pas un bulletin
+    if not formulaire:
         for pdf in pdfs:
             nom = pdf.name.lower()
-            
-            # Détecter les bulletins
-            if any(pattern in nom for pattern in patterns_bulletins):
-                bulletins.append(pdf.name)
-            # Détecter le formulaire
-            elif any(pattern in nom for pattern in patterns_formulaire):
+            if not any(pattern in nom for pattern in patterns_bulletins):
                 formulaire = pdf.name
-        
-        # Si pas de formulaire détecté, prendre le premier PDF qui n'est pas un bulletin
-        if not formulaire:
-            for pdf in pdfs:
-                nom = pdf.name.lower()
-                if not any(pattern in nom for pattern in patterns_bulletins):
-                    formulaire = pdf.name
-                    break
-        
-        return {
-            "bulletins_detectes": len(bulletins) > 0,
-            "nb_bulletins": len(bulletins),
-            "liste_bulletins": bulletins,
-            "formulaire_detecte": formulaire is not None,
-            "formulaire": formulaire,
-            "verifiable": formulaire is not None and len(bulletins) > 0
-        }
+                break
+    formulaire = formulaire_manifeste or formulaire
+    
+    return {
+        "bulletins_detectes": len(bulletins) > 0,
+        "nb_bulletins": len(bulletins),
+        "liste_bulletins": bulletins,
+        "formulaire_detecte": formulaire is not None,
+        "formulaire": formulaire,
+        "verifiable": formulaire is not None and len(bulletins) > 0
+    }
+
+def detecter_bulletins_scolaires(dossier_candidature: Path) -> dict:
+    """
+    Détecte la présence de bulletins scolaires dans une candidature.
+    Un dossier inchangé depuis le dernier appel ne coûte qu'un stat (aucun listage).
+    """
+    
+    try:
+        try:
+            mtime_ns = os.stat(dossier_candidature).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = time.time_ns()  # Dossier absent: aucun PDF, rien à mémoriser
+        cle = str(dossier_candidature)
+        with _verrou_detections:
+            memo = _detections_dossiers.get(cle)
+        if memo is not None and memo[0] == mtime_ns:
+            detection = memo[1]
+        else:
+            detection = _detecter_bulletins_dossier(cle)
+            # Dossier en cours d'écriture: résultat non mémorisé
+            if time.time_ns() - mtime_ns >= DELAI_STABILITE_DOSSIER_NS:
+                with _verrou_detections:
+                    _detections_dossiers[cle] = (mtime_ns, detection)
+        # Copie: l'appelant peut modifier sa liste sans altérer le cache
+        return {**detection, "liste_bulletins": list(detection["liste_bulletins"])}
     
     except Exception as e:
         print(f"❌ Erreur detecter_bulletins_scolaires: {e}")
@@ -1073,3 +1949,10 @@ def detecter_bulletins_scolaires(dossier_candidature: Path) -> dict:
             "verifiable": False
         }
 
+def vider_caches_dossiers():
+    """Oublie les détections et statuts mémorisés par dossier (mesures à froid des benchmarks)"""
+    with _verrou_detections:
+        _detections_dossiers.clear()
+    with _verrou_statuts_rapports:
+        _statuts_rapports.clear()
+
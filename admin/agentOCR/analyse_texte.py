@@ -0,0 +1,218 @@
+# ==================================================
+# ANALYSE TEXTUELLE DES BULLETINS
+# Extraction des lignes matière/note via GRADE_PATTERNS
+# ==================================================
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from admin_config import GRADE_PATTERNS
+
+# Patterns compilés une seule fois
+RE_NOTE_SUR_20 = re.compile(GRADE_PATTERNS["note_sur_20"])
+RE_NOTE_DECIMALE = re.compile(r"(?<![\w,./])" + GRADE_PATTERNS["note_decimale"] + r"(?![\d,./])")
+RE_NOTE_ENTIERE = re.compile(r"(?<![\w,./])(\d)(?![\d,./])")
+RE_SUFFIXE_COLLE = re.compile(r"\d+\b")            # "LV1"
+RE_SUFFIXE_NUMERO = re.compile(r"\s*\d+(?=\s*:)")  # "Spécialité 2 : 14"
+# Matières numérotées (STUDY_LEVELS: "Spécialité 1"): chiffre seul suivi d'une autre valeur
+RE_MATIERE_NUMEROTEE = re.compile(r"\b(sp[ée]cialit[ée]|option)\s*$", re.IGNORECASE)
+RE_NUMERO_MATIERE = re.compile(r"\s*\d(?=\s+\d)")  # "Spécialité 1 12,5 11,0"
+RE_MATIERE = re.compile(GRADE_PATTERNS["matiere"])
+RE_PERIODE = re.compile(GRADE_PATTERNS["periode"], re.IGNORECASE)
+RE_PERIODE_INVERSE = re.compile(
+    r"(\d+|premier|deuxième|troisième|1er|2ème|3ème|2e|3e)\s*(trimestre|semestre)", re.IGNORECASE
+)
+RE_MOYENNE = re.compile(GRADE_PATTERNS["moyenne"], re.IGNORECASE)
+RE_ETABLISSEMENT = re.compile(r"\b((?:lycée|lycee|collège|college|institut)\s+[A-Za-zÀ-ÿ'\- ]+)", re.IGNORECASE)
+
+# Niveaux du secondaire reconnus dans le texte (ordre de priorité)
+NIVEAUX_TEXTE = [
+    ("terminale", re.compile(r"\b(terminale|tle)\b", re.IGNORECASE)),
+    ("1ère", re.compile(r"\b(premi[eè]re|1[eè]re)\b", re.IGNORECASE)),
+    ("2nde", re.compile(r"\b(seconde|2nde)\b", re.IGNORECASE)),
+]
+RE_NIVEAU_SUPERIEUR = re.compile(r"\b(licence|master|L[123]|M[12])\b", re.IGNORECASE)
+
+NUMEROS_PERIODE = {
+    "1": "1er", "premier": "1er", "1er": "1er",
+    "2": "2ème", "deuxième": "2ème", "2ème": "2ème", "2e": "2ème",
+    "3": "3ème", "troisième": "3ème", "3ème": "3ème", "3e": "3ème",
+}
+
+# Lignes d'en-tête ou de synthèse à ignorer
+MOTS_IGNORES = (
+    "moyenne", "appréciation", "appreciation", "absences", "retards", "rang", "effectif",
+    "bulletin", "trimestre", "semestre", "année", "annee", "classe", "date", "né ", "née "
+)
+
+
+def regrouper_mots_en_lignes_positionnees(mots: Sequence[Tuple], tolerance: float = 3.0) -> List[Tuple[Tuple[float, float, float, float], str]]:
+    """
+    Regroupe les mots de page.get_text("words") en lignes visuelles.
+
+    Les cellules d'un tableau sont souvent dans des blocs différents:
+    on regroupe donc par position verticale plutôt que par bloc.
+    Retourne [((x0, y0, x1, y1), texte)] dans l'ordre de lecture.
+    """
+    lignes: List[Tuple[float, List[Tuple]]] = []
+
+    for mot in sorted(mots, key=lambda m: ((m[1] + m[3]) / 2, m[0])):
+        centre = (mot[1] + mot[3]) / 2
+
+        if lignes and abs(lignes[-1][0] - centre) <= tolerance:
+            lignes[-1][1].append(mot)
+        else:
+            lignes.append((centre, [mot]))
+
+    resultat = []
+    for _, contenu in lignes:
+        contenu.sort(key=lambda m: (m[0], m[4]))
+        rect = (min(m[0] for m in contenu), min(m[1] for m in contenu),
+                max(m[2] for m in contenu), max(m[3] for m in contenu))
+        resultat.append((rect, " ".join(m[4] for m in contenu)))
+    return resultat
+
+
+def regrouper_mots_en_lignes(mots: Sequence[Tuple], tolerance: float = 3.0) -> List[str]:
+    """Texte des lignes visuelles de la page (voir regrouper_mots_en_lignes_positionnees)"""
+    return [texte for _, texte in regrouper_mots_en_lignes_positionnees(mots, tolerance)]
+
+
+def _convertir_note(valeur: str) -> Optional[float]:
+    try:
+        note = float(valeur.replace(",", "."))
+    except ValueError:
+        return None
+    return note if 0 <= note <= 20 else None
+
+
+def _detecter_periode(texte: str) -> str:
+    match = RE_PERIODE.search(texte)
+    if match:
+        type_periode, numero = match.group(1).lower(), match.group(2).lower()
+    else:
+        match = RE_PERIODE_INVERSE.search(texte)
+        if not match:
+            return ""
+        numero, type_periode = match.group(1).lower(), match.group(2).lower()
+
+    numero = NUMEROS_PERIODE.get(numero)
+    return f"{numero} {type_periode}" if numero else ""
+
+
+def _detecter_niveau(texte: str) -> str:
+    if RE_NIVEAU_SUPERIEUR.search(texte):
+        return ""  # Niveaux du supérieur: laissés au modèle vision
+    for niveau, pattern in NIVEAUX_TEXTE:
+        if pattern.search(texte):
+            return niveau
+    return ""
+
+
+def analyser_ligne_note(ligne: str) -> Optional[Tuple[str, float]]:
+    """
+    Retourne (matière, note) si la ligne ressemble à une ligne du tableau des notes
+
+    >>> analyser_ligne_note("Mathématiques 14 12,1 Très bien")
+    ('mathématiques', 14.0)
+    >>> analyser_ligne_note("Spécialité 2 : 14")
+    ('spécialité 2', 14.0)
+    >>> analyser_ligne_note("Spécialité 1 12,5 11,0")
+    ('spécialité 1', 12.5)
+    """
+
+    texte = ligne.strip()
+    if not texte or texte.lower().startswith(MOTS_IGNORES) or RE_MOYENNE.match(texte):
+        return None
+    if RE_PERIODE.search(texte) or RE_PERIODE_INVERSE.search(texte):
+        return None
+
+    match_matiere = RE_MATIERE.match(texte)
+    if not match_matiere:
+        return None
+
+    matiere = match_matiere.group(1)
+    reste = texte[match_matiere.end():]
+
+    # Numéro faisant partie du nom de la matière (ex: "LV1", "Spécialité 2 : 14")
+    if matiere.rstrip()[-1:].isalpha():
+        pattern_suffixe = RE_SUFFIXE_COLLE if matiere[-1].isalpha() else RE_SUFFIXE_NUMERO
+        match_suffixe = pattern_suffixe.match(reste)
+        if not match_suffixe and RE_MATIERE_NUMEROTEE.search(matiere):
+            # Le numéro de la matière n'est pas la note: la note est la valeur suivante
+            match_suffixe = RE_NUMERO_MATIERE.match(reste)
+        if match_suffixe:
+            matiere += match_suffixe.group(0)
+            reste = reste[match_suffixe.end():]
+
+    matiere = matiere.strip(" -").lower()
+    if len(matiere.replace(" ", "")) < 2:
+        return None
+
+    # La note de l'élève est le premier nombre de la ligne (avant moyenne de classe, min, max)
+    matches = [m for m in (p.search(reste) for p in (RE_NOTE_SUR_20, RE_NOTE_DECIMALE, RE_NOTE_ENTIERE)) if m]
+    if not matches:
+        return None
+
+    note = _convertir_note(min(matches, key=lambda m: m.start()).group(1))
+    return (matiere, note) if note is not None else None
+
+
+def analyser_texte_bulletin(lignes: List[str]) -> Dict:
+    """
+    Analyse les lignes d'une page de bulletin.
+
+    Retourne un dictionnaire au même format que la réponse du modèle vision,
+    complété d'un score "confiance" entre 0 et 1.
+    """
+    texte_complet = "\n".join(lignes)
+
+    notes = []
+    lignes_candidates = 0
+    for ligne in lignes:
+        # Ligne candidate: commence par des lettres et contient un nombre
+        texte = ligne.strip()
+        if RE_MATIERE.match(texte) and re.search(r"\d", texte) \
+                and not texte.lower().startswith(MOTS_IGNORES) \
+                and not (RE_PERIODE.search(texte) or RE_PERIODE_INVERSE.search(texte)):
+            lignes_candidates += 1
+            resultat = analyser_ligne_note(ligne)
+            if resultat:
+                notes.append({"matiere": resultat[0], "note": resultat[1]})
+
+    periode = _detecter_periode(texte_complet)
+    niveau = _detecter_niveau(texte_complet)
+    match_etablissement = RE_ETABLISSEMENT.search(texte_complet)
+
+    confiance = len(notes) / lignes_candidates if lignes_candidates else 0.0
+    if not periode or not niveau:
+        confiance = 0.0  # Sans période/niveau, aucune note ne peut être appariée
+
+    return {
+        "bulletin": {
+            "periode": periode,
+            "niveau": niveau,
+            "etablissement": match_etablissement.group(1).strip() if match_etablissement else "",
+            "notes": notes
+        },
+        "confiance": round(confiance, 3)
+    }
+
+
+def extraire_notes_couche_texte(page, seuil_confiance: float = 0.8, min_notes: int = 3,
+                                min_mots: int = 20) -> Optional[Dict]:
+    """
+    Étape rapide: lit la couche texte d'une page PyMuPDF.
+
+    Retourne None si la page est scannée (pas assez de texte) ou si
+    l'analyse n'est pas assez fiable; l'appelant bascule alors sur l'OCR vision.
+    """
+    mots = page.get_text("words")
+    if len(mots) < min_mots:
+        return None
+
+    data = analyser_texte_bulletin(regrouper_mots_en_lignes(mots))
+    if data["confiance"] < seuil_confiance or len(data["bulletin"]["notes"]) < min_notes:
+        return None
+
+    return data
@@ -0,0 +1,229 @@
+# ==================================================
+# VÉRIFICATION PAR LOTS (SANS INTERFACE)
+# Traite toutes les candidatures non vérifiées du dossier candidatures
+#
+# Usage (depuis le dossier admin/):
+#   python -m agentOCR.batch --processus 4 --max-requetes 16
+# ==================================================
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from admin_config import ADMIN_CONFIG, AGENT_OCR_CONFIG
+from agentOCR.agent import (
+    EvenementProgression,
+    verifier_bulletins_scolaires,
+    get_verification_status,
+    detecter_bulletins_scolaires
+)
+from agentOCR.metriques import percentile
+from agentOCR.planificateur import configurer_planificateur
+
+
+def decouvrir_candidatures(dossier_candidatures: Path, forcer: bool = False) -> Dict[str, List[Path]]:
+    """Classe les dossiers candidature: à vérifier, déjà vérifiés, non vérifiables"""
+
+    candidatures = {"a_verifier": [], "deja_verifies": [], "non_verifiables": []}
+
+    for dossier in sorted(dossier_candidatures.iterdir()):
+        if not dossier.is_dir():
+            continue
+
+        if not detecter_bulletins_scolaires(dossier)["verifiable"]:
+            candidatures["non_verifiables"].append(dossier)
+        elif not forcer and get_verification_status(dossier)["verifie"]:
+            candidatures["deja_verifies"].append(dossier)
+        else:
+            candidatures["a_verifier"].append(dossier)
+
+    return candidatures
+
+
+def _verifier_dossier(dossier: str, max_requetes_paralleles: int, moteur_ocr: Optional[str] = None,
+                      incrementale: Optional[bool] = None) -> dict:
+    """Exécuté dans un processus du pool: vérifie une candidature et mesure sa latence"""
+
+    debut = time.perf_counter()
+    pages = {"nb_pages": 0, "octets_envoyes": 0, "page_la_plus_lente": None, "duree_page_max_ms": 0.0}
+    verrou = threading.Lock()  # Événements émis par les threads OCR de l'agent
+
+    def suivre(evenement: EvenementProgression):
+        with verrou:
+            pages["octets_envoyes"] = max(pages["octets_envoyes"], evenement.octets_envoyes)
+            if evenement.duree_page_ms is None:
+                return
+            pages["nb_pages"] += 1
+            if evenement.duree_page_ms > pages["duree_page_max_ms"]:
+                pages["duree_page_max_ms"] = evenement.duree_page_ms
+                pages["page_la_plus_lente"] = evenement.nom_page
+
+    try:
+        resultat = verifier_bulletins_scolaires(
+            dossier, max_requetes_paralleles=max_requetes_paralleles, callback_progression=suivre,
+            moteur_ocr=moteur_ocr, incrementale=incrementale
+        )
+        erreur = None
+        if resultat.candidat_nom == "ERREUR":
+            erreur = "; ".join(resultat.notes_non_verifiables) or "Erreur inconnue"
+
+        return {
+            "dossier": dossier,
+            "succes": erreur is None,
+            "erreur": erreur,
+            "duree_s": round(time.perf_counter() - debut, 3),
+            "concordance": resultat.concordance_globale if erreur is None else None,
+            "nb_discordances": len(resultat.discordances),
+            "rapport_excel": resultat.rapport_excel_path,
+            **pages
+        }
+    except Exception as e:
+        return {
+            "dossier": dossier,
+            "succes": False,
+            "erreur": str(e),
+            "duree_s": round(time.perf_counter() - debut, 3),
+            "concordance": None,
+            "nb_discordances": 0,
+            "rapport_excel": None,
+            **pages
+        }
+
+
+def _statistiques_latence(durees: List[float]) -> dict:
+    if not durees:
+        return {}
+
+    return {
+        "min_s": min(durees),
+        "moyenne_s": round(statistics.mean(durees), 3),
+        "mediane_s": round(statistics.median(durees), 3),
+        "p95_s": percentile(durees, 0.95),
+        "max_s": max(durees)
+    }
+
+
+def executer_lot(dossier_candidatures: Path, processus: int, max_requetes: int,
+                 forcer: bool = False, limite: Optional[int] = None, moteur_ocr: Optional[str] = None,
+                 incrementale: Optional[bool] = None) -> dict:
+    """
+    Vérifie toutes les candidatures en attente sur un pool de processus.
+
+    Le plafond global `max_requetes` est réparti entre les processus:
+    chaque processus envoie au plus max_requetes // processus requêtes OCR simultanées.
+    """
+
+    candidatures = decouvrir_candidatures(dossier_candidatures, forcer=forcer)
+    a_verifier = candidatures["a_verifier"][:limite] if limite else candidatures["a_verifier"]
+
+    processus = max(1, min(processus, max_requetes))
+    requetes_par_processus = max(1, max_requetes // processus)
+
+    print(f"📂 {len(a_verifier)} candidature(s) à vérifier "
+          f"({len(candidatures['deja_verifies'])} déjà vérifiée(s), "
+          f"{len(candidatures['non_verifiables'])} non vérifiable(s))")
+    print(f"⚡ {processus} processus × {requetes_par_processus} requêtes OCR simultanées")
+
+    debut_lot = datetime.now()
+    debut = time.perf_counter()
+    resultats = []
+
+    # Chaque processus a son planificateur: les quotas RPM/TPM du compte sont répartis entre eux
+    with ProcessPoolExecutor(max_workers=processus, initializer=configurer_planificateur,
+                             initargs=(1 / processus,)) as executor:
+        futures = [
+            executor.submit(_verifier_dossier, str(dossier), requetes_par_processus, moteur_ocr, incrementale)
+            for dossier in a_verifier
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            resultat = future.result()
+            resultats.append(resultat)
+            statut = "✅" if resultat["succes"] else "❌"
+            print(f"{statut} [{i}/{len(futures)}] {Path(resultat['dossier']).name} ({resultat['duree_s']:.1f}s, "
+                  f"{resultat['nb_pages']} pages, plus lente: {resultat['page_la_plus_lente']} "
+                  f"{resultat['duree_page_max_ms'] / 1000:.1f}s)")
+
+    duree_totale = time.perf_counter() - debut
+    reussis = [r for r in resultats if r["succes"]]
+    echecs = [r for r in resultats if not r["succes"]]
+
+    return {
+        "debut": debut_lot.isoformat(),
+        "fin": datetime.now().isoformat(),
+        "dossier_candidatures": str(dossier_candidatures),
+        "configuration": {
+            "processus": processus,
+            "requetes_par_processus": requetes_par_processus,
+            "max_requetes_global": processus * requetes_par_processus,
+            "moteur_ocr": moteur_ocr or AGENT_OCR_CONFIG["moteur_ocr"],
+            "modele_vision": AGENT_OCR_CONFIG["modele_vision"],
+            "forcer": forcer,
+            "incrementale": AGENT_OCR_CONFIG["verification_incrementale"] if incrementale is None else incrementale
+        },
+        "totaux": {
+            "a_verifier": len(a_verifier),
+            "reussis": len(reussis),
+            "echecs": len(echecs),
+            "deja_verifies": len(candidatures["deja_verifies"]),
+            "non_verifiables": len(candidatures["non_verifiables"]),
+            "honnetes": len([r for r in reussis if r["concordance"]]),
+            "avec_discordances": len([r for r in reussis if not r["concordance"]])
+        },
+        "debit": {
+            "duree_totale_s": round(duree_totale, 3),
+            "candidatures_par_minute": round(len(resultats) / duree_totale * 60, 2) if duree_totale > 0 else 0.0
+        },
+        "latence": _statistiques_latence([r["duree_s"] for r in reussis]),
+        "echecs": [{"dossier": r["dossier"], "erreur": r["erreur"]} for r in echecs],
+        "candidatures": sorted(resultats, key=lambda r: r["dossier"])
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Vérification par lots des bulletins scolaires")
+    parser.add_argument("--dossier", default=ADMIN_CONFIG["candidatures_folder"],
+                        help="Dossier contenant les candidatures")
+    parser.add_argument("--processus", type=int, default=2,
+                        help="Nombre de candidatures traitées en parallèle (processus)")
+    parser.add_argument("--max-requetes", type=int, default=2 * AGENT_OCR_CONFIG["max_requetes_paralleles"],
+                        help="Plafond global de requêtes OCR simultanées (tous processus confondus)")
+    parser.add_argument("--moteur", choices=["vision", "tesseract"], default=None,
+                        help="Moteur OCR des pages (défaut: AGENT_OCR_CONFIG['moteur_ocr'])")
+    parser.add_argument("--forcer", action="store_true",
+                        help="Re-vérifier aussi les candidatures déjà vérifiées")
+    parser.add_argument("--complet", action="store_true",
+                        help="Ré-extraire tous les PDFs (ignore le manifeste de vérification des dossiers)")
+    parser.add_argument("--limite", type=int, default=None,
+                        help="Nombre max de candidatures à traiter")
+    parser.add_argument("--rapport", default=None,
+                        help="Fichier JSON du rapport de lot (défaut: rapport_lot_<horodatage>.json)")
+    args = parser.parse_args(argv)
+
+    dossier_candidatures = Path(args.dossier)
+    if not dossier_candidatures.is_dir():
+        parser.error(f"Dossier candidatures introuvable: {dossier_candidatures}")
+
+    rapport = executer_lot(dossier_candidatures, args.processus, args.max_requetes,
+                           forcer=args.forcer, limite=args.limite, moteur_ocr=args.moteur,
+                           incrementale=False if args.complet else None)
+
+    chemin_rapport = Path(args.rapport or f"rapport_lot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(chemin_rapport, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    totaux, debit = rapport["totaux"], rapport["debit"]
+    print(f"\n🎉 Lot terminé: {totaux['reussis']} réussie(s), {totaux['echecs']} échec(s) "
+          f"en {debit['duree_totale_s']:.0f}s ({debit['candidatures_par_minute']} candidatures/min)")
+    print(f"📊 Rapport: {chemin_rapport}")
+
+    return 1 if totaux["echecs"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+# ==================================================
+# CACHE DISQUE DES RÉPONSES OCR
+# Réponses vision indexées par contenu (image + prompt + modèle)
+# ==================================================
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+# Nettoyage complet (parcours du dossier) au plus une fois par intervalle et par processus,
+# et non à chaque construction du cache (une par vérification)
+INTERVALLE_NETTOYAGE_S = 3600
+_derniers_nettoyages: Dict[Path, float] = {}  # dossier résolu -> time.monotonic() du dernier nettoyage
+_verrou_nettoyages = threading.Lock()
+
+
+class CacheReponsesOCR:
+    """
+    Cache persistant des réponses JSON du modèle vision.
+
+    Chaque entrée est un fichier JSON nommé par le hash SHA-256 de
+    (image, prompt, modèle). L'ordre LRU est porté par la date de
+    modification des fichiers, rafraîchie à chaque lecture.
+    """
+
+    def __init__(self, dossier: str, taille_max_mo: float = 200, age_max_jours: float = 30):
+        self.dossier = Path(dossier)
+        self.taille_max_octets = int(taille_max_mo * 1024 * 1024)
+        self.age_max_secondes = age_max_jours * 24 * 3600
+
+        self._verrou = threading.Lock()
+        self._ecritures_depuis_nettoyage = 0
+        self.hits = 0
+        self.misses = 0
+        self.ecritures = 0
+        self.evictions = 0
+
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        if self._nettoyage_du():
+            self.nettoyer()
+
+    def _nettoyage_du(self) -> bool:
+        """Vrai si ce dossier n'a pas été nettoyé par ce processus depuis INTERVALLE_NETTOYAGE_S"""
+        cle = self.dossier.resolve()
+        maintenant = time.monotonic()
+        with _verrou_nettoyages:
+            dernier = _derniers_nettoyages.get(cle)
+            if dernier is not None and maintenant - dernier < INTERVALLE_NETTOYAGE_S:
+                return False
+            _derniers_nettoyages[cle] = maintenant
+            return True
+
+    @staticmethod
+    def calculer_cle(image: bytes, prompt: str, modele: str) -> str:
+        """Clé de cache: hash de l'image, hash du prompt et nom du modèle"""
+        hash_image = hashlib.sha256(image).hexdigest()
+        hash_prompt = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{hash_image}:{hash_prompt}:{modele}".encode("utf-8")).hexdigest()
+
+    def _chemin(self, cle: str) -> Path:
+        return self.dossier / cle[:2] / f"{cle}.json"
+
+    def lire(self, cle: str) -> Optional[dict]:
+        """Retourne la réponse en cache ou None (compte hit/miss)"""
+        chemin = self._chemin(cle)
+
+        try:
+            with open(chemin, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            # Entrée expirée: on la traite comme absente
+            if time.time() - chemin.stat().st_mtime > self.age_max_secondes:
+                chemin.unlink(missing_ok=True)
+                raise FileNotFoundError(chemin)
+
+            os.utime(chemin)  # Rafraîchir la position LRU
+            with self._verrou:
+                self.hits += 1
+            return data
+
+        except (OSError, json.JSONDecodeError):
+            with self._verrou:
+                self.misses += 1
+            return None
+
+    def ecrire(self, cle: str, data: dict):
+        """Enregistre une réponse (écriture atomique)"""
+        chemin = self._chemin(cle)
+
+        try:
+            chemin.parent.mkdir(exist_ok=True)
+            chemin_tmp = chemin.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(chemin_tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(chemin_tmp, chemin)
+        except OSError as e:
+            print(f"⚠️ Écriture cache OCR impossible: {e}")
+            return
+
+        with self._verrou:
+            self.ecritures += 1
+            self._ecritures_depuis_nettoyage += 1
+            nettoyage_requis = self._ecritures_depuis_nettoyage >= 50
+
+        if nettoyage_requis:
+            self.nettoyer()
+
+    def nettoyer(self):
+        """Supprime les entrées expirées puis les moins récemment utilisées au-delà de la taille max"""
+
+        with self._verrou:
+            self._ecritures_depuis_nettoyage = 0
+        with _verrou_nettoyages:
+            _derniers_nettoyages[self.dossier.resolve()] = time.monotonic()
+
+        maintenant = time.time()
+        entrees = []
+        taille_totale = 0
+        supprimees = 0
+
+        for chemin in self.dossier.glob("*/*.json"):
+            try:
+                stat = chemin.stat()
+            except OSError:
+                continue
+
+            if maintenant - stat.st_mtime > self.age_max_secondes:
+                chemin.unlink(missing_ok=True)
+                supprimees += 1
+                continue
+
+            entrees.append((stat.st_mtime, stat.st_size, chemin))
+            taille_totale += stat.st_size
+
+        if taille_totale > self.taille_max_octets:
+            entrees.sort()  # Plus anciennes en premier
+            for _, taille, chemin in entrees:
+                if taille_totale <= self.taille_max_octets:
+                    break
+                chemin.unlink(missing_ok=True)
+                taille_totale -= taille
+                supprimees += 1
+
+        with self._verrou:
+            self.evictions += supprimees
+
+    def statistiques(self) -> Dict[str, float]:
+        """Compteurs du cache pour le suivi des performances"""
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "ecritures": self.ecritures,
+                "evictions": self.evictions,
+                "taux_hit": round(self.hits / total, 3) if total else 0.0
+            }
@@ -0,0 +1,211 @@
+# ==================================================
+# FILE D'ATTENTE DES VÉRIFICATIONS
+# Jobs persistants (SQLite) partagés entre l'interface et les workers
+# ==================================================
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Statuts d'un job
+STATUT_EN_ATTENTE = "en_attente"
+STATUT_EN_COURS = "en_cours"
+STATUT_TERMINE = "termine"
+STATUT_ECHEC = "echec"
+
+STATUTS_ACTIFS = (STATUT_EN_ATTENTE, STATUT_EN_COURS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dossier TEXT NOT NULL,
+    soumis_par TEXT,
+    statut TEXT NOT NULL,
+    worker TEXT,
+    tentatives INTEGER NOT NULL DEFAULT 0,
+    progression REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    resultat TEXT,
+    erreur TEXT,
+    cree_le REAL NOT NULL,
+    demarre_le REAL,
+    battement_le REAL,
+    termine_le REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_statut ON jobs (statut, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_dossier ON jobs (dossier, id);
+"""
+
+
+class FileAttenteVerifications:
+    """
+    File d'attente durable des vérifications de bulletins.
+
+    L'interface Streamlit soumet des jobs et lit leur statut; un ou plusieurs
+    workers (python -m agentOCR.worker) les réservent et les exécutent.
+    La réservation se fait dans une transaction BEGIN IMMEDIATE: un job
+    n'est jamais pris par deux workers.
+    """
+
+    def __init__(self, chemin_db: str):
+        self.chemin_db = Path(chemin_db)
+        self.chemin_db.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connexion() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connexion(self):
+        # Une connexion par opération: utilisable depuis n'importe quel thread/processus
+        conn = sqlite3.connect(self.chemin_db, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _ligne_en_dict(ligne: sqlite3.Row) -> Dict:
+        job = dict(ligne)
+        job["resultat"] = json.loads(job["resultat"]) if job["resultat"] else None
+        return job
+
+    def soumettre(self, dossier: str, soumis_par: Optional[str] = None) -> int:
+        """Ajoute un job et retourne son id (réutilise un job encore actif pour le même dossier)"""
+
+        dossier = str(Path(dossier).resolve())
+
+        with self._connexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existant = conn.execute(
+                    "SELECT id FROM jobs WHERE dossier = ? AND statut IN (?, ?) ORDER BY id DESC LIMIT 1",
+                    (dossier, *STATUTS_ACTIFS)
+                ).fetchone()
+                if existant:
+                    conn.execute("COMMIT")
+                    return existant["id"]
+
+                curseur = conn.execute(
+                    "INSERT INTO jobs (dossier, soumis_par, statut, cree_le) VALUES (?, ?, ?, ?)",
+                    (dossier, soumis_par, STATUT_EN_ATTENTE, time.time())
+                )
+                conn.execute("COMMIT")
+                return curseur.lastrowid
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def reserver(self, worker: str) -> Optional[Dict]:
+        """Réserve atomiquement le plus ancien job en attente (None si la file est vide)"""
+
+        with self._connexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                ligne = conn.execute(
+                    "SELECT id FROM jobs WHERE statut = ? ORDER BY id LIMIT 1",
+                    (STATUT_EN_ATTENTE,)
+                ).fetchone()
+                if not ligne:
+                    conn.execute("COMMIT")
+                    return None
+
+                maintenant = time.time()
+                conn.execute(
+                    "UPDATE jobs SET statut = ?, worker = ?, tentatives = tentatives + 1, "
+                    "progression = 0, message = NULL, demarre_le = ?, battement_le = ? WHERE id = ?",
+                    (STATUT_EN_COURS, worker, maintenant, maintenant, ligne["id"])
+                )
+                job = conn.execute("SELECT * FROM jobs WHERE id = ?", (ligne["id"],)).fetchone()
+                conn.execute("COMMIT")
+                return self._ligne_en_dict(job)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def mettre_a_jour_progression(self, job_id: int, progression: float, message: Optional[str] = None):
+        """Met à jour l'avancement (0-100) et le battement de cœur d'un job en cours"""
+        with self._connexion() as conn:
+            conn.execute(
+                "UPDATE jobs SET progression = ?, message = ?, battement_le = ? WHERE id = ? AND statut = ?",
+                (progression, message, time.time(), job_id, STATUT_EN_COURS)
+            )
+
+    def battement(self, job_id: int):
+        """Signale que le worker travaille toujours sur ce job"""
+        with self._connexion() as conn:
+            conn.execute(
+                "UPDATE jobs SET battement_le = ? WHERE id = ? AND statut = ?",
+                (time.time(), job_id, STATUT_EN_COURS)
+            )
+
+    def terminer(self, job_id: int, worker: str, resultat: Dict) -> bool:
+        """
+        Enregistre le résultat si `worker` détient toujours le job. Retourne False si le job
+        a été remis en attente (worker jugé orphelin) ou repris par un autre worker entre-temps.
+        """
+        with self._connexion() as conn:
+            curseur = conn.execute(
+                "UPDATE jobs SET statut = ?, progression = 100, resultat = ?, termine_le = ? "
+                "WHERE id = ? AND statut = ? AND worker = ?",
+                (STATUT_TERMINE, json.dumps(resultat, ensure_ascii=False), time.time(),
+                 job_id, STATUT_EN_COURS, worker)
+            )
+            return curseur.rowcount == 1
+
+    def echouer(self, job_id: int, worker: str, erreur: str) -> bool:
+        """Passe le job en échec si `worker` le détient toujours (voir terminer)"""
+        with self._connexion() as conn:
+            curseur = conn.execute(
+                "UPDATE jobs SET statut = ?, erreur = ?, termine_le = ? WHERE id = ? AND statut = ? AND worker = ?",
+                (STATUT_ECHEC, erreur, time.time(), job_id, STATUT_EN_COURS, worker)
+            )
+            return curseur.rowcount == 1
+
+    def statut(self, job_id: int) -> Optional[Dict]:
+        with self._connexion() as conn:
+            ligne = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._ligne_en_dict(ligne) if ligne else None
+
+    def lister(self, statuts: Optional[List[str]] = None, limite: int = 50) -> List[Dict]:
+        """Derniers jobs, éventuellement filtrés par statut"""
+        requete = "SELECT * FROM jobs"
+        parametres: list = []
+        if statuts:
+            requete += f" WHERE statut IN ({', '.join('?' for _ in statuts)})"
+            parametres.extend(statuts)
+        requete += " ORDER BY id DESC LIMIT ?"
+        parametres.append(limite)
+
+        with self._connexion() as conn:
+            return [self._ligne_en_dict(l) for l in conn.execute(requete, parametres).fetchall()]
+
+    def recuperer_jobs_orphelins(self, delai_s: float, tentatives_max: int = 3) -> int:
+        """
+        Remet en attente les jobs dont le worker ne donne plus signe de vie
+        (au-delà de tentatives_max, le job passe en échec). Retourne le nombre de jobs traités.
+        """
+        limite = time.time() - delai_s
+
+        with self._connexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET statut = ?, erreur = 'Worker interrompu', termine_le = ? "
+                    "WHERE statut = ? AND battement_le < ? AND tentatives >= ?",
+                    (STATUT_ECHEC, time.time(), STATUT_EN_COURS, limite, tentatives_max)
+                )
+                conn.execute(
+                    "UPDATE jobs SET statut = ?, worker = NULL WHERE statut = ? AND battement_le < ?",
+                    (STATUT_EN_ATTENTE, STATUT_EN_COURS, limite)
+                )
+                total = conn.total_changes
+                conn.execute("COMMIT")
+                return total
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
@@ -0,0 +1,118 @@
+# ==================================================
+# MANIFESTE DE VÉRIFICATION
+# Empreintes des PDFs d'un dossier et notes extraites: une re-vérification
+# ne ré-analyse que les fichiers nouveaux ou modifiés
+# ==================================================
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+NOM_MANIFESTE = "manifeste_verification.json"
+VERSION_MANIFESTE = 1
+
+
+class ManifesteVerification:
+    """
+    Extractions de la dernière vérification d'un dossier candidature.
+
+    Chaque entrée est indexée par nom de fichier et n'est réutilisée que si
+    l'empreinte SHA-256 du fichier est inchangée. Le manifeste entier est ignoré
+    si le moteur OCR, la version des prompts ou les réglages d'extraction ont changé
+    (`parametres`): les extractions ne seraient plus comparables.
+    Avec lire=False (vérification complète), le manifeste précédent est ignoré puis réécrit.
+    """
+
+    def __init__(self, dossier: Path, parametres: Dict, lire: bool = True):
+        self.chemin = Path(dossier) / NOM_MANIFESTE
+        self.parametres = parametres
+        self.formulaire: Optional[Dict] = None
+        self.bulletins: Dict[str, Dict] = {}
+        self.resultat: Optional[Dict] = None  # Empreinte des entrées et fichiers du dernier rapport
+        self.reutilises = 0
+        self.extraits = 0
+        if lire:
+            self.charger()
+
+    def charger(self):
+        try:
+            with open(self.chemin, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️ Manifeste de vérification illisible ({e}): extraction complète")
+            return
+
+        if data.get("version") != VERSION_MANIFESTE or data.get("parametres") != self.parametres:
+            print("   🔄 Paramètres OCR modifiés depuis la dernière vérification: extraction complète")
+            return
+
+        self.formulaire = data.get("formulaire")
+        self.bulletins = data.get("bulletins", {})
+        self.resultat = data.get("resultat")
+
+    # --- Formulaire ---------------------------------------------------
+
+    def lire_formulaire(self, nom_fichier: str, sha256: str) -> Optional[Dict]:
+        entree = self.formulaire
+        if entree and entree["fichier"] == nom_fichier and entree["sha256"] == sha256:
+            self.reutilises += 1
+            return entree["extraction"]
+        return None
+
+    def ecrire_formulaire(self, nom_fichier: str, sha256: str, extraction: Dict):
+        self.formulaire = {"fichier": nom_fichier, "sha256": sha256, "extraction": extraction}
+
+    # --- Bulletins ----------------------------------------------------
+
+    def lire_bulletin(self, nom_fichier: str, sha256: str) -> Optional[List[Dict]]:
+        """Pages extraites d'un bulletin inchangé: [{"nom", "empreinte", "data"}]"""
+        entree = self.bulletins.get(nom_fichier)
+        if entree and entree["sha256"] == sha256:
+            self.reutilises += 1
+            return entree["pages"]
+        return None
+
+    def ecrire_bulletins(self, bulletins: Dict[str, Dict]):
+        """Remplace les entrées bulletins (les fichiers disparus du dossier sont oubliés)"""
+        self.extraits += sum(1 for nom, entree in bulletins.items() if self.bulletins.get(nom) != entree)
+        self.bulletins = bulletins
+
+    # --- Résultat -----------------------------------------------------
+
+    @staticmethod
+    def empreinte_entrees(empreintes_fichiers: Dict[str, str]) -> str:
+        """Empreinte de l'ensemble des PDFs analysés ({nom: sha256}): identique si aucun n'a changé"""
+        return hashlib.sha256(json.dumps(empreintes_fichiers, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def resultat_reutilisable(self, empreinte: str) -> Optional[Dict]:
+        """Fichiers du dernier rapport si les entrées n'ont pas changé depuis et s'ils existent encore"""
+        resultat = self.resultat
+        if not resultat or resultat.get("empreinte_entrees") != empreinte:
+            return None
+        if not Path(resultat.get("json", "")).is_file():
+            return None
+        return resultat
+
+    def sauvegarder(self):
+        """Écriture atomique (fichier temporaire puis os.replace)"""
+
+        data = {
+            "version": VERSION_MANIFESTE,
+            "parametres": self.parametres,
+            "formulaire": self.formulaire,
+            "bulletins": self.bulletins,
+            "resultat": self.resultat
+        }
+        chemin_tmp = self.chemin.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(chemin_tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(chemin_tmp, self.chemin)
+        except OSError as e:
+            print(f"   ⚠️ Manifeste de vérification non sauvegardé: {e}")
+            chemin_tmp.unlink(missing_ok=True)
@@ -0,0 +1,211 @@
+# ==================================================
+# MÉTRIQUES DE L'AGENT OCR
+# Durée, tokens, coût et tentatives de chaque appel OCR; durée des étapes
+#
+# Agrégation des vérifications passées (depuis le dossier admin/):
+#   python -m agentOCR.metriques --dossier forms/candidatures
+# ==================================================
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from admin_config import ADMIN_CONFIG, AGENT_OCR_CONFIG
+
+MOTIF_FICHIER_METRIQUES = "metriques_verification_*.json"
+
+
+@dataclass
+class MesureAppel:
+    """Un appel à un moteur OCR pour une page"""
+    page: str
+    moteur: str
+    duree_ms: float
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+    tentatives: int = 1  # 1 + nombre de nouvelles tentatives (erreurs réseau, 429, 5xx)
+    succes: bool = True
+    cache: bool = False  # Réponse servie par le cache OCR (aucun appel réseau)
+    cout_usd: float = 0.0
+
+
+def calculer_cout_usd(moteur: str, tokens_prompt: int, tokens_completion: int) -> float:
+    """Coût d'un appel selon AGENT_OCR_CONFIG["tarifs_modeles"] (USD par million de tokens)"""
+
+    tarif = AGENT_OCR_CONFIG["tarifs_modeles"].get(moteur)
+    if not tarif:
+        return 0.0
+    return (tokens_prompt * tarif["entree"] + tokens_completion * tarif["sortie"]) / 1_000_000
+
+
+def percentile(valeurs: List[float], rang: float) -> float:
+    """Percentile par rang le plus proche (rang 0.95 -> p95), commun aux métriques et aux lots"""
+    valeurs = sorted(valeurs)
+    return valeurs[max(0, int(round(rang * len(valeurs))) - 1)]
+
+
+def _statistiques_durees(durees_ms: List[float]) -> dict:
+    if not durees_ms:
+        return {}
+    return {
+        "nb": len(durees_ms),
+        "moyenne_ms": round(statistics.mean(durees_ms), 1),
+        "p50_ms": round(statistics.median(durees_ms), 1),
+        "p95_ms": round(percentile(durees_ms, 0.95), 1),
+        "max_ms": round(max(durees_ms), 1),
+        "total_ms": round(sum(durees_ms), 1)
+    }
+
+
+def _resumer_appels(appels: List[dict]) -> dict:
+    """Totaux et latences par moteur d'une liste d'appels (MesureAppel sous forme de dict)"""
+
+    par_moteur: Dict[str, List[dict]] = {}
+    for appel in appels:
+        par_moteur.setdefault(appel["moteur"], []).append(appel)
+
+    def totaux(liste: List[dict]) -> dict:
+        reseau = [a for a in liste if not a["cache"]]
+        return {
+            "appels": len(reseau),
+            "cache": len(liste) - len(reseau),
+            "echecs": sum(1 for a in reseau if not a["succes"]),
+            "nouvelles_tentatives": sum(a["tentatives"] - 1 for a in reseau),
+            "tokens_prompt": sum(a["tokens_prompt"] for a in reseau),
+            "tokens_completion": sum(a["tokens_completion"] for a in reseau),
+            "cout_usd": round(sum(a["cout_usd"] for a in reseau), 6),
+            "latence": _statistiques_durees([a["duree_ms"] for a in reseau])
+        }
+
+    return {
+        **totaux(appels),
+        "par_moteur": {moteur: totaux(liste) for moteur, liste in sorted(par_moteur.items())}
+    }
+
+
+class CollecteurMetriques:
+    """
+    Collecte les mesures d'une vérification.
+
+    Les moteurs OCR enregistrent leurs appels depuis les threads du pipeline
+    (verrou interne); l'agent marque les changements d'étape.
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.appels: List[MesureAppel] = []
+        self.etapes: Dict[str, float] = {}  # étape -> durée (ms)
+        self._etape_courante: Optional[str] = None
+        self._debut_etape = 0.0
+
+    def enregistrer_appel(self, mesure: MesureAppel):
+        if not mesure.cache and not mesure.cout_usd:
+            mesure.cout_usd = calculer_cout_usd(mesure.moteur, mesure.tokens_prompt, mesure.tokens_completion)
+        with self._verrou:
+            self.appels.append(mesure)
+
+    def marquer_etape(self, etape: str):
+        """Clôt l'étape en cours et démarre `etape` (sans effet si c'est déjà l'étape en cours)"""
+
+        maintenant = time.perf_counter()
+        with self._verrou:
+            if etape == self._etape_courante:
+                return
+            if self._etape_courante is not None:
+                duree_ms = (maintenant - self._debut_etape) * 1000
+                self.etapes[self._etape_courante] = round(self.etapes.get(self._etape_courante, 0.0) + duree_ms, 1)
+            self._etape_courante = etape
+            self._debut_etape = maintenant
+
+    def resume(self) -> dict:
+        with self._verrou:
+            appels = [asdict(a) for a in self.appels]
+            etapes = dict(self.etapes)
+        return {**_resumer_appels(appels), "etapes_ms": etapes}
+
+    def to_dict(self) -> dict:
+        with self._verrou:
+            appels = [asdict(a) for a in self.appels]
+        return {"resume": self.resume(), "appels": appels}
+
+    def sauvegarder(self, chemin: Path, infos: Optional[dict] = None):
+        """Écrit les métriques (à côté du JSON de résultat de la vérification)"""
+
+        data = {**(infos or {}), **self.to_dict()}
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def agreger_metriques(dossier_candidatures: Path) -> dict:
+    """
+    Agrège les métriques de toutes les vérifications enregistrées:
+    totaux de tokens/coût, latences par moteur et durées par étape (p50/p95).
+    """
+
+    appels: List[dict] = []
+    etapes: Dict[str, List[float]] = {}
+    durees_verification: List[float] = []
+    nb_verifications = 0
+
+    for fichier in sorted(dossier_candidatures.glob(f"*/{MOTIF_FICHIER_METRIQUES}")):
+        try:
+            with open(fichier, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Métriques illisibles {fichier}: {e}")
+            continue
+
+        nb_verifications += 1
+        appels.extend(data.get("appels", []))
+        for etape, duree_ms in data.get("resume", {}).get("etapes_ms", {}).items():
+            etapes.setdefault(etape, []).append(duree_ms)
+        if data.get("duree_totale_ms") is not None:
+            durees_verification.append(data["duree_totale_ms"])
+
+    resume = _resumer_appels(appels)
+    return {
+        "verifications": nb_verifications,
+        **resume,
+        "cout_moyen_usd": round(resume["cout_usd"] / nb_verifications, 6) if nb_verifications else 0.0,
+        "duree_verification": _statistiques_durees(durees_verification),
+        "etapes": {etape: _statistiques_durees(durees) for etape, durees in etapes.items()}
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Agrège les métriques des vérifications de bulletins")
+    parser.add_argument("--dossier", default=ADMIN_CONFIG["candidatures_folder"],
+                        help="Dossier contenant les dossiers candidature")
+    parser.add_argument("--rapport", help="Fichier JSON de l'agrégat")
+    args = parser.parse_args(argv)
+
+    agregat = agreger_metriques(Path(args.dossier))
+
+    print(f"📈 {agregat['verifications']} vérification(s), {agregat['appels']} appel(s) OCR "
+          f"({agregat['cache']} servis par le cache, {agregat['echecs']} échec(s), "
+          f"{agregat['nouvelles_tentatives']} nouvelle(s) tentative(s))")
+    print(f"🔢 Tokens: {agregat['tokens_prompt']} prompt + {agregat['tokens_completion']} complétion "
+          f"· coût ${agregat['cout_usd']:.4f} (${agregat['cout_moyen_usd']:.4f} par vérification)")
+    for moteur, stats in agregat["par_moteur"].items():
+        latence = stats["latence"]
+        if latence:
+            print(f"   🤖 {moteur}: {stats['appels']} appels, p50 {latence['p50_ms']:.0f} ms, "
+                  f"p95 {latence['p95_ms']:.0f} ms, ${stats['cout_usd']:.4f}")
+    for etape, stats in agregat["etapes"].items():
+        print(f"   ⏱️ {etape}: moyenne {stats['moyenne_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms")
+
+    if args.rapport:
+        with open(args.rapport, "w", encoding="utf-8") as f:
+            json.dump(agregat, f, ensure_ascii=False, indent=2)
+        print(f"📄 Agrégat écrit: {args.rapport}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+# ==================================================
+# ANALYSE DE MISE EN PAGE DES BULLETINS
+# Localisation du tableau des notes avant l'envoi au modèle vision
+# ==================================================
+
+import math
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from agentOCR.analyse_texte import (
+    NIVEAUX_TEXTE,
+    RE_PERIODE,
+    RE_PERIODE_INVERSE,
+    analyser_ligne_note,
+    regrouper_mots_en_lignes_positionnees
+)
+
+# Profil de pixels: rendu basse résolution, un pixel par point PDF
+DPI_PROFIL = 72
+SEUIL_PIXEL_SOMBRE = 160  # Niveau de gris en dessous duquel un pixel est de l'encre
+RATIO_FILET = 0.4         # Part de la largeur noircie pour qu'une rangée soit un filet de tableau
+RATIO_CONTENU = 0.005     # Part de la largeur noircie pour qu'une rangée contienne quelque chose
+BANDE_ENTETE_PT = 60      # Hauteur au-dessus du premier filet où chercher l'en-tête (période, niveau)
+MIN_FILETS_TABLEAU = 3    # Filets horizontaux à partir desquels une page scannée contient un tableau
+
+# bytes.translate: pixel sombre -> 0, pixel clair -> 1 (comptage via count(0))
+_TABLE_SOMBRE = bytes(0 if i < SEUIL_PIXEL_SOMBRE else 1 for i in range(256))
+
+Zone = Tuple[float, float, float, float]
+
+
+def _union(zones: List[Zone]) -> Zone:
+    return (min(z[0] for z in zones), min(z[1] for z in zones),
+            max(z[2] for z in zones), max(z[3] for z in zones))
+
+
+def _zone_depuis_couche_texte(page, min_lignes: int, exiger_entete: bool = False) -> Optional[Zone]:
+    """Lignes de notes (et en-tête période/niveau) repérées dans la couche texte"""
+
+    lignes = regrouper_mots_en_lignes_positionnees(page.get_text("words"))
+
+    zones_notes = [rect for rect, texte in lignes if analyser_ligne_note(texte)]
+    if len(zones_notes) < min_lignes:
+        return None
+
+    # Le modèle doit encore lire la période et le niveau de l'en-tête
+    zones_entete = [
+        rect for rect, texte in lignes
+        if RE_PERIODE.search(texte) or RE_PERIODE_INVERSE.search(texte)
+        or any(pattern.search(texte) for _, pattern in NIVEAUX_TEXTE)
+    ]
+    if exiger_entete and not zones_entete:
+        return None
+    return _union(zones_notes + zones_entete)
+
+
+def _zone_depuis_profil_pixels(page, min_filets: int, inclure_entete: bool) -> Optional[Zone]:
+    """
+    Page scannée: repère les filets horizontaux du tableau dans le profil
+    des rangées de pixels (une rangée presque entièrement noire = un filet).
+    """
+
+    zoom = DPI_PROFIL / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    largeur, hauteur, pas = pix.width, pix.height, pix.stride
+    pixels = pix.samples
+
+    filets = []  # (y, x premier pixel sombre, x dernier pixel sombre)
+    rangees_contenu = []
+    dans_filet = False
+    for y in range(hauteur):
+        rangee = pixels[y * pas:y * pas + largeur].translate(_TABLE_SOMBRE)
+        sombres = rangee.count(0)
+
+        if sombres >= RATIO_CONTENU * largeur:
+            rangees_contenu.append(y)
+
+        if sombres >= RATIO_FILET * largeur:
+            if not dans_filet:  # Un filet épais occupe plusieurs rangées consécutives
+                filets.append((y, rangee.find(0), rangee.rfind(0)))
+            dans_filet = True
+        else:
+            dans_filet = False
+
+    if len(filets) < min_filets:
+        return None
+
+    haut = filets[0][0]
+    if inclure_entete:
+        # Seulement l'en-tête juste au-dessus du tableau: le logo et l'adresse en haut de page restent hors zone
+        debut_bande = max(0, haut - BANDE_ENTETE_PT * zoom)
+        haut = next((y for y in rangees_contenu if y >= debut_bande), haut)
+
+    return (min(f[1] for f in filets) / zoom, haut / zoom,
+            (max(f[2] for f in filets) + 1) / zoom, (filets[-1][0] + 1) / zoom)
+
+
+def localiser_tableau_notes(page, marge_pt: float = 12, ratio_max: float = 0.8,
+                            min_lignes: int = 3, inclure_entete: bool = True,
+                            min_filets: int = MIN_FILETS_TABLEAU, exiger_entete: bool = False) -> Optional["fitz.Rect"]:
+    """
+    Zone de la page contenant le tableau des notes, en points PDF.
+
+    Couche texte d'abord (positions des lignes de notes), sinon profil de
+    pixels (filets du tableau). Retourne None si aucun tableau n'est trouvé
+    ou si la zone couvre presque toute la page: la page est alors envoyée entière.
+    Avec exiger_entete, seule une zone dont la couche texte contient l'en-tête
+    (période, niveau) est retenue: pas de profil de pixels, qui ne le situe pas.
+    """
+
+    zone = _zone_depuis_couche_texte(page, min_lignes, exiger_entete)
+    if zone is None and not exiger_entete:
+        zone = _zone_depuis_profil_pixels(page, min_filets, inclure_entete)
+    if zone is None:
+        return None
+
+    rect = fitz.Rect(zone[0] - marge_pt, zone[1] - marge_pt, zone[2] + marge_pt, zone[3] + marge_pt)
+    rect = rect & page.rect
+    if rect.is_empty or rect.get_area() > ratio_max * page.rect.get_area():
+        return None
+    return rect
+
+
+def estimer_tokens_image(largeur: int, hauteur: int, detail: str = "high") -> int:
+    """
+    Coût en tokens d'une image pour les modèles vision OpenAI:
+    85 tokens en détail "low", sinon 85 + 170 par tuile de 512 px après
+    réduction dans un carré de 2048 px puis du plus petit côté à 768 px.
+    """
+
+    if detail == "low" or not largeur or not hauteur:
+        return 85
+
+    echelle = min(1.0, 2048 / max(largeur, hauteur))
+    largeur, hauteur = largeur * echelle, hauteur * echelle
+    echelle = min(1.0, 768 / min(largeur, hauteur))
+    largeur, hauteur = largeur * echelle, hauteur * echelle
+
+    return 85 + 170 * math.ceil(largeur / 512) * math.ceil(hauteur / 512)
@@ -0,0 +1,228 @@
+# ==================================================
+# MOTEURS OCR
+# Page rendue -> réponse structurée (validée par un schéma pydantic)
+# ==================================================
+
+import base64
+import io
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from admin_config import OCR_CONFIG
+from agentOCR.analyse_texte import analyser_texte_bulletin, regrouper_mots_en_lignes
+from agentOCR.metriques import CollecteurMetriques, MesureAppel
+from agentOCR.mise_en_page import estimer_tokens_image
+from agentOCR.planificateur import EchecAppelOCR, obtenir_planificateur
+from agentOCR.schemas import BulletinSchema
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from agentOCR.agent import PageRendue
+
+
+class MoteurOCR(ABC):
+    """
+    Interface commune des moteurs OCR.
+
+    `analyser` reçoit une page rendue et retourne le dictionnaire validé par
+    `schema`, ou None si la page n'a pas pu être lue. `identifiant` entre dans
+    la clé du cache OCR: deux moteurs ne partagent jamais leurs réponses.
+    """
+
+    nom = "base"
+    identifiant = "base"
+    distant = False  # True si chaque page part sur le réseau (octets comptés, quotas)
+    matieres_normalisees = False  # True si le moteur renvoie déjà les noms de matières normalisés
+    metriques: Optional[CollecteurMetriques] = None  # Renseigné par l'agent: chaque appel y est mesuré
+
+    def _enregistrer_mesure(self, mesure: MesureAppel, debut: float):
+        mesure.duree_ms = round((time.perf_counter() - debut) * 1000, 1)
+        if self.metriques is not None:
+            self.metriques.enregistrer_appel(mesure)
+
+    def supporte(self, schema: Type[BaseModel]) -> bool:
+        return True
+
+    @abstractmethod
+    def analyser(self, image: "PageRendue", prompt: str, consigne: str, max_tokens: int,
+                 schema: Type[BaseModel]) -> Optional[dict]:
+        ...
+
+
+class MoteurVisionOpenAI(MoteurOCR):
+    """Modèle vision OpenAI en mode JSON (formulaires et bulletins)"""
+
+    nom = "vision"
+    distant = True
+    matieres_normalisees = True  # Normalisation demandée dans le prompt
+
+    def __init__(self, fournir_client: Callable[[], "OpenAI"], modele: str):
+        # Client fourni à la demande: aucun client créé tant qu'aucune page n'est envoyée
+        self.fournir_client = fournir_client
+        self.modele = modele
+        self.identifiant = modele
+
+    def analyser(self, image: "PageRendue", prompt: str, consigne: str, max_tokens: int,
+                 schema: Type[BaseModel]) -> Optional[dict]:
+        image_b64 = base64.b64encode(image.donnees).decode()
+        debut = time.perf_counter()
+        mesure = MesureAppel(page=image.nom, moteur=self.identifiant, duree_ms=0.0, succes=False)
+
+        try:
+            return self._appeler(image, image_b64, prompt, consigne, max_tokens, schema, mesure)
+        except EchecAppelOCR as e:
+            mesure.tentatives = e.tentatives
+            raise
+        finally:
+            self._enregistrer_mesure(mesure, debut)
+
+    def _appeler(self, image: "PageRendue", image_b64: str, prompt: str, consigne: str, max_tokens: int,
+                 schema: Type[BaseModel], mesure: MesureAppel) -> Optional[dict]:
+        # Tokens réservés sur le quota TPM: image + texte (~4 caractères par token) + réponse maximale
+        tokens_estimes = (estimer_tokens_image(image.largeur, image.hauteur, image.detail)
+                          + (len(prompt) + len(consigne)) // 4 + max_tokens)
+
+        # Nouvelles tentatives et délai gérés par le planificateur, pas par le client OpenAI
+        response, mesure.tentatives = obtenir_planificateur().executer(
+            self.modele,
+            lambda timeout_s: self._creer_completion(image, image_b64, prompt, consigne, max_tokens, timeout_s),
+            tokens_estimes=tokens_estimes
+        )
+
+        if response.usage is not None:
+            mesure.tokens_prompt = response.usage.prompt_tokens
+            mesure.tokens_completion = response.usage.completion_tokens
+
+        contenu = response.choices[0].message.content or ""
+        print(f"   📝 Réponse OCR reçue pour {image.nom}: {len(contenu)} caractères")
+
+        try:
+            data = schema.model_validate_json(contenu).model_dump()
+            mesure.succes = True
+            return data
+        except ValidationError as e:
+            print(f"      ❌ Réponse invalide pour {image.nom}: {e.error_count()} erreur(s) de schéma")
+            print(f"      Contenu reçu: {contenu[:200]}...")
+            return None
+
+    def _creer_completion(self, image: "PageRendue", image_b64: str, prompt: str, consigne: str,
+                          max_tokens: int, timeout_s: float):
+        client = self.fournir_client().with_options(timeout=timeout_s, max_retries=0)
+        return client.chat.completions.create(
+            model=self.modele,
+            messages=[
+                {"role": "system", "content": prompt},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": consigne},
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": f"data:{image.mime};base64,{image_b64}", "detail": image.detail}
+                        }
+                    ]
+                }
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=max_tokens,
+            temperature=0.1
+        )
+
+
+class MoteurTesseract(MoteurOCR):
+    """
+    OCR local sur CPU: Tesseract lit les mots de la page, puis l'analyse
+    textuelle (GRADE_PATTERNS) reconstruit le tableau des notes.
+    Ne traite que les bulletins; aucun appel réseau ni quota.
+    """
+
+    nom = "tesseract"
+
+    def __init__(self, config: Optional[Dict] = None):
+        # Dépendances optionnelles: ImportError si absentes (voir creer_moteur_ocr)
+        import pytesseract
+        from PIL import Image, ImageOps
+
+        self._pytesseract = pytesseract
+        self._Image = Image
+        self._ImageOps = ImageOps
+
+        config = config or OCR_CONFIG["engines"]["tesseract"]
+        self.langues = "+".join(config["languages"])
+        self.seuil_confiance = config["confidence_threshold"]
+        self.contraste = OCR_CONFIG["preprocessing"]["contrast_enhancement"]
+        self.identifiant = f"tesseract-{self.langues}"
+
+        pytesseract.get_tesseract_version()  # Binaire tesseract absent: erreur dès la création
+
+    def supporte(self, schema: Type[BaseModel]) -> bool:
+        return schema is BulletinSchema
+
+    def analyser(self, image: "PageRendue", prompt: str, consigne: str, max_tokens: int,
+                 schema: Type[BaseModel]) -> Optional[dict]:
+        if not self.supporte(schema):
+            print(f"      ⚠️ {image.nom}: extraction {schema.__name__} non supportée par Tesseract")
+            return None
+
+        img = self._Image.open(io.BytesIO(image.donnees)).convert("L")
+        if self.contraste:
+            img = self._ImageOps.autocontrast(img)
+
+        debut = time.perf_counter()
+        mesure = MesureAppel(page=image.nom, moteur=self.identifiant, duree_ms=0.0)
+        try:
+            donnees = self._pytesseract.image_to_data(
+                img, lang=self.langues, output_type=self._pytesseract.Output.DICT
+            )
+        except Exception:
+            mesure.succes = False
+            raise
+        finally:
+            self._enregistrer_mesure(mesure, debut)
+
+        # Mots reconnus au format de page.get_text("words"): (x0, y0, x1, y1, texte)
+        mots = []
+        hauteurs = []
+        for texte, conf, x, y, l, h in zip(donnees["text"], donnees["conf"], donnees["left"],
+                                           donnees["top"], donnees["width"], donnees["height"]):
+            if texte.strip() and float(conf) >= 0:
+                mots.append((x, y, x + l, y + h, texte.strip()))
+                hauteurs.append(h)
+
+        if not mots:
+            print(f"      ⚠️ {image.nom}: aucun texte reconnu par Tesseract")
+            return None
+
+        # Tolérance de regroupement en lignes proportionnelle à la taille du texte (en pixels)
+        hauteurs.sort()
+        tolerance = hauteurs[len(hauteurs) // 2] / 2
+        data = analyser_texte_bulletin(regrouper_mots_en_lignes(mots, tolerance=tolerance))
+
+        print(f"   📝 Tesseract {image.nom}: {len(data['bulletin']['notes'])} notes "
+              f"(confiance {data['confiance']:.0%})")
+        if data["confiance"] < self.seuil_confiance:
+            print(f"      ⚠️ {image.nom}: confiance insuffisante, page ignorée")
+            return None
+
+        return schema.model_validate({"bulletin": data["bulletin"]}).model_dump()
+
+
+def creer_moteur_ocr(nom: str, moteur_vision: "MoteurVisionOpenAI") -> MoteurOCR:
+    """
+    Instancie le moteur OCR configuré (AGENT_OCR_CONFIG["moteur_ocr"]).
+    Si Tesseract n'est pas disponible, retourne `moteur_vision` (le moteur vision
+    de l'agent lui-même, pour que la cascade le reconnaisse).
+    """
+
+    if nom == "tesseract":
+        try:
+            return MoteurTesseract()
+        except Exception as e:
+            print(f"⚠️ Tesseract indisponible ({e}): moteur vision utilisé")
+    elif nom != "vision":
+        print(f"⚠️ Moteur OCR inconnu '{nom}': moteur vision utilisé")
+
+    return moteur_vision
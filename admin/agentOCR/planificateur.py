@@ -0,0 +1,281 @@
+# ==================================================
+# PLANIFICATEUR DES APPELS OCR
+# Quotas par modèle (requêtes et tokens par minute), nouvelles tentatives
+# avec backoff exponentiel, délai maximal par appel et disjoncteur
+# ==================================================
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import openai
+
+from admin_config import AGENT_OCR_CONFIG
+
+
+class ErreurServiceOCR(Exception):
+    """Le service OCR n'a pas pu traiter une page: la vérification doit échouer, pas ignorer la page"""
+
+
+class EchecAppelOCR(ErreurServiceOCR):
+    """Appel abandonné après `tentatives` essais (ou erreur non récupérable)"""
+
+    def __init__(self, message: str, tentatives: int):
+        super().__init__(message)
+        self.tentatives = tentatives
+
+
+class CircuitOuvertErreur(ErreurServiceOCR):
+    """Le disjoncteur est ouvert: l'API est considérée indisponible, appel refusé sans attendre"""
+
+
+# Erreurs transitoires: la même requête peut réussir plus tard
+ERREURS_TRANSITOIRES = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    openai.ConflictError  # 409
+)
+
+# Statuts HTTP sans classe dédiée que l'API OpenAI documente comme à réessayer
+STATUTS_TRANSITOIRES = (408, 409)
+
+
+def erreur_transitoire(erreur: Exception) -> bool:
+    """True si la même requête peut réussir plus tard (429, 5xx, 408, 409, délai, connexion)"""
+    return isinstance(erreur, ERREURS_TRANSITOIRES) or (
+        isinstance(erreur, openai.APIStatusError) and erreur.status_code in STATUTS_TRANSITOIRES
+    )
+
+
+class SeauJetons:
+    """
+    Seau à jetons rempli en continu à `par_minute` jetons par minute.
+
+    Les réservations sont servies dans l'ordre d'arrivée: le seau peut devenir
+    négatif, chaque appelant attend le temps nécessaire pour rembourser sa part.
+    """
+
+    def __init__(self, par_minute: float):
+        self.capacite = float(par_minute)
+        self.debit_par_s = par_minute / 60
+        self.jetons = self.capacite
+        self._dernier = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def _remplir(self):
+        maintenant = time.monotonic()
+        self.jetons = min(self.capacite, self.jetons + (maintenant - self._dernier) * self.debit_par_s)
+        self._dernier = maintenant
+
+    def reserver(self, n: float) -> float:
+        """Réserve `n` jetons; retourne l'attente (s) avant de pouvoir les utiliser"""
+
+        n = min(n, self.capacite)  # Une réservation plus grande que le seau ne passerait jamais
+        with self._verrou:
+            self._remplir()
+            self.jetons -= n
+            return max(0.0, -self.jetons / self.debit_par_s)
+
+    def rendre(self, n: float):
+        """Restitue des jetons réservés en trop (consommation réelle inférieure à l'estimation)"""
+
+        with self._verrou:
+            self._remplir()
+            self.jetons = min(self.capacite, self.jetons + n)
+
+
+class Disjoncteur:
+    """
+    Après `seuil_echecs` échecs transitoires consécutifs, refuse tous les appels
+    pendant `delai_s` secondes (ouvert), puis laisse passer un appel d'essai
+    (semi-ouvert): un succès referme le circuit, un échec le rouvre.
+    """
+
+    FERME, OUVERT, SEMI_OUVERT = "ferme", "ouvert", "semi_ouvert"
+
+    def __init__(self, seuil_echecs: int, delai_s: float):
+        self.seuil_echecs = seuil_echecs
+        self.delai_s = delai_s
+        self.etat = self.FERME
+        self.echecs_consecutifs = 0
+        self._ouvert_depuis = 0.0
+        self._essai_en_cours = False
+        self._verrou = threading.Lock()
+
+    def autoriser(self):
+        with self._verrou:
+            if self.etat == self.OUVERT:
+                restant = self.delai_s - (time.monotonic() - self._ouvert_depuis)
+                if restant > 0:
+                    raise CircuitOuvertErreur(f"API OCR indisponible, nouvel essai dans {restant:.0f}s")
+                self.etat = self.SEMI_OUVERT
+                self._essai_en_cours = False
+
+            if self.etat == self.SEMI_OUVERT:
+                if self._essai_en_cours:
+                    raise CircuitOuvertErreur("API OCR indisponible, appel d'essai en cours")
+                self._essai_en_cours = True
+
+    def succes(self):
+        with self._verrou:
+            if self.etat != self.FERME:
+                print("🔌 Disjoncteur OCR refermé")
+            self.etat = self.FERME
+            self.echecs_consecutifs = 0
+            self._essai_en_cours = False
+
+    def liberer_essai(self):
+        """Appel interrompu par une erreur étrangère à l'API: l'essai n'a rien prouvé"""
+        with self._verrou:
+            self._essai_en_cours = False
+
+    def echec(self):
+        with self._verrou:
+            self.echecs_consecutifs += 1
+            if self.etat == self.SEMI_OUVERT or self.echecs_consecutifs >= self.seuil_echecs:
+                if self.etat != self.OUVERT:
+                    print(f"⚡ Disjoncteur OCR ouvert ({self.echecs_consecutifs} échecs consécutifs): "
+                          f"appels suspendus {self.delai_s:.0f}s")
+                self.etat = self.OUVERT
+                self._ouvert_depuis = time.monotonic()
+                self._essai_en_cours = False
+
+
+class PlanificateurOCR:
+    """
+    Point de passage de tous les appels OCR d'un processus.
+
+    Chaque appel réserve une requête et ses tokens estimés dans les seaux du
+    modèle (quotas RPM/TPM), puis est exécuté avec un délai maximal. Les erreurs
+    transitoires (429, 5xx, 408, 409, délai dépassé, connexion) sont retentées avec un
+    backoff exponentiel à gigue complète, en respectant l'en-tête Retry-After.
+    """
+
+    def __init__(self, quotas: Dict[str, Dict[str, int]], facteur_quota: float = 1.0,
+                 tentatives_max: int = 5, backoff_base_s: float = 1.0, backoff_max_s: float = 30.0,
+                 timeout_s: float = 60.0, disjoncteur: Optional[Disjoncteur] = None):
+        self.quotas = quotas
+        self.facteur_quota = facteur_quota
+        self.tentatives_max = max(1, tentatives_max)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.disjoncteur = disjoncteur or Disjoncteur(5, 30)
+        self._seaux: Dict[str, Tuple[SeauJetons, SeauJetons]] = {}
+        self._verrou = threading.Lock()
+
+    def _seaux_modele(self, modele: str) -> Tuple[SeauJetons, SeauJetons]:
+        with self._verrou:
+            if modele not in self._seaux:
+                quota = self.quotas.get(modele, self.quotas["defaut"])
+                self._seaux[modele] = (
+                    SeauJetons(max(1.0, quota["rpm"] * self.facteur_quota)),
+                    SeauJetons(max(1.0, quota["tpm"] * self.facteur_quota))
+                )
+            return self._seaux[modele]
+
+    def _delai_backoff(self, tentative: int, erreur: Exception) -> float:
+        # Délai imposé par l'API (429), sinon backoff exponentiel à gigue complète
+        reponse = getattr(erreur, "response", None)
+        retry_after = reponse.headers.get("retry-after") if reponse is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.backoff_max_s)
+        except ValueError:
+            pass
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** (tentative - 1)))
+
+    def executer(self, modele: str, appel: Callable[[float], Any], tokens_estimes: int = 0) -> Tuple[Any, int]:
+        """
+        Exécute `appel(timeout_s)` sous les quotas de `modele`.
+        Retourne (réponse, nombre de tentatives). Lève EchecAppelOCR si toutes
+        les tentatives échouent, CircuitOuvertErreur si l'API est indisponible.
+        """
+
+        seau_requetes, seau_tokens = self._seaux_modele(modele)
+
+        for tentative in range(1, self.tentatives_max + 1):
+            self.disjoncteur.autoriser()
+
+            attente = max(seau_requetes.reserver(1), seau_tokens.reserver(tokens_estimes))
+            if attente > 0:
+                time.sleep(attente)
+
+            try:
+                reponse = appel(self.timeout_s)
+            except openai.APIError as e:
+                # Requête échouée: les tokens estimés n'ont pas été consommés, sinon chaque
+                # nouvelle tentative décompterait encore le quota TPM
+                seau_tokens.rendre(tokens_estimes)
+
+                if not erreur_transitoire(e):
+                    # Requête refusée (400, 401, 403...): la réessayer ne changerait rien
+                    self.disjoncteur.succes()
+                    raise EchecAppelOCR(f"{type(e).__name__}: {e}", tentative) from e
+
+                if getattr(e, "code", None) == "insufficient_quota":  # Crédit épuisé: inutile d'insister
+                    self.disjoncteur.echec()
+                    raise EchecAppelOCR(f"Quota OpenAI épuisé: {e}", tentative) from e
+
+                self.disjoncteur.echec()
+                if tentative == self.tentatives_max:
+                    raise EchecAppelOCR(f"{type(e).__name__} après {tentative} tentatives: {e}", tentative) from e
+
+                delai = self._delai_backoff(tentative, e)
+                print(f"      🔁 {type(e).__name__} ({modele}), tentative {tentative + 1}/{self.tentatives_max} "
+                      f"dans {delai:.1f}s")
+                time.sleep(delai)
+                continue
+            except Exception:
+                self.disjoncteur.liberer_essai()
+                raise
+
+            self.disjoncteur.succes()
+            usage = getattr(reponse, "usage", None)
+            if usage is not None and usage.total_tokens < tokens_estimes:
+                seau_tokens.rendre(tokens_estimes - usage.total_tokens)
+            return reponse, tentative
+
+        raise EchecAppelOCR("Aucune tentative effectuée", 0)  # tentatives_max >= 1: inatteignable
+
+
+_planificateur: Optional[PlanificateurOCR] = None
+_verrou_planificateur = threading.Lock()
+
+
+def _creer_planificateur(facteur_quota: float) -> PlanificateurOCR:
+    return PlanificateurOCR(
+        AGENT_OCR_CONFIG["quotas_modeles"],
+        facteur_quota=facteur_quota,
+        tentatives_max=AGENT_OCR_CONFIG["ocr_tentatives_max"],
+        backoff_base_s=AGENT_OCR_CONFIG["ocr_backoff_base_s"],
+        backoff_max_s=AGENT_OCR_CONFIG["ocr_backoff_max_s"],
+        timeout_s=AGENT_OCR_CONFIG["ocr_timeout_s"],
+        disjoncteur=Disjoncteur(AGENT_OCR_CONFIG["disjoncteur_seuil_echecs"],
+                                AGENT_OCR_CONFIG["disjoncteur_delai_s"])
+    )
+
+
+def configurer_planificateur(facteur_quota: float = 1.0) -> PlanificateurOCR:
+    """
+    (Re)crée le planificateur du processus depuis AGENT_OCR_CONFIG.
+    `facteur_quota` répartit les quotas du compte entre plusieurs processus (lots).
+    """
+
+    global _planificateur
+    with _verrou_planificateur:
+        _planificateur = _creer_planificateur(facteur_quota)
+        return _planificateur
+
+
+def obtenir_planificateur() -> PlanificateurOCR:
+    """Planificateur partagé par toutes les vérifications du processus (quotas et disjoncteur communs)"""
+
+    global _planificateur
+    with _verrou_planificateur:
+        if _planificateur is None:
+            _planificateur = _creer_planificateur(1.0)
+        return _planificateur
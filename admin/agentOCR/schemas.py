@@ -0,0 +1,56 @@
+# ==================================================
+# SCHÉMAS DES RÉPONSES OCR
+# Validation pydantic des réponses JSON du modèle vision
+# ==================================================
+
+from typing import List, Optional
+
+from pydantic import BaseModel, field_validator
+
+
+class _SchemaOCR(BaseModel):
+    """Base commune: les champs texte nuls deviennent des chaînes vides"""
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _null_en_texte_vide(cls, valeur, info):
+        if valeur is None and cls.model_fields[info.field_name].annotation is str:
+            return ""
+        return valeur
+
+
+class NoteFormulaireSchema(_SchemaOCR):
+    matiere: str
+    note: float
+    coefficient: int = 1
+    periode: str = ""
+    niveau: str = ""
+
+    @field_validator("coefficient", mode="before")
+    @classmethod
+    def _coefficient_par_defaut(cls, valeur):
+        return 1 if valeur in (None, "") else valeur
+
+
+class FormulaireSchema(_SchemaOCR):
+    """Extraction combinée du formulaire: identité, moyenne et notes déclarées"""
+    nom: Optional[str] = None
+    prenom: Optional[str] = None
+    moyenne_generale: Optional[float] = None
+    notes_declarees: List[NoteFormulaireSchema] = []
+
+
+class NoteBulletinSchema(_SchemaOCR):
+    matiere: str
+    note: float
+
+
+class ContenuBulletinSchema(_SchemaOCR):
+    periode: str = ""
+    niveau: str = ""
+    etablissement: str = ""
+    notes: List[NoteBulletinSchema] = []
+
+
+class BulletinSchema(_SchemaOCR):
+    bulletin: ContenuBulletinSchema
@@ -0,0 +1,378 @@
+# ==================================================
+# SERVEUR DE SIMULATION OPENAI
+# Réponses enregistrées ou synthétiques pour les benchmarks hors ligne
+#
+# Usage (depuis le dossier admin/):
+#   python -m agentOCR.serveur_simulation --port 8765 --latence-ms 800 --gigue-ms 200 --erreurs 429:0.05
+#   python -m agentOCR.serveur_simulation --fixtures fixtures_n_100 --corpus bench_candidatures/n_100
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=simulation python -m agentOCR.batch ...
+# ==================================================
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Données synthétiques: déterministes pour une même image
+MATIERES_SIMULEES = ["francais", "maths", "anglais", "histoire", "svt", "physique", "philosophie", "eps"]
+PERIODES_SIMULEES = ["1er trimestre", "2ème trimestre", "3ème trimestre"]
+NIVEAUX_SIMULES = ["2nde", "1ère", "terminale"]
+
+RE_IMAGE_DATA_URL = re.compile(r"^data:[^;]+;base64,(.*)$", re.DOTALL)
+
+
+def _empreinte_image(requete: dict) -> str:
+    """SHA-256 des octets de la première image de la requête (clé des fixtures)"""
+    for message in requete.get("messages", []):
+        contenu = message.get("content")
+        if not isinstance(contenu, list):
+            continue
+        for partie in contenu:
+            if partie.get("type") == "image_url":
+                match = RE_IMAGE_DATA_URL.match(partie["image_url"]["url"])
+                if match:
+                    return hashlib.sha256(base64.b64decode(match.group(1))).hexdigest()
+    return hashlib.sha256(json.dumps(requete, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _nom_fixture(modele: str, empreinte: str) -> str:
+    return f"{modele}_{empreinte}.json"
+
+
+def _prompt_systeme(requete: dict) -> str:
+    for message in requete.get("messages", []):
+        if message.get("role") == "system" and isinstance(message.get("content"), str):
+            return message["content"]
+    return ""
+
+
+def generer_reponse_synthetique(requete: dict, rng: random.Random) -> str:
+    """Contenu JSON plausible selon le prompt (bulletin ou formulaire)"""
+
+    if '"bulletin"' in _prompt_systeme(requete):
+        notes = [
+            {"matiere": matiere, "note": round(rng.uniform(6, 19) * 2) / 2}
+            for matiere in rng.sample(MATIERES_SIMULEES, rng.randint(4, len(MATIERES_SIMULEES)))
+        ]
+        return json.dumps({"bulletin": {
+            "periode": rng.choice(PERIODES_SIMULEES),
+            "niveau": rng.choice(NIVEAUX_SIMULES),
+            "etablissement": "Lycée Simulation",
+            "notes": notes
+        }}, ensure_ascii=False)
+
+    notes = [
+        {
+            "matiere": matiere,
+            "note": round(rng.uniform(6, 19) * 2) / 2,
+            "coefficient": rng.randint(1, 4),
+            "periode": rng.choice(PERIODES_SIMULEES),
+            "niveau": rng.choice(NIVEAUX_SIMULES)
+        }
+        for matiere in rng.sample(MATIERES_SIMULEES, rng.randint(3, 6))
+    ]
+    return json.dumps({
+        "nom": "SIMULATION",
+        "prenom": "Candidat",
+        "moyenne_generale": round(sum(n["note"] for n in notes) / len(notes), 2),
+        "notes_declarees": notes
+    }, ensure_ascii=False)
+
+
+class SimulateurOpenAI:
+    """
+    Logique du serveur: fixtures, génération synthétique, latence et erreurs.
+
+    La réponse et les tirages aléatoires d'une requête dépendent uniquement de
+    (graine, modèle, image, nombre de requêtes déjà reçues pour ce modèle et cette image):
+    un même scénario rejoué donne les mêmes résultats, quel que soit l'ordre d'arrivée
+    ou l'escalade de la cascade vers un autre modèle.
+    """
+
+    def __init__(self, dossier_fixtures: Optional[str] = None, latence_ms: float = 0, gigue_ms: float = 0,
+                 erreurs: Optional[Dict[int, float]] = None, taux_json_invalide: float = 0,
+                 graine: int = 0, url_amont: Optional[str] = None, cle_amont: Optional[str] = None):
+        self.dossier_fixtures = Path(dossier_fixtures) if dossier_fixtures else None
+        self.latence_ms = latence_ms
+        self.gigue_ms = gigue_ms
+        self.erreurs = erreurs or {}
+        self.taux_json_invalide = taux_json_invalide
+        self.graine = graine
+        self.url_amont = url_amont.rstrip("/") if url_amont else None
+        self.cle_amont = cle_amont
+
+        if self.dossier_fixtures:
+            self.dossier_fixtures.mkdir(parents=True, exist_ok=True)
+
+        self._verrou = threading.Lock()
+        self._tentatives: Dict[Tuple[str, str], int] = {}  # (modèle, image) -> requêtes reçues
+        self._en_cours = 0
+        self.stats = {
+            "requetes": 0, "fixtures": 0, "synthetiques": 0, "enregistrees": 0,
+            "erreurs": {}, "json_invalides": 0, "concurrence_max": 0
+        }
+
+    def _chemin_fixture(self, empreinte: str, modele: str) -> Optional[Path]:
+        if not self.dossier_fixtures:
+            return None
+        return self.dossier_fixtures / _nom_fixture(modele, empreinte)
+
+    def _appeler_amont(self, corps: bytes) -> Tuple[int, dict]:
+        """Mode enregistrement: relaie la requête vers la vraie API"""
+        requete = urllib.request.Request(
+            f"{self.url_amont}/chat/completions", data=corps, method="POST",
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.cle_amont}"}
+        )
+        try:
+            with urllib.request.urlopen(requete, timeout=120) as reponse:
+                return reponse.status, json.loads(reponse.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+    def traiter_completion(self, corps: bytes) -> Tuple[int, dict]:
+        requete = json.loads(corps)
+        modele = requete.get("model", "simulation")
+        empreinte = _empreinte_image(requete)
+
+        with self._verrou:
+            tentative = self._tentatives.get((modele, empreinte), 0)
+            self._tentatives[(modele, empreinte)] = tentative + 1
+            self.stats["requetes"] += 1
+            self._en_cours += 1
+            self.stats["concurrence_max"] = max(self.stats["concurrence_max"], self._en_cours)
+
+        try:
+            rng = random.Random(f"{self.graine}:{modele}:{empreinte}:{tentative}")
+
+            # Latence simulée (loi normale tronquée)
+            delai_ms = max(0.0, rng.gauss(self.latence_ms, self.gigue_ms)) if self.gigue_ms else self.latence_ms
+            time.sleep(delai_ms / 1000)
+
+            # Erreurs HTTP simulées
+            tirage = rng.random()
+            for code, taux in sorted(self.erreurs.items()):
+                if tirage < taux:
+                    with self._verrou:
+                        self.stats["erreurs"][str(code)] = self.stats["erreurs"].get(str(code), 0) + 1
+                    return code, {"error": {
+                        "message": f"Erreur simulée {code}", "type": "simulation", "code": str(code)
+                    }}
+                tirage -= taux
+
+            # Contenu stable d'une tentative à l'autre: seule la latence/l'erreur varient
+            rng_contenu = random.Random(f"{self.graine}:{empreinte}:{modele}")
+            contenu, source = self._contenu(corps, requete, modele, empreinte, rng_contenu)
+            if contenu is None:
+                return source  # Erreur renvoyée par l'API amont
+
+            if rng.random() < self.taux_json_invalide:
+                contenu = contenu[: len(contenu) // 2]  # JSON tronqué
+                with self._verrou:
+                    self.stats["json_invalides"] += 1
+
+            with self._verrou:
+                self.stats[source] += 1
+
+            return 200, {
+                "id": f"chatcmpl-sim-{empreinte[:12]}-{tentative}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": modele,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": contenu},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": len(corps) // 4,
+                    "completion_tokens": len(contenu) // 4,
+                    "total_tokens": len(corps) // 4 + len(contenu) // 4
+                }
+            }
+        finally:
+            with self._verrou:
+                self._en_cours -= 1
+
+    def _contenu(self, corps: bytes, requete: dict, modele: str, empreinte: str, rng: random.Random):
+        """Contenu de la réponse: fixture, appel amont enregistré ou synthèse"""
+
+        chemin = self._chemin_fixture(empreinte, modele)
+        if chemin is not None and chemin.exists():
+            return json.loads(chemin.read_text(encoding="utf-8"))["content"], "fixtures"
+
+        if self.url_amont:
+            statut, reponse = self._appeler_amont(corps)
+            if statut != 200:
+                return None, (statut, reponse)
+            contenu = reponse["choices"][0]["message"]["content"]
+            if chemin is not None:
+                chemin.write_text(json.dumps({"model": modele, "content": contenu}, ensure_ascii=False),
+                                  encoding="utf-8")
+            return contenu, "enregistrees"
+
+        return generer_reponse_synthetique(requete, rng), "synthetiques"
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            return json.loads(json.dumps(self.stats))
+
+
+def generer_fixtures_corpus(dossier_corpus: str, dossier_fixtures: str,
+                            modeles: Optional[List[str]] = None) -> int:
+    """
+    Fixtures des bulletins d'un corpus (benchmarks.corpus): chaque page est rendue comme
+    par l'agent (mêmes réglages AGENT_OCR_CONFIG, recadrée et entière) et associée aux
+    notes réelles lues dans sa couche texte. Les réponses simulées concordent alors avec
+    les notes déclarées, sauf pour les candidats qui mentent. Retourne le nombre de pages.
+    """
+
+    # Dépendances de l'agent importées ici: le serveur seul n'a besoin que de la bibliothèque standard
+    import fitz
+    from admin_config import AGENT_OCR_CONFIG
+    from agentOCR.agent import AgentVerificationScolaireAdmin, detecter_bulletins_scolaires
+    from agentOCR.analyse_texte import extraire_notes_couche_texte
+
+    modeles = modeles or list(dict.fromkeys([AGENT_OCR_CONFIG["modele_vision"], AGENT_OCR_CONFIG["modele_rapide"]]))
+    dossier_fixtures = Path(dossier_fixtures)
+    dossier_fixtures.mkdir(parents=True, exist_ok=True)
+    dossiers = sorted(d for d in Path(dossier_corpus).iterdir() if d.is_dir())
+    if not dossiers:
+        return 0
+
+    # Un seul agent sert au rendu de toutes les pages (aucun appel OCR, client jamais créé)
+    agent = AgentVerificationScolaireAdmin(str(dossiers[0]))
+    nb_pages = 0
+    for dossier in dossiers:
+        for nom_bulletin in detecter_bulletins_scolaires(dossier)["liste_bulletins"]:
+            doc = fitz.open(dossier / nom_bulletin)
+            try:
+                for i, page in enumerate(doc):
+                    data = extraire_notes_couche_texte(page)
+                    if data is None:
+                        continue
+                    for note in data["bulletin"]["notes"]:
+                        note["matiere"] = agent._normaliser_matiere(note["matiere"])
+                    contenu = json.dumps({"bulletin": data["bulletin"]}, ensure_ascii=False)
+
+                    nom = f"{Path(nom_bulletin).stem}_page_{i+1:02d}"
+                    for image in (agent._rendre_page_bulletin(page, nom), agent._rendre_page(page, nom)):
+                        empreinte = hashlib.sha256(image.donnees).hexdigest()
+                        for modele in modeles:
+                            (dossier_fixtures / _nom_fixture(modele, empreinte)).write_text(
+                                json.dumps({"model": modele, "content": contenu}, ensure_ascii=False),
+                                encoding="utf-8"
+                            )
+                    nb_pages += 1
+            finally:
+                doc.close()
+
+    print(f"🧾 {nb_pages} pages de bulletins du corpus enregistrées comme fixtures dans {dossier_fixtures}")
+    return nb_pages
+
+
+def creer_serveur(simulateur: SimulateurOpenAI, hote: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Serveur HTTP compatible avec le client OpenAI (base_url = http://hote:port/v1)"""
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, comme l'API réelle
+
+        def _repondre(self, statut: int, data: dict):
+            corps = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(statut)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+        def do_POST(self):
+            corps = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.rstrip("/") == "/v1/chat/completions":
+                self._repondre(*simulateur.traiter_completion(corps))
+            else:
+                self._repondre(404, {"error": {"message": f"Route inconnue: {self.path}"}})
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/v1/models":
+                self._repondre(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+            elif self.path.rstrip("/") == "/stats":
+                self._repondre(200, simulateur.statistiques())
+            else:
+                self._repondre(404, {"error": {"message": f"Route inconnue: {self.path}"}})
+
+        def log_message(self, format, *args):
+            pass  # Pas de journal par requête: il fausserait les mesures
+
+    return ThreadingHTTPServer((hote, port), Gestionnaire)
+
+
+def _lire_erreurs(valeur: str) -> Dict[int, float]:
+    """"429:0.05,500:0.01" -> {429: 0.05, 500: 0.01}"""
+    erreurs = {}
+    for element in filter(None, valeur.split(",")):
+        code, taux = element.split(":")
+        erreurs[int(code)] = float(taux)
+    return erreurs
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serveur de simulation de l'API OpenAI (benchmarks hors ligne)")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=None,
+                        help="Dossier des réponses enregistrées (<modèle>_<sha256 image>.json)")
+    parser.add_argument("--corpus", default=None,
+                        help="Corpus (benchmarks.corpus) dont les notes réelles des bulletins deviennent des fixtures")
+    parser.add_argument("--enregistrer", action="store_true",
+                        help="Relayer les pages sans fixture vers l'API réelle et enregistrer les réponses")
+    parser.add_argument("--latence-ms", type=float, default=0)
+    parser.add_argument("--gigue-ms", type=float, default=0)
+    parser.add_argument("--erreurs", type=_lire_erreurs, default={},
+                        help="Taux d'erreurs HTTP, ex: 429:0.05,500:0.01")
+    parser.add_argument("--taux-json-invalide", type=float, default=0)
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        if not args.fixtures:
+            parser.error("--corpus nécessite --fixtures")
+        generer_fixtures_corpus(args.corpus, args.fixtures)
+
+    url_amont, cle_amont = None, None
+    if args.enregistrer:
+        from dotenv import load_dotenv
+
+        if not args.fixtures:
+            parser.error("--enregistrer nécessite --fixtures")
+        load_dotenv()
+        url_amont = "https://api.openai.com/v1"
+        cle_amont = os.getenv("OPENAI_API_KEY")
+
+    simulateur = SimulateurOpenAI(
+        dossier_fixtures=args.fixtures, latence_ms=args.latence_ms, gigue_ms=args.gigue_ms,
+        erreurs=args.erreurs, taux_json_invalide=args.taux_json_invalide, graine=args.graine,
+        url_amont=url_amont, cle_amont=cle_amont
+    )
+    serveur = creer_serveur(simulateur, args.hote, args.port)
+    print(f"🧪 Simulation OpenAI sur http://{args.hote}:{args.port}/v1 (statistiques: /stats)")
+
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {simulateur.statistiques()}")
+    finally:
+        serveur.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
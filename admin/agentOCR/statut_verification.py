@@ -0,0 +1,171 @@
+# ==================================================
+# STATUT DE VÉRIFICATION DES CANDIDATURES
+# Dernier résultat de chaque dossier (verification_latest.json) et index
+# central optionnel (SQLite): lister les statuts sans parcourir les rapports
+# ==================================================
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from admin_config import AGENT_OCR_CONFIG
+
+NOM_STATUT = "verification_latest.json"
+
+STATUT_NON_VERIFIE = {
+    "verifie": False,
+    "date_verification": None,
+    "concordance": None,
+    "nb_discordances": 0,
+    "rapport_excel": None,
+    "rapport_json": None
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statuts (
+    dossier TEXT PRIMARY KEY,
+    statut TEXT NOT NULL,
+    mis_a_jour REAL NOT NULL
+);
+"""
+
+
+def statut_depuis_resultat(data: Dict, rapport_json: Optional[Path]) -> Dict:
+    """Statut compact d'une vérification depuis son résultat JSON (ResultatVerification.to_dict)"""
+
+    return {
+        "verifie": True,
+        "date_verification": data.get("timestamp"),
+        "concordance": data.get("concordance_globale"),
+        "nb_discordances": len(data.get("discordances", [])),
+        "rapport_excel": data.get("rapport_excel_path"),
+        "rapport_json": str(rapport_json) if rapport_json else None
+    }
+
+
+def lire_statut(dossier_candidature: Path) -> Optional[Dict]:
+    """Statut enregistré dans le dossier (un seul fichier lu), None s'il n'existe pas"""
+
+    try:
+        with open(Path(dossier_candidature) / NOM_STATUT, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Statut de vérification illisible ({dossier_candidature}): {e}")
+        return None
+
+
+def ecrire_statut(dossier_candidature: Path, statut: Dict):
+    """
+    Écrit verification_latest.json (fichier temporaire puis os.replace: un lecteur
+    voit l'ancien ou le nouveau statut, jamais un fichier partiel) et met à jour l'index central.
+    """
+
+    chemin = Path(dossier_candidature) / NOM_STATUT
+    chemin_tmp = chemin.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(chemin_tmp, "w", encoding="utf-8") as f:
+            json.dump(statut, f, ensure_ascii=False, indent=2)
+        os.replace(chemin_tmp, chemin)
+    except OSError as e:
+        print(f"⚠️ Statut de vérification non sauvegardé: {e}")
+        chemin_tmp.unlink(missing_ok=True)
+
+    index = obtenir_index_verifications()
+    if index is not None:
+        try:
+            index.mettre_a_jour(dossier_candidature, statut)
+        except sqlite3.Error as e:
+            print(f"⚠️ Index des vérifications non mis à jour: {e}")
+
+
+class IndexVerifications:
+    """
+    Index central des statuts de vérification (une ligne par dossier candidature).
+
+    Une seule requête suffit pour afficher le statut de toutes les candidatures.
+    Les dossiers absents de l'index (vérifiés avant sa création) sont lus via
+    verification_latest.json, qui reste la référence.
+    """
+
+    def __init__(self, chemin_db: str):
+        self.chemin_db = Path(chemin_db)
+        self.chemin_db.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connexion() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connexion(self):
+        # Une connexion par opération: processus du lot, workers et interface écrivent en parallèle
+        conn = sqlite3.connect(self.chemin_db, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _cle(dossier_candidature: Path) -> str:
+        return str(Path(dossier_candidature).resolve())
+
+    def mettre_a_jour(self, dossier_candidature: Path, statut: Dict):
+        with self._connexion() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO statuts (dossier, statut, mis_a_jour) VALUES (?, ?, ?)",
+                (self._cle(dossier_candidature), json.dumps(statut, ensure_ascii=False), time.time())
+            )
+
+    def lire(self, dossier_candidature: Path) -> Optional[Dict]:
+        with self._connexion() as conn:
+            ligne = conn.execute(
+                "SELECT statut FROM statuts WHERE dossier = ?", (self._cle(dossier_candidature),)
+            ).fetchone()
+        return json.loads(ligne[0]) if ligne else None
+
+    def lister(self) -> Dict[str, Dict]:
+        """Tous les statuts indexés: {chemin absolu du dossier: statut}"""
+        with self._connexion() as conn:
+            lignes = conn.execute("SELECT dossier, statut FROM statuts").fetchall()
+        return {dossier: json.loads(statut) for dossier, statut in lignes}
+
+
+_index: Optional[IndexVerifications] = None
+_verrou_index = threading.Lock()
+
+
+def obtenir_index_verifications() -> Optional[IndexVerifications]:
+    """Index central du processus, None s'il est désactivé (AGENT_OCR_CONFIG["index_verifications_db"])"""
+
+    global _index
+    chemin_db = AGENT_OCR_CONFIG.get("index_verifications_db")
+    if not chemin_db:
+        return None
+
+    with _verrou_index:
+        if _index is None or _index.chemin_db != Path(chemin_db):
+            try:
+                _index = IndexVerifications(chemin_db)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Index des vérifications indisponible: {e}")
+                return None
+        return _index
+
+
+def lister_statuts_verification() -> Dict[str, Dict]:
+    """Statuts de l'index central ({chemin absolu: statut}), vide s'il est désactivé ou illisible"""
+
+    index = obtenir_index_verifications()
+    if index is None:
+        return {}
+    try:
+        return index.lister()
+    except sqlite3.Error as e:
+        print(f"⚠️ Index des vérifications illisible: {e}")
+        return {}
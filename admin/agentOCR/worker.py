@@ -0,0 +1,158 @@
+# ==================================================
+# WORKER DES VÉRIFICATIONS EN ARRIÈRE-PLAN
+# Exécute les jobs soumis par l'interface d'administration
+#
+# Usage (depuis le dossier admin/):
+#   python -m agentOCR.worker --jobs-simultanes 2
+# ==================================================
+
+import argparse
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import List, Optional
+
+from admin_config import AGENT_OCR_CONFIG
+from agentOCR.agent import verifier_bulletins_scolaires, obtenir_client_openai, EvenementProgression
+from agentOCR.file_attente import FileAttenteVerifications
+
+
+LIBELLES_ETAPES = {
+    "formulaire": "📋 Formulaire",
+    "bulletins": "📚 Bulletins",
+    "comparaison": "⚖️ Comparaison",
+    "rapport": "📊 Rapport",
+    "termine": "🎉 Terminé"
+}
+
+
+def formater_progression(evenement: EvenementProgression) -> str:
+    """Message affiché dans l'interface: étape, page en cours et temps restant estimé"""
+
+    message = f"{LIBELLES_ETAPES.get(evenement.etape, evenement.etape)}: {evenement.message}"
+    if evenement.duree_page_ms is not None:
+        message += f" ({evenement.duree_page_ms / 1000:.1f}s)"
+
+    restant_s = evenement.estimer_restant_s()
+    if restant_s is not None:
+        message += f" · reste ~{restant_s:.0f}s"
+    return message
+
+
+class WorkerVerifications:
+    """Boucle de réservation/exécution des jobs de la file d'attente"""
+
+    def __init__(self, file_attente: FileAttenteVerifications, nom: Optional[str] = None):
+        self.file_attente = file_attente
+        self.nom = nom or f"{socket.gethostname()}:{os.getpid()}"
+        self.intervalle_s = AGENT_OCR_CONFIG["worker_intervalle_s"]
+        self.battement_s = AGENT_OCR_CONFIG["worker_battement_s"]
+        self.delai_orphelin_s = AGENT_OCR_CONFIG["worker_delai_orphelin_s"]
+        self._arret = threading.Event()
+
+    def arreter(self):
+        self._arret.set()
+
+    def _battre(self, job_id: int, fin: threading.Event):
+        # Une erreur ponctuelle (base verrouillée, disque plein) ne doit pas arrêter les battements:
+        # le job serait jugé orphelin et exécuté une seconde fois par un autre worker
+        while not fin.wait(self.battement_s):
+            try:
+                self.file_attente.battement(job_id)
+            except Exception as e:
+                print(f"⚠️ [{self.nom}] Battement du job #{job_id} non enregistré: {e}")
+
+    def executer_job(self, job: dict):
+        """Exécute une vérification et enregistre son résultat dans la file"""
+
+        job_id = job["id"]
+        print(f"🚀 [{self.nom}] Job #{job_id}: {job['dossier']}")
+
+        fin = threading.Event()
+        battement = threading.Thread(target=self._battre, args=(job_id, fin), daemon=True)
+        battement.start()
+
+        try:
+            def signaler(evenement: EvenementProgression):
+                self.file_attente.mettre_a_jour_progression(
+                    job_id, evenement.pourcentage, formater_progression(evenement)
+                )
+
+            resultat = verifier_bulletins_scolaires(
+                job["dossier"], client_openai=obtenir_client_openai(), callback_progression=signaler
+            )
+
+            if resultat.candidat_nom == "ERREUR":
+                enregistre = self.file_attente.echouer(
+                    job_id, self.nom, "; ".join(resultat.notes_non_verifiables) or "Erreur inconnue"
+                )
+                print(f"❌ [{self.nom}] Job #{job_id} en échec")
+            else:
+                enregistre = self.file_attente.terminer(job_id, self.nom, resultat.to_dict())
+                print(f"✅ [{self.nom}] Job #{job_id} terminé")
+
+        except Exception as e:
+            traceback.print_exc()
+            enregistre = self.file_attente.echouer(job_id, self.nom, str(e))
+            print(f"❌ [{self.nom}] Job #{job_id} en échec: {e}")
+        finally:
+            fin.set()
+
+        if not enregistre:
+            print(f"⚠️ [{self.nom}] Job #{job_id} repris par un autre worker: résultat non enregistré")
+
+    def boucle(self, une_fois: bool = False):
+        """Réserve et exécute les jobs jusqu'à l'arrêt (ou jusqu'à file vide si une_fois)"""
+
+        while not self._arret.is_set():
+            recuperes = self.file_attente.recuperer_jobs_orphelins(self.delai_orphelin_s)
+            if recuperes:
+                print(f"♻️ {recuperes} job(s) orphelin(s) remis en attente")
+
+            job = self.file_attente.reserver(self.nom)
+            if job:
+                self.executer_job(job)
+            elif une_fois:
+                return
+            else:
+                self._arret.wait(self.intervalle_s)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Worker des vérifications de bulletins")
+    parser.add_argument("--db", default=AGENT_OCR_CONFIG["file_jobs_db"],
+                        help="Base SQLite de la file d'attente")
+    parser.add_argument("--jobs-simultanes", type=int, default=1,
+                        help="Nombre de jobs exécutés en parallèle par ce worker")
+    parser.add_argument("--une-fois", action="store_true",
+                        help="S'arrêter dès que la file est vide")
+    args = parser.parse_args(argv)
+
+    file_attente = FileAttenteVerifications(args.db)
+    workers = [
+        WorkerVerifications(file_attente, nom=f"{socket.gethostname()}:{os.getpid()}:{i}")
+        for i in range(max(1, args.jobs_simultanes))
+    ]
+    threads = [threading.Thread(target=w.boucle, args=(args.une_fois,), daemon=True) for w in workers]
+
+    print(f"👷 Worker démarré ({len(workers)} job(s) simultané(s)) sur {args.db}")
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt demandé, fin des jobs en cours...")
+        for worker in workers:
+            worker.arreter()
+        for thread in threads:
+            thread.join()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,4 @@
+# ==================================================
+# BENCHMARKS DE LA COUCHE DONNÉES ADMIN
+# Corpus synthétique de candidatures et mesures de montée en charge
+# ==================================================
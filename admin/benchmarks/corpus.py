@@ -0,0 +1,240 @@
+# ==================================================
+# GÉNÉRATEUR DE CORPUS DE CANDIDATURES
+# Dossiers réalistes produits avec les fonctions du formulaire candidat
+#
+# Usage (depuis le dossier admin/):
+#   python -m benchmarks.corpus --nombre 1000 --dossier bench_candidatures/n_1000
+# ==================================================
+
+import argparse
+import io
+import json
+import random
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Les modules du formulaire s'importent depuis leur propre dossier (from config import ...)
+DOSSIER_FORMS = Path(__file__).resolve().parents[1] / "forms"
+if str(DOSSIER_FORMS) not in sys.path:
+    sys.path.insert(0, str(DOSSIER_FORMS))
+
+from agentOCR.statut_verification import NOM_STATUT, statut_depuis_resultat
+from config import STUDY_LEVELS
+from pdf_generator import (
+    create_candidate_folder,
+    generate_candidate_pdf,
+    create_submission_manifest,
+    create_submission_summary,
+    save_uploaded_files
+)
+
+NOMS = ["MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND", "LEROY", "MOREAU",
+        "OUATTARA", "DIALLO", "TRAORE", "KONE", "NGUYEN", "GARCIA", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL"]
+PRENOMS = ["Jean", "Marie", "Lucas", "Emma", "Ismael", "Aminata", "Hugo", "Chloé", "Louis", "Inès",
+           "Nathan", "Léa", "Moussa", "Fatou", "Paul", "Sarah", "Yanis", "Camille", "Adam", "Jade"]
+PERIODES = ["1er trimestre", "2ème trimestre", "3ème trimestre"]
+STATUTS_VALIDATION = ["en_attente", "valide", "rejete", "incomplet"]
+
+
+class FichierTeleverse:
+    """Imite un fichier téléversé Streamlit (name, size, getbuffer)"""
+
+    def __init__(self, name: str, donnees: bytes):
+        self.name = name
+        self.size = len(donnees)
+        self._donnees = donnees
+
+    def getbuffer(self):
+        return memoryview(self._donnees)
+
+
+def generer_bulletin_pdf(annee: str, notes: List[Dict], etablissement: str) -> bytes:
+    """Bulletin avec couche texte (export ENT): une page par trimestre"""
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+
+    for periode in PERIODES:
+        notes_periode = [n for n in notes if n["periode"] == periode]
+        if not notes_periode:
+            continue
+
+        y = 800
+        for ligne in [etablissement, f"Bulletin du {periode} - Classe de {annee}", "Matière Moyenne élève Moyenne classe"]:
+            c.drawString(50, y, ligne)
+            y -= 20
+        for note in notes_periode:
+            c.drawString(50, y, f"{note['matiere']} {note['note']:.1f} {max(0, note['note'] - 1.5):.1f}".replace(".", ","))
+            y -= 20
+        c.drawString(50, y, "Moyenne générale de l'élève et appréciations du conseil de classe")
+        c.showPage()
+
+    c.save()
+    return buffer.getvalue()
+
+
+def _gabarit_excel() -> bytes:
+    """Petit rapport Excel copié dans les dossiers vérifiés"""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "📊 Résumé"
+    ws.append(["Candidat", "Concordance"])
+    ws.append(["SIMULATION", "OUI"])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def generer_candidature(base: Path, index: int, rng: random.Random, gabarits: Dict[str, bytes],
+                        pdf_uniques: int, taux_verifies: float, taux_valides: float,
+                        taux_mensonges: float) -> str:
+    """Crée un dossier candidature complet; retourne son chemin"""
+
+    nom = f"{rng.choice(NOMS)}-{index:06d}"
+    prenom = rng.choice(PRENOMS)
+    personal_data = {
+        "nom": nom,
+        "prenom": prenom,
+        "email": f"{prenom.lower()}.{index}@exemple.fr",
+        "telephone": f"06{rng.randint(10000000, 99999999)}",
+        "niveau_etude": "bac"
+    }
+
+    # Notes déclarées et bulletins des deux premières années du bac
+    grades_data = []
+    uploaded_files = {}
+    etablissement = f"Lycée {rng.choice(['Victor Hugo', 'Jean Moulin', 'Marie Curie', 'Voltaire'])}"
+    for annee in STUDY_LEVELS["bac"]["years"][:2]:
+        notes_annee = []
+        for periode in PERIODES[:rng.randint(1, 3)]:
+            for matiere in STUDY_LEVELS["bac"]["subjects"][annee][:6]:
+                notes_annee.append({
+                    "matiere": matiere,
+                    "note": round(rng.uniform(6, 19) * 2) / 2,
+                    "coefficient": rng.randint(1, 4),
+                    "periode": periode,
+                    "annee": annee
+                })
+
+        uploaded_files[annee] = FichierTeleverse(
+            f"bulletin_{annee}.pdf", generer_bulletin_pdf(annee, notes_annee, etablissement)
+        )
+
+        # Une partie des candidats surévalue certaines notes déclarées
+        for note in notes_annee:
+            declaree = dict(note)
+            if rng.random() < taux_mensonges:
+                declaree["note"] = min(20.0, note["note"] + rng.choice([1.0, 2.0, 3.5]))
+            grades_data.append(declaree)
+
+    folder_path = create_candidate_folder(nom, prenom, base_folder=str(base))
+    saved_files = save_uploaded_files(uploaded_files, folder_path)
+
+    # Formulaire PDF: rendu reportlab pour les premiers dossiers, puis copie d'un gabarit
+    if index < pdf_uniques or "formulaire" not in gabarits:
+        pdf_path = generate_candidate_pdf(personal_data, grades_data, uploaded_files, folder_path)
+        gabarits.setdefault("formulaire", Path(pdf_path).read_bytes())
+    else:
+        pdf_path = str(Path(folder_path) / f"candidature_{prenom}_{nom}.pdf")
+        Path(pdf_path).write_bytes(gabarits["formulaire"])
+
+    summary_path, _ = create_submission_summary(personal_data, grades_data, uploaded_files, folder_path,
+                                                pdf_path=pdf_path)
+    create_submission_manifest(folder_path, saved_files, pdf_path, summary_path)
+
+    horodatage = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Artefacts de vérification (rapport Excel + résultat JSON de l'agent)
+    if rng.random() < taux_verifies:
+        rapport_excel = Path(folder_path) / f"VERIFICATION_BULLETINS_{nom}_{prenom}_{horodatage}.xlsx"
+        rapport_excel.write_bytes(gabarits["excel"])
+        nb_discordances = rng.choice([0, 0, 0, 1, 2])
+        resultat = {
+            "candidat_nom": nom,
+            "candidat_prenom": prenom,
+            "moyenne_declaree": 13.0,
+            "moyenne_reelle": 12.5,
+            "concordance_globale": nb_discordances == 0,
+            "discordances": [
+                {"matiere": "maths", "periode": "1er trimestre", "niveau": "1ère", "note_declaree": 15.0,
+                 "note_bulletin": 12.0, "ecart": 3.0, "gravite": "GRAVE"}
+            ] * nb_discordances,
+            "notes_non_verifiables": [],
+            "timestamp": datetime.now().isoformat(),
+            "rapport_excel_path": str(rapport_excel)
+        }
+        rapport_json = Path(folder_path) / f"verification_bulletins_{horodatage}.json"
+        with open(rapport_json, "w", encoding="utf-8") as f:
+            json.dump(resultat, f, ensure_ascii=False, indent=2)
+        # Statut écrit par l'agent en fin de vérification (hors index central: corpus jetable)
+        with open(Path(folder_path) / NOM_STATUT, "w", encoding="utf-8") as f:
+            json.dump(statut_depuis_resultat(resultat, rapport_json), f, ensure_ascii=False, indent=2)
+
+    # Décision de l'examinateur
+    if rng.random() < taux_valides:
+        with open(Path(folder_path) / "validation_status.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "status": rng.choice(STATUTS_VALIDATION[1:]),
+                "validation_date": datetime.now().isoformat(),
+                "validator": "admin",
+                "comments": ""
+            }, f, ensure_ascii=False, indent=2)
+
+    return folder_path
+
+
+def generer_corpus(dossier: Path, nombre: int, graine: int = 0, pdf_uniques: int = 50,
+                   taux_verifies: float = 0.5, taux_valides: float = 0.3,
+                   taux_mensonges: float = 0.05, ecraser: bool = False) -> List[str]:
+    """Génère `nombre` dossiers candidature dans `dossier` (déterministe pour une graine donnée)"""
+
+    if dossier.exists() and ecraser:
+        shutil.rmtree(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(graine)
+    gabarits = {"excel": _gabarit_excel()}
+    dossiers = []
+    debut = time.perf_counter()
+
+    for index in range(nombre):
+        dossiers.append(generer_candidature(
+            dossier, index, rng, gabarits, pdf_uniques, taux_verifies, taux_valides, taux_mensonges
+        ))
+        if (index + 1) % 500 == 0:
+            print(f"   📁 {index + 1}/{nombre} dossiers générés ({time.perf_counter() - debut:.0f}s)")
+
+    print(f"✅ Corpus de {nombre} candidatures généré dans {dossier} ({time.perf_counter() - debut:.1f}s)")
+    return dossiers
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Génère un corpus synthétique de candidatures")
+    parser.add_argument("--nombre", type=int, required=True)
+    parser.add_argument("--dossier", default="bench_candidatures/corpus")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--pdf-uniques", type=int, default=50,
+                        help="Formulaires rendus par reportlab (les suivants copient un gabarit)")
+    parser.add_argument("--taux-verifies", type=float, default=0.5)
+    parser.add_argument("--taux-valides", type=float, default=0.3)
+    parser.add_argument("--taux-mensonges", type=float, default=0.05)
+    parser.add_argument("--ecraser", action="store_true", help="Supprimer le dossier existant")
+    args = parser.parse_args(argv)
+
+    generer_corpus(Path(args.dossier), args.nombre, graine=args.graine, pdf_uniques=args.pdf_uniques,
+                   taux_verifies=args.taux_verifies, taux_valides=args.taux_valides,
+                   taux_mensonges=args.taux_mensonges, ecraser=args.ecraser)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,7 +16,7 @@ from utils import (
 )
 from pdf_generator import (
     create_candidate_folder, generate_candidate_pdf, 
-    save_uploaded_files, create_submission_summary
+    save_uploaded_files, create_submission_summary, create_submission_manifest
 )
 
 
@@ -332,6 +332,7 @@ def render_submission_success(config, personal_data):
         st.success(f"📁 Dossier créé : {folder_path}")
         
         # 2. Sauvegarder les fichiers téléversés
+        saved_files = []
         if st.session_state.uploaded_files:
             with st.spinner("💾 Sauvegarde des fichiers téléversés..."):
                 saved_files = save_uploaded_files(st.session_state.uploaded_files, folder_path)
@@ -352,20 +353,24 @@ def render_submission_success(config, personal_data):
             personal_data,
             st.session_state.student_grades,
             st.session_state.uploaded_files,
-            folder_path
+            folder_path,
+            pdf_path=pdf_path
         )
         
-        # 5. Animation de succès
+        # 5. Manifeste des documents (rôle, empreinte, pages) pour l'administration
+        create_submission_manifest(folder_path, saved_files, pdf_path, summary_path)
+        
+        # 6. Animation de succès
         st.balloons()
         
-        # 6. Message de confirmation
+        # 7. Message de confirmation
         st.markdown(f"""
         <div class="alert-success">
             <h3>{MESSAGES['success']['submission_success']}</h3>
         </div>
         """, unsafe_allow_html=True)
         
-        # 7. Informations du dossier créé
+        # 8. Informations du dossier créé
         st.markdown("### 📂 Dossier créé")
         st.info(f"**Emplacement :** `{folder_path}`")
         
@@ -375,7 +380,7 @@ def render_submission_success(config, personal_data):
             st.markdown("**📄 Fichiers générés :**")
             st.write("- Candidature PDF")
             st.write("- Résumé JSON")
-            for file_info in saved_files if 'saved_files' in locals() else []:
+            for file_info in saved_files:
                 st.write(f"- {file_info['original_name']}")
         
         with col2:
@@ -385,7 +390,7 @@ def render_submission_success(config, personal_data):
             st.write(f"- **Documents :** {summary['statistiques']['nombre_documents']}")
             st.write(f"- **Référence :** {summary['soumission']['reference']}")
         
-        # 8. Récapitulatif détaillé
+        # 9. Récapitulatif détaillé
         st.markdown("### 📋 Récapitulatif détaillé")
         submission_data = create_submission_data(personal_data, config)
         
@@ -399,7 +404,7 @@ def render_submission_success(config, personal_data):
         Vous recevrez une confirmation par email.
         """)
         
-        # 9. Boutons de téléchargement
+        # 10. Boutons de téléchargement
         st.markdown("### 💾 Téléchargements")
         
         col_dl1, col_dl2, col_dl3 = st.columns(3)
@@ -441,7 +446,7 @@ def render_submission_success(config, personal_data):
                 use_container_width=True
             )
         
-        # 10. Instructions pour la suite
+        # 11. Instructions pour la suite
         st.markdown("### ℹ️ Prochaines étapes")
         st.info("""
         1. **Conservez** le dossier généré comme preuve de votre candidature
@@ -14,16 +14,20 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
 from config import STUDY_LEVELS
+from submission_manifest import (
+    MANIFEST_FILENAME, MANIFEST_VERSION, IMAGE_EXTENSIONS, ROLE_FORM, ROLE_BULLETIN, ROLE_SUMMARY,
+    compute_file_sha256, count_pdf_pages
+)
 
 
-def create_candidate_folder(nom, prenom):
+def create_candidate_folder(nom, prenom, base_folder="candidatures"):
     """Crée un dossier pour le candidat"""
     # Nettoyer le nom pour éviter les caractères problématiques
     safe_nom = "".join(c for c in nom if c.isalnum() or c in (' ', '-', '_')).strip()
     safe_prenom = "".join(c for c in prenom if c.isalnum() or c in (' ', '-', '_')).strip()
     
     folder_name = f"{safe_nom}_{safe_prenom}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    folder_path = os.path.join("candidatures", folder_name)
+    folder_path = os.path.join(base_folder, folder_name)
     
     # Créer le dossier s'il n'existe pas
     os.makedirs(folder_path, exist_ok=True)
@@ -262,7 +266,57 @@ def save_uploaded_files(uploaded_files, folder_path):
     return saved_files
 
 
-def create_submission_summary(personal_data, grades_data, uploaded_files, folder_path):
+def _manifest_entry(file_path, role, year=None):
+    stat = os.stat(file_path)
+    name = os.path.basename(file_path)
+    if name.lower().endswith('.pdf'):
+        pages = count_pdf_pages(file_path)
+    else:
+        pages = 1 if name.lower().endswith(IMAGE_EXTENSIONS) else None
+    
+    return {
+        'name': name,
+        'role': role,
+        'year': year,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,  # Empreinte réutilisable tant que taille et date sont inchangées
+        'sha256': compute_file_sha256(file_path),
+        'pages': pages
+    }
+
+
+def create_submission_manifest(folder_path, saved_files, pdf_path, summary_path=None):
+    """
+    Crée manifest.json: rôle (formulaire, bulletin, resume), année, taille,
+    empreinte SHA-256 et nombre de pages de chaque document de la soumission
+    """
+    import json
+    
+    files = []
+    if pdf_path and os.path.exists(pdf_path):
+        files.append(_manifest_entry(pdf_path, ROLE_FORM))
+    for saved_file in saved_files or []:
+        files.append(_manifest_entry(saved_file['saved_path'], ROLE_BULLETIN, saved_file['year']))
+    if summary_path and os.path.exists(summary_path):
+        files.append(_manifest_entry(summary_path, ROLE_SUMMARY))
+    
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'files': files
+    }
+    
+    # Écriture atomique: un lecteur ne voit jamais un manifeste partiel
+    manifest_path = os.path.join(folder_path, MANIFEST_FILENAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    
+    return manifest_path, manifest
+
+
+def create_submission_summary(personal_data, grades_data, uploaded_files, folder_path, pdf_path=None):
     """Crée un fichier de résumé JSON de la soumission"""
     import json
     
@@ -305,6 +359,14 @@ def create_submission_summary(personal_data, grades_data, uploaded_files, folder
         }
     }
     
+    # Empreinte du formulaire PDF: permet à l'agent de vérification de lire
+    # les notes déclarées ici plutôt que de ré-analyser le PDF par OCR
+    if pdf_path and os.path.exists(pdf_path):
+        summary['formulaire'] = {
+            'nom_fichier': os.path.basename(pdf_path),
+            'sha256': compute_file_sha256(pdf_path)
+        }
+    
     # Sauvegarder le résumé JSON
     summary_path = os.path.join(folder_path, 'resume_candidature.json')
     with open(summary_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,41 @@
+"""
+Format du manifeste des documents d'une candidature (manifest.json)
+
+Module partagé par l'écriture (pdf_generator, formulaire candidat) et la
+lecture (admin_manifeste, administration et agent de vérification): une seule
+définition du nom, de la version, des rôles et des empreintes.
+Sans dépendance au reste du formulaire, importable depuis admin/ (forms.submission_manifest).
+"""
+
+import hashlib
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+ROLE_FORM = "formulaire"
+ROLE_BULLETIN = "bulletin"
+ROLE_SUMMARY = "resume"
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def compute_file_sha256(file_path):
+    """Calcule l'empreinte SHA-256 d'un fichier (lecture par blocs)"""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def count_pdf_pages(file_path):
+    """Nombre de pages d'un PDF (None si PyMuPDF est absent ou le fichier illisible)"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+    try:
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    except Exception:
+        return None